@@ -2,27 +2,35 @@
 from flask import Flask
 from flask_login import LoginManager
 from flask_cors import CORS
+from flask_migrate import Migrate
 from config import Config
 from models import db
+from services.engine_config import init_database
 from controllers.auth import auth_bp
-from services.data_loader import load_data_from_csv
+from controllers.metrics import metrics_bp
+from controllers.ingest import ingest_bp
+from services.data_loader import load_data_from_csv, ensure_challenge_bindings
+from services.rollup_service import ensure_rollups_backfilled
+from services.schema_service import ensure_schema_upgraded
+from services.streak_service import ensure_log_streaks_backfilled
 from controllers.dashboard import create_dashboard  
 from dotenv import load_dotenv
 from services.notifications import (
     init_mail,
-    send_inactive_user_email,
-    send_goal_nudge_email,
-    send_challenge_reminder_email,
-    send_challenge_reminder_sms,
-    send_goal_nudge_sms
+    send_inactive_user_email
 )
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timedelta, timezone
-
-from services.user_service import fetch_user_data
-from services.challenge_service import fetch_challenges, fetch_patient_progress
-from services.goal_utils import calculate_goal_progress
+from datetime import datetime, timedelta
+from sqlalchemy.orm import contains_eager
+
+from services.reminder_service import sweep_challenge_reminders, sweep_goal_nudges
+from services.outbox_service import deliver_outbox, release_stuck_messages
+from services.leaderboard_service import refresh_leaderboards_if_needed
+from services.challenge_events import reconcile_challenge_progress
+from services.instrumentation import init_instrumentation
 from models.user import User
+from models.patient import Patient
+from models.health_history import HealthHistory
 
 #Loading enviroment variables
 load_dotenv()
@@ -34,8 +42,9 @@ app.config.from_object(Config)
 #Initialising mail
 init_mail(app)
 
-#Intialising db and login manager
-db.init_app(app)
+#Intialising db (with engine tuning), migrations and login manager
+init_database(app)
+migrate = Migrate(app, db)
 login_manager = LoginManager()
 login_manager.init_app(app)
 
@@ -44,6 +53,8 @@ CORS(app, origins=["http://localhost:3000"])
 
 #Registering API routes
 app.register_blueprint(auth_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(ingest_bp)
 
 #Flask-Login: Load user
 @login_manager.user_loader
@@ -56,77 +67,108 @@ def load_user(user_id):
 def check_inactive_users():
     print("[SCHEDULER] Running inactivity check...")
     with app.app_context():
-        seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-        users = User.query.all()
+        #last_login is stored as naive UTC
+        seven_days_ago = datetime.utcnow() - timedelta(days=7)
+
+        #One joined query instead of loading every user and then each user's patient
+        users = (
+            User.query
+            .join(Patient, User.patient_id == Patient.patient_id)
+            .options(contains_eager(User.patient))
+            .filter(User.last_login < seven_days_ago, Patient.email_alerts.is_(True), Patient.email.isnot(None))
+            .all()
+        )
         emailed_count = 0
 
         for user in users:
-            if user.last_login and user.last_login < seven_days_ago:
-                patient = user.patient
-                if patient and patient.email and patient.email_alerts:
-                    send_inactive_user_email(patient.email, user.username, 7)
-                    print(f"[INACTIVE] Emailed: {user.username}")
-                    emailed_count += 1
+            patient = user.patient
+            if patient.email:
+                send_inactive_user_email(patient.email, user.username, 7, commit=False)
+                print(f"[INACTIVE] Emailed: {user.username}")
+                emailed_count += 1
 
+        db.session.commit()
         print(f"[SUMMARY] Total inactive users emailed: {emailed_count}")
 
+#Where the last challenge/goal sweeps stopped if they ran out of time (0 = start)
+reminder_sweep_state = {"resume_after": 0, "goal_resume_after": 0}
+
 def check_challenge_reminders():
     print("[SCHEDULER] Checking challenge progress...")
     with app.app_context():
-        users = User.query.all()
-        for user in users:
-            if not user.patient:
-                continue
-            email = user.patient.email
-            phone = user.patient.phone_number
-            if not (email or phone):
-                continue
-
-            challenges = fetch_challenges()
-            for ch in challenges:
-                progress = fetch_patient_progress(user.username, ch["id"])
-                percent = round((progress / ch["goal"]) * 100) if ch["goal"] > 0 else 0
-
-                if percent < 100 and percent >= 75:
-                    if user.patient.email_alerts:
-                        send_challenge_reminder_email(email, user.username, ch["name"], percent)
-                    if user.patient.sms_alerts:
-                        send_challenge_reminder_sms(phone, ch["name"], percent)
+        summary = sweep_challenge_reminders(
+            chunk_size=app.config["CHALLENGE_REMINDER_CHUNK_SIZE"],
+            time_budget_seconds=app.config["CHALLENGE_REMINDER_TIME_BUDGET"],
+            start_after=reminder_sweep_state["resume_after"]
+        )
+        reminder_sweep_state["resume_after"] = summary["resume_after"] or 0
+
+        print(f"[SUMMARY] Challenge sweep: {summary['patients']} patients, {summary['emails']} emails, {summary['sms']} SMS.")
 
 def check_goal_proximity():
     print("[SCHEDULER] Checking goal proximity...")
     with app.app_context():
-        users = User.query.all()
-        for user in users:
-            if not user.patient:
-                continue
-            email = user.patient.email
-            phone = user.patient.phone_number
-            if not (email or phone):
-                continue
-
-            user_data = fetch_user_data(user.username)
-            for metric, value in user_data.items():
-                if metric.startswith("latest_") and isinstance(value, (int, float)):
-                    start, end, x_data, y_data, progress = calculate_goal_progress(user.username, metric, "daily")
-                    if progress >= 80 and progress < 100:
-                        label = metric.replace("latest_", "").replace("_", " ").title()
-                        if user.patient.email_alerts:
-                            send_goal_nudge_email(email, user.username, label, int(progress))
-                        if user.patient.sms_alerts:
-                            send_goal_nudge_sms(phone, label, int(progress))
+        summary = sweep_goal_nudges(
+            chunk_size=app.config["GOAL_NUDGE_CHUNK_SIZE"],
+            time_budget_seconds=app.config["GOAL_NUDGE_TIME_BUDGET"],
+            start_after=reminder_sweep_state["goal_resume_after"]
+        )
+        reminder_sweep_state["goal_resume_after"] = summary["resume_after"] or 0
+
+        print(f"[SUMMARY] Goal sweep: {summary['goals']} goals, {summary['emails']} emails, {summary['sms']} SMS.")
+
+def deliver_notifications():
+    with app.app_context():
+        release_stuck_messages(app.config["NOTIFICATION_LEASE_SECONDS"])
+        summary = deliver_outbox(
+            batch_size=app.config["NOTIFICATION_BATCH_SIZE"],
+            max_workers=app.config["NOTIFICATION_WORKERS"],
+            max_attempts=app.config["NOTIFICATION_MAX_ATTEMPTS"],
+            retry_base_seconds=app.config["NOTIFICATION_RETRY_BASE_SECONDS"],
+            lease_seconds=app.config["NOTIFICATION_LEASE_SECONDS"]
+        )
+        if summary["claimed"]:
+            print(
+                f"[OUTBOX] Delivered {summary['sent']}/{summary['claimed']} "
+                f"({summary['retrying']} retrying, {summary['failed']} failed), "
+                f"mean latency {summary['mean_latency_ms']}ms."
+            )
+
+def refresh_leaderboard_snapshot():
+    with app.app_context():
+        refresh_leaderboards_if_needed()
+
+def reconcile_challenges():
+    with app.app_context():
+        reconcile_challenge_progress()
 
 #Inital db and data set up
 def initialise_app():
     print("[INFO] Initialising database and loading data from CSV...")
     db.create_all()
+
+    #create_all() never adds columns to existing tables
+    ensure_schema_upgraded()
+
+    #create_all() skips indexes on tables that already exist
+    for index in HealthHistory.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
     load_data_from_csv()
+    ensure_challenge_bindings()
+    ensure_rollups_backfilled()
+    ensure_log_streaks_backfilled()
+    release_stuck_messages(app.config["NOTIFICATION_LEASE_SECONDS"])
 
     #Starting background job for inactivity
     scheduler = BackgroundScheduler()
     scheduler.add_job(check_inactive_users, 'interval', days=1)
     scheduler.add_job(check_challenge_reminders, 'interval', hours=6)
     scheduler.add_job(check_goal_proximity, 'interval', hours=6)
+    scheduler.add_job(deliver_notifications, 'interval', seconds=app.config["NOTIFICATION_POLL_SECONDS"])
+    #Checks often, rebuilds only when dirty or stale; the first run builds the snapshot at startup
+    scheduler.add_job(refresh_leaderboard_snapshot, 'interval', seconds=app.config["LEADERBOARD_MIN_REFRESH_SECONDS"], next_run_time=datetime.now())
+    scheduler.add_job(reconcile_challenges, 'interval', minutes=app.config["CHALLENGE_RECONCILE_MINUTES"])
     scheduler.start()
     print("[INFO] Scheduler started with user reminders.")
 
@@ -135,7 +177,10 @@ with app.app_context():
     initialise_app()
 
 #Attaching Dash app
-create_dashboard(app)
+dash_app = create_dashboard(app)
+
+#Timing / SQL / payload histograms for every route and callback (served on /metrics)
+init_instrumentation(app, dash_app)
 
 #Running Flask server
 if __name__ == '__main__':
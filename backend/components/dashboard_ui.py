@@ -1,11 +1,10 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
-import pandas as pd
 import plotly.graph_objects as go
 from components.sidebar import create_sidebar
-from services.user_service import fetch_user_data, METRIC_LABELS, METRIC_GOAL_BEHAVIOR
+from services.user_service import METRIC_LABELS
 from services.goals_service import get_patient_goals
-from services.goal_utils import calculate_goal_progress
+from services.goal_utils import goal_donut_data
 
 def create_goal_donut(metric, value, goal, percent, behavior="cumulative"):
 
@@ -68,63 +67,29 @@ def generate_goal_section(username):
     goals = get_patient_goals(username)
     print(f"[DEBUG] Retrieved {len(goals)} goals")
 
-    user_data = fetch_user_data(username)
-    print(f"[DEBUG] User data keys: {list(user_data.keys()) if user_data else 'No data'}")
-
-    if not goals or not user_data:
-        print("[DEBUG] No goals or user data found")
+    if not goals:
+        print("[DEBUG] No goals found")
         return dbc.Alert("No goals found. Head to 'Set Goals' to create one!", color="info")
 
+    #Every goal's progress in one pass (query count does not grow with the goal count)
     donut_cards = []
 
-    for goal in goals:
-        metric = getattr(goal, "metric_name", None)
-        target = getattr(goal, "goal_value", None)
-        goal_type = getattr(goal, "goal_type", "daily")
-
-        if not metric or target is None:
-            print("[DEBUG] Skipping invalid goal - missing metric or target")
-            continue
+    for goal in goal_donut_data(goals):
+        print(f"[DEBUG] Goal - Metric: {goal['metric']}, Target: {goal['goal']}, Progress: {goal['percent']}%")
 
-        _, _, _, y_data, progress_value = calculate_goal_progress(
-            username, metric, goal_type, goal_value=target
+        donut = create_goal_donut(
+            metric=goal["metric"],
+            value=goal["value"],
+            goal=goal["goal"],
+            percent=goal["percent"],
+            behavior=goal["behavior"]
         )
 
-        if progress_value is None:
-            progress_value = 0
-
-        print(f"[DEBUG] Goal - Metric: {metric}, Target: {target}, Progress Value: {progress_value}")
-        behavior = METRIC_GOAL_BEHAVIOR.get(metric, "cumulative")
-
-        if behavior == "change":
-            percent = progress_value
-            last_logged = y_data.iloc[-1] if isinstance(y_data, pd.Series) and not y_data.empty else 0
-            value_display = f"{last_logged:.2f} / {target:.2f}"
-
-            donut = create_goal_donut(
-                metric=metric.replace("latest_", "").replace("_", " ").title(),
-                value=last_logged,
-                goal=target,
-                percent=percent,
-                behavior=behavior  
-            )
-        else:
-            percent = min(100, round((progress_value / target) * 100, 1)) if target else 0
-            value_display = f"{progress_value:.2f} / {target:.2f}"
-
-            donut = create_goal_donut(
-                metric=metric.replace("latest_", "").replace("_", " ").title(),
-                value=progress_value,
-                goal=target,
-                percent=percent,
-                behavior=behavior  
-            )
-
         donut_card = dbc.Col([
             dbc.Card([
                 dbc.CardHeader(
                     html.Span(
-                        metric.replace("latest_", "").replace("_", " ").title(),
+                        goal["metric"],
                         style={"color": "white", "fontWeight": "bold", "fontSize": "18px", "fontFamily": "sans-serif"}
                     ),
                     className="text-center"
@@ -132,12 +97,12 @@ def generate_goal_section(username):
                 dbc.CardBody([
                     donut,
                     html.P(
-                        value_display,
+                        goal["value_display"],
                         style={"color": "white", "fontWeight": "bold"},
                         className="text-center mt-2"
                     ),
                     html.Div(
-                        html.Span(goal_type.upper(), className="goal-type-badge"),
+                        html.Span(goal["goal_type"].upper(), className="goal-type-badge"),
                         className="text-center mt-1"
                     )
                 ])
@@ -181,7 +146,10 @@ def dashboard_page(username):
                 ], className="dropdown-label-row"),
 
                 dbc.Row([
-                    dbc.Col(html.Div(id="graph-container", className="graph-container"), width=8),
+                    dbc.Col([
+                        html.Div(id="graph-container", className="graph-container"),
+                        dcc.Store(id="graph-width-store", storage_type="memory")
+                    ], width=8),
                     dbc.Col([
                         html.Div(id="rotating-right-metric", className="right-metric"),
                         html.Div([
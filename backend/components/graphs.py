@@ -1,7 +1,7 @@
 import plotly.express as px
 from dash import dcc
 
-def create_metric_graph(df, metric_label, thresholds):
+def create_metric_graph(df, metric_label, thresholds, graph_id=None):
     
     fig = px.line(df, x="Date", y="Value", title=None)
 
@@ -24,6 +24,7 @@ def create_metric_graph(df, metric_label, thresholds):
         paper_bgcolor="white",  
         xaxis=dict(showgrid=True, gridcolor="lightgray"),  
         yaxis=dict(showgrid=True, gridcolor="lightgray"),  
+        uirevision=metric_label,  #Keeps the user's zoom when the zoom callback swaps in finer data
         annotations=[  
             dict(
                 x=df["Date"].iloc[-1],
@@ -37,4 +38,6 @@ def create_metric_graph(df, metric_label, thresholds):
         ]
     )
 
+    if graph_id:
+        return dcc.Graph(id=graph_id, figure=fig, config={"displayModeBar": True, "scrollZoom": True})
     return dcc.Graph(figure=fig, config={"displayModeBar": True, "scrollZoom": True})
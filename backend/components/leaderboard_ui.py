@@ -75,6 +75,9 @@ def leaderboard_page():
 
             dbc.Col([
 
+                #When the snapshot being shown was built
+                html.P(id="leaderboard-refreshed-at", className="leaderboard-refreshed-at"),
+
                 dbc.Row([  
                     leaderboard_block("💪 Top Workout Sessions", "workout-timeframe", "workout-leaderboard"),
                     leaderboard_block("🔥 Top Calories Burned", "calories-timeframe", "calories-leaderboard")
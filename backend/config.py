@@ -5,4 +5,76 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'your_secret_key')  
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///diabetes.db')  
     SQLALCHEMY_TRACK_MODIFICATIONS = False  
+
+    #Database engine tuning (see services/engine_config.py)
+    SQLITE_TUNING = os.getenv('SQLITE_TUNING', 'true').lower() == 'true'  #False = SQLite defaults
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))  #Bytes of the file read through mmap (256 MB)
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -65536))  #Page cache per connection; negative = KiB (64 MB)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))  #Wait for the write lock before "database is locked"
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))  #Server databases only
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))  #Seconds to wait for a pooled connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  #Seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
     DEBUG = True  
+
+    #Scheduler: challenge reminder sweep
+    CHALLENGE_REMINDER_CHUNK_SIZE = int(os.getenv('CHALLENGE_REMINDER_CHUNK_SIZE', 500))
+    CHALLENGE_REMINDER_TIME_BUDGET = int(os.getenv('CHALLENGE_REMINDER_TIME_BUDGET', 1800))  #Seconds per run
+
+    #Scheduler: goal nudge sweep
+    GOAL_NUDGE_CHUNK_SIZE = int(os.getenv('GOAL_NUDGE_CHUNK_SIZE', 500))
+    GOAL_NUDGE_TIME_BUDGET = int(os.getenv('GOAL_NUDGE_TIME_BUDGET', 1800))  #Seconds per run
+
+    #Notification outbox delivery
+    NOTIFICATION_POLL_SECONDS = int(os.getenv('NOTIFICATION_POLL_SECONDS', 30))
+    NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', 100))
+    NOTIFICATION_WORKERS = int(os.getenv('NOTIFICATION_WORKERS', 4))  #Thread pool bound (= SMTP connections per batch)
+    NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', 5))
+    NOTIFICATION_RETRY_BASE_SECONDS = int(os.getenv('NOTIFICATION_RETRY_BASE_SECONDS', 60))  #Doubles per failed attempt
+    NOTIFICATION_LEASE_SECONDS = int(os.getenv('NOTIFICATION_LEASE_SECONDS', 600))  #Renewed while a batch is sending; an expired lease is requeued (at-least-once)
+
+    #Username -> user/patient id cache shared across requests
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', 1024))
+
+    #CSV patient import
+    CSV_PATIENT_LIMIT = int(os.getenv('CSV_PATIENT_LIMIT', 10))  #Patients provisioned at start-up (0 = whole file)
+    CSV_IMPORT_CHUNK_SIZE = int(os.getenv('CSV_IMPORT_CHUNK_SIZE', 1000))
+
+    #Leaderboard snapshots
+    LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', 5))
+    LEADERBOARD_REFRESH_SECONDS = int(os.getenv('LEADERBOARD_REFRESH_SECONDS', 300))  #Rebuild at least this often
+    LEADERBOARD_MIN_REFRESH_SECONDS = int(os.getenv('LEADERBOARD_MIN_REFRESH_SECONDS', 15))  #Background check interval (and throttle for dirty rebuilds)
+
+    #Per-route / per-callback instrumentation (Prometheus text on /metrics)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_LOCAL_ONLY = os.getenv('METRICS_LOCAL_ONLY', 'true').lower() == 'true'  #Only answer scrapes from localhost
+
+    #Query budgets declared with @query_budget: "off", "warn" (print) or "raise"
+    QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'warn')
+
+    #Dash callback output cache, keyed by patient data version
+    CALLBACK_CACHE_BACKEND = os.getenv('CALLBACK_CACHE_BACKEND', 'memory')  #"memory" (per process), "disk" (shared by workers) or "off"
+    CALLBACK_CACHE_SIZE = int(os.getenv('CALLBACK_CACHE_SIZE', 1024))  #Entries before least recently used are evicted
+    CALLBACK_CACHE_TTL_SECONDS = int(os.getenv('CALLBACK_CACHE_TTL_SECONDS', 300))
+    CALLBACK_CACHE_PATH = os.getenv('CALLBACK_CACHE_PATH')  #Disk backend file (defaults to instance/callback_cache.db)
+
+    #Metric graph downsampling (points sent per visible x-range)
+    GRAPH_DOWNSAMPLE_METHOD = os.getenv('GRAPH_DOWNSAMPLE_METHOD', 'lttb')  #"lttb" (line shape) or "minmax" (keeps spikes)
+    GRAPH_POINTS_PER_PIXEL = float(os.getenv('GRAPH_POINTS_PER_PIXEL', 1.0))
+
+    #Bulk metric ingestion (/api/metrics/bulk)
+    INGEST_MAX_BATCH_SIZE = int(os.getenv('INGEST_MAX_BATCH_SIZE', 1000))  #Readings per request
+    INGEST_MAX_FUTURE_SECONDS = int(os.getenv('INGEST_MAX_FUTURE_SECONDS', 300))  #Allowed device clock skew
+
+    #Metric log writes (one transaction per log; optional group commit across concurrent writers)
+    METRIC_LOG_GROUP_COMMIT = os.getenv('METRIC_LOG_GROUP_COMMIT', 'false').lower() == 'true'
+    METRIC_LOG_GROUP_WINDOW_MS = int(os.getenv('METRIC_LOG_GROUP_WINDOW_MS', 3))  #How long a leader waits for others to join
+    METRIC_LOG_GROUP_MAX_BATCH = int(os.getenv('METRIC_LOG_GROUP_MAX_BATCH', 64))  #Writes per shared transaction
+
+    #Challenge progress (delta-updated on each log; periodically recomputed from the rollups)
+    CHALLENGE_RECONCILE_MINUTES = int(os.getenv('CHALLENGE_RECONCILE_MINUTES', 60))
+    CHALLENGE_CATALOG_CHECK_SECONDS = int(os.getenv('CHALLENGE_CATALOG_CHECK_SECONDS', 30))  #How stale another worker's challenge edits can be
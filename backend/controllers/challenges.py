@@ -6,10 +6,10 @@ from datetime import datetime, timedelta
 #Services
 from services.challenge_service import (
     fetch_challenges,
-    fetch_patient_progress,
-    update_challenge_progress
+    refresh_patient_challenges
 )
 from services.user_service import fetch_user_points
+from services.query_budget import query_budget
 
 
 #Calculate Time Remaining for Challenges 
@@ -47,6 +47,7 @@ def register_challenges_callbacks(dash_app):
         ],
         Input("username-store", "data")
     )
+    @query_budget(20)
     def load_challenges(username_data):
         
         if not username_data:
@@ -62,6 +63,9 @@ def register_challenges_callbacks(dash_app):
 
         username = username_data.get("username")
         challenges = fetch_challenges()
+
+        #Recalculate every challenge in one batch (also awards completion points)
+        progress_by_challenge = refresh_patient_challenges(username)
         user_points = fetch_user_points(username)
 
         if not challenges:
@@ -91,9 +95,7 @@ def register_challenges_callbacks(dash_app):
             challenge_type = challenge["challenge_type"]
             goal = challenge["goal"]
 
-            #Update user progress silently (log suppression enabled)
-            update_challenge_progress(username, challenge["id"], amount=0, suppress_completion_logs=True)
-            progress = fetch_patient_progress(username, challenge["id"])
+            progress = progress_by_challenge.get(challenge["id"], 0)
 
             progress_rounded = round(progress)
             goal_rounded = round(goal)
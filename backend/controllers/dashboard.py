@@ -7,8 +7,11 @@ from dash import dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
 
 #Services (Backend Logic) 
-from services.user_service import METRIC_CATEGORIES, fetch_user_data, fetch_health_history, METRIC_LABELS, THRESHOLDS
+from services.user_service import METRIC_CATEGORIES, fetch_user_data, METRIC_LABELS, THRESHOLDS
 from services.rewards_service import get_claimed_rewards
+from services.query_budget import query_budget
+from services.callback_cache import cached_callback
+from services.graph_service import fetch_graph_series, parse_x_range
 
 #Controllers (Callback Registration) 
 from controllers.challenges import register_challenges_callbacks
@@ -125,6 +128,7 @@ def create_dashboard(app):
         Output('summary-container', 'children'),
         Input('username-store', 'data')
     )
+    @cached_callback
     def load_dashboard(username_data):
         """Load user metadata into dashboard summary cards."""
         username = username_data.get('username') if username_data else None
@@ -141,32 +145,70 @@ def create_dashboard(app):
 
         return html.Div(metric_cards, className="metrics-row")
 
+    #Clientside: Measure the Graph Width (sizes the downsampled series to the plot)
+    #update_graph reads it as State: a width Input would fire the fetch again once the
+    #measurement lands. The first render uses the default width; later ones the measured one.
+    dash_app.clientside_callback(
+        """
+        function(selectedMetric) {
+            var container = document.getElementById("graph-container");
+            return container && container.offsetWidth ? container.offsetWidth : null;
+        }
+        """,
+        Output('graph-width-store', 'data'),
+        Input('metric-dropdown', 'value')
+    )
+
     #Callback: Update Graph on Metric Selection 
     @dash_app.callback(
         Output('graph-container', 'children'),
         Output('graph-label', 'children'),
-        [Input('username-store', 'data'), Input('metric-dropdown', 'value')]
+        [Input('username-store', 'data'), Input('metric-dropdown', 'value')],
+        State('graph-width-store', 'data')
     )
-    def update_graph(username_data, selected_metric):
-        """Update the metric graph dynamically."""
+    @cached_callback
+    def update_graph(username_data, selected_metric, graph_width):
+        """Update the metric graph dynamically (full range, downsampled to the plot width)."""
         username = username_data.get('username') if username_data else None
-        df = fetch_health_history(username, selected_metric)
+        df, _ = fetch_graph_series(username, selected_metric, width_px=graph_width)
 
         if df.empty:
             return html.Div("No historical data available.", className="no-data"), METRIC_LABELS[selected_metric]
 
-        df = df.sort_values("Date", ascending=True)
-
         return (
-            create_metric_graph(df, METRIC_LABELS[selected_metric], THRESHOLDS.get(selected_metric, {})),
+            create_metric_graph(df, METRIC_LABELS[selected_metric], THRESHOLDS.get(selected_metric, {}), graph_id='metric-graph'),
             METRIC_LABELS[selected_metric]
         )
 
+    #Callback: Refetch Graph Detail on Zoom / Pan
+    @dash_app.callback(
+        Output('metric-graph', 'figure'),
+        Input('metric-graph', 'relayoutData'),
+        [State('username-store', 'data'), State('metric-dropdown', 'value'), State('graph-width-store', 'data')],
+        prevent_initial_call=True
+    )
+    def zoom_graph(relayout_data, username_data, selected_metric, graph_width):
+        """Swap in the visible x-range's points (finer as the range shrinks); only the trace data is sent."""
+        x_range = parse_x_range(relayout_data)
+        if x_range is None:
+            return dash.no_update
+
+        username = username_data.get('username') if username_data else None
+        df, _ = fetch_graph_series(username, selected_metric, x_range=None if x_range == "reset" else x_range, width_px=graph_width)
+        if df.empty:
+            return dash.no_update
+
+        figure = dash.Patch()
+        figure["data"][0]["x"] = df["Date"].tolist()
+        figure["data"][0]["y"] = df["Value"].tolist()
+        return figure
+
     #Callback: Load Goal Section Donuts 
     @dash_app.callback(
         Output("goal-section-content", "children"),
         Input("username-store", "data")
     )
+    @cached_callback
     def update_goal_section(username_data):
         """Render the goal progress donut cards."""
         username = username_data.get("username") if username_data else None
@@ -234,6 +276,7 @@ def create_dashboard(app):
     State("username-store", "data"),
     Input("active-category-store", "data")  #Use active category from store
 )
+    @query_budget(5)
     def update_metric_grid(filter_value, username_data, active_category):
         if not username_data or "username" not in username_data:
             return dbc.Alert("User not found", color="warning")
@@ -329,6 +372,7 @@ def create_dashboard(app):
         Output("near-complete-challenges", "children"),
         Input("username-store", "data")
     )
+    @cached_callback(catalogs=("challenges",))
     def render_nearly_complete_challenges(username_data):
         if not username_data or "username" not in username_data:
             return dbc.Alert("User not found", color="warning")
@@ -518,6 +562,8 @@ def create_dashboard(app):
 
         return "all" if selected == current else selected
 
+    return dash_app
+
 def get_metric_category(metric_name):
     for category, metrics in METRIC_CATEGORIES.items():
         if metric_name in metrics:
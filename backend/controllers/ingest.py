@@ -0,0 +1,39 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_login import current_user
+from services.identity_service import resolve_patient
+from services.ingest_service import ingest_readings, IngestValidationError
+
+ingest_bp = Blueprint('ingest', __name__)
+
+#Route for device/wearable syncs: many readings for the logged-in patient in one request
+#Body: {"readings": [{"metric": "latest_steps_taken", "value": 5400, "timestamp": "2026-10-18T09:30:00Z"}, ...]}
+@ingest_bp.route('/api/metrics/bulk', methods=['POST'])
+def bulk_ingest():
+    if not current_user.is_authenticated:
+        return jsonify({"success": False, "message": "Login required"}), 401
+
+    if not request.is_json:
+        return jsonify({"success": False, "message": "Invalid request format"}), 400
+
+    patient = resolve_patient(current_user.username)
+    if not patient:
+        return jsonify({"success": False, "message": "Patient record not found."}), 404
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "message": "Batch rejected; no readings were stored.", "errors": ["body must be a JSON object with a readings list"]}), 400
+
+    try:
+        summary = ingest_readings(
+            patient,
+            data.get("readings"),
+            max_batch_size=current_app.config["INGEST_MAX_BATCH_SIZE"],
+            max_future_seconds=current_app.config["INGEST_MAX_FUTURE_SECONDS"]
+        )
+    except IngestValidationError as e:
+        return jsonify({"success": False, "message": "Batch rejected; no readings were stored.", "errors": e.errors}), 400
+    except Exception as e:
+        print(f"[ERROR] Bulk ingest failed for {current_user.username}: {str(e)}")
+        return jsonify({"success": False, "message": "An error occurred while storing the readings."}), 500
+
+    return jsonify({"success": True, "message": f"Stored {summary['accepted']} readings.", **summary})
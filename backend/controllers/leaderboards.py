@@ -2,7 +2,7 @@
 from dash import Output, Input
 
 #Services 
-from services.leaderboard_service import fetch_leaderboard
+from services.leaderboard_service import get_leaderboard, describe_leaderboard_age, LEADERBOARD_METRICS
 
 
 #Callback Registration 
@@ -14,6 +14,7 @@ def register_leaderboard_callbacks(dash_app):
             Output("workout-leaderboard", "data"),
             Output("calories-leaderboard", "data"),
             Output("distance-leaderboard", "data"),
+            Output("leaderboard-refreshed-at", "children"),
         ],
         [
             Input("steps-timeframe", "value"),
@@ -24,10 +25,6 @@ def register_leaderboard_callbacks(dash_app):
     )
     def update_leaderboards(*timeframes):
        
-        metrics = [
-            "latest_steps_taken",
-            "latest_workout_sessions",
-            "latest_calories_burned",
-            "latest_distance_walked",
-        ]
-        return [fetch_leaderboard(metric, tf) for metric, tf in zip(metrics, timeframes)]
+        #Served from the precomputed snapshot (same order as the outputs above)
+        boards = [get_leaderboard(metric, tf) for metric, tf in zip(LEADERBOARD_METRICS, timeframes)]
+        return boards + [describe_leaderboard_age()]
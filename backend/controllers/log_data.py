@@ -3,20 +3,11 @@ import dash
 from dash import dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
 
-#Models and Database 
-from models.user import User
-from models.patient import Patient
-from models.challenge import Challenge
-from models import db
-
 #Services 
+from services.identity_service import resolve_patient
 from services.log_data_service import fetch_metric_history
 from services.user_service import METRIC_LABELS
-from services.challenge_service import (
-    update_challenge_progress,
-    get_cumulative_metric,
-    challenge_to_metric
-)
+from services.metric_log_service import log_metric_value
 
 
 #Callback Registration 
@@ -44,12 +35,10 @@ def register_log_data_callbacks(dash_app):
         if not username:
             return "User not found.", dash.no_update
 
-        user = User.query.filter_by(username=username).first()
-        if not user or not user.patient:
+        patient = resolve_patient(username)
+        if not patient:
             return "Patient record not found.", dash.no_update
 
-        patient = user.patient
-
         #Metric Update Trigger
         if dash.callback_context.triggered_id == "update-metric-btn":
             if new_value is None:
@@ -58,14 +47,9 @@ def register_log_data_callbacks(dash_app):
                 return "Value must be greater than 0.", dash.no_update
 
             try:
-                success = patient.update_health_metric(selected_metric, float(new_value))
+                #Log, rollups, challenge progress and points in one transaction
+                success = log_metric_value(username, selected_metric, float(new_value))
                 if success:
-                    #Update all challenges related to this metric
-                    challenges = Challenge.query.all()
-                    for challenge in challenges:
-                        if challenge_to_metric(challenge.name) == selected_metric:
-                            update_challenge_progress(username, challenge.id, None)
-
                     return (
                         "Updated successfully!",
                         fetch_metric_history(patient.patient_id, selected_metric)
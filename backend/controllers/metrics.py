@@ -0,0 +1,19 @@
+from flask import Blueprint, Response, current_app, request, abort
+from services.instrumentation import render_metrics
+from services.callback_cache import render_cache_metrics
+from services.identity_service import render_identity_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+LOCAL_ADDRESSES = {"127.0.0.1", "::1"}
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    if not current_app.config.get("METRICS_ENABLED", True):
+        abort(404)
+
+    #Scraped locally; not exposed to other hosts unless METRICS_LOCAL_ONLY is turned off
+    if current_app.config.get("METRICS_LOCAL_ONLY", True) and request.remote_addr not in LOCAL_ADDRESSES:
+        abort(403)
+
+    return Response(render_metrics() + render_cache_metrics() + render_identity_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -5,8 +5,10 @@ import dash_bootstrap_components as dbc
 
 #Services 
 from services.user_service import fetch_user_data, fetch_recent_activity, update_user_data
-from services.challenge_service import fetch_challenges, fetch_patient_progress
+from services.challenge_service import fetch_challenges, refresh_patient_challenges
 from services.rewards_service import get_claimed_rewards
+from services.query_budget import query_budget
+from services.callback_cache import cached_callback
 
 
 #Callback Registration 
@@ -36,8 +38,20 @@ def register_profile_callbacks(dash_app):
         Input("active-profile-tab", "data"),
         State("username-store", "data")
     )
+    @query_budget(12)
     def render_tab(tab, username_data):
         """Render the UI for the selected profile tab."""
+        #The challenge refresh writes (progress, points), so it runs on every call, outside
+        #the cache; the rendered tab is cached on its result and the bumped data version
+        progress_by_challenge = None
+        if tab == "overview" and username_data and "username" in username_data:
+            progress_by_challenge = refresh_patient_challenges(username_data["username"])
+
+        return render_profile_tab(tab, username_data, progress_by_challenge)
+
+    @cached_callback(catalogs=("challenges",))
+    def render_profile_tab(tab, username_data, progress_by_challenge):
+        """Builds the selected tab (read-only; progress comes from render_tab)."""
         if not username_data or "username" not in username_data:
             return html.Div("User not found")
 
@@ -52,7 +66,7 @@ def register_profile_callbacks(dash_app):
 
             challenge_progress_display = []
             for ch in daily_challenges:
-                progress = fetch_patient_progress(username, ch["id"])
+                progress = progress_by_challenge.get(ch["id"], 0)
                 if progress >= ch["goal"]:
                     display = f"✅ {ch['name']} – Completed"
                 else:
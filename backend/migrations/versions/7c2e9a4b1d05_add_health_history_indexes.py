@@ -0,0 +1,38 @@
+"""Add composite indexes to health_history
+
+Revision ID: 7c2e9a4b1d05
+Revises: 3544c6f3ac3c
+Create Date: 2026-10-18 09:12:44.218730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e9a4b1d05'
+down_revision = '3544c6f3ac3c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_health_history_patient_metric_time',
+        'health_history',
+        ['patient_id', 'metric_name', 'recorded_at', 'value'],
+        unique=False,
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_health_history_metric_time',
+        'health_history',
+        ['metric_name', 'recorded_at', 'patient_id', 'value'],
+        unique=False,
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_health_history_metric_time', table_name='health_history', if_exists=True)
+    op.drop_index('ix_health_history_patient_metric_time', table_name='health_history', if_exists=True)
@@ -0,0 +1,40 @@
+"""Add metric_daily_rollups table
+
+Revision ID: a41f6d8c2b37
+Revises: 7c2e9a4b1d05
+Create Date: 2026-10-18 10:03:17.550921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f6d8c2b37'
+down_revision = '7c2e9a4b1d05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('metric_daily_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('metric_name', sa.String(length=100), nullable=False),
+    sa.Column('local_date', sa.Date(), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.Column('total_value', sa.Float(), nullable=False),
+    sa.Column('min_value', sa.Float(), nullable=True),
+    sa.Column('max_value', sa.Float(), nullable=True),
+    sa.Column('first_value', sa.Float(), nullable=True),
+    sa.Column('first_recorded_at', sa.DateTime(), nullable=True),
+    sa.Column('last_value', sa.Float(), nullable=True),
+    sa.Column('last_recorded_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.patient_id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('patient_id', 'metric_name', 'local_date', name='uq_patient_metric_day')
+    )
+
+
+def downgrade():
+    op.drop_table('metric_daily_rollups')
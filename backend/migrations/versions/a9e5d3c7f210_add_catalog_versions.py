@@ -0,0 +1,29 @@
+"""Add catalog_versions table
+
+Revision ID: a9e5d3c7f210
+Revises: f1c4b7e2a9d3
+Create Date: 2026-10-18 16:40:12.284519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e5d3c7f210'
+down_revision = 'f1c4b7e2a9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_versions')
@@ -0,0 +1,35 @@
+"""Add claimed_at and claimed_by to notification_outbox
+
+Revision ID: b1d7f3a5c802
+Revises: a9e5d3c7f210
+Create Date: 2026-10-19 09:12:05.661392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1d7f3a5c802'
+down_revision = 'a9e5d3c7f210'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    #The app adds these columns at startup on create_all() databases (services/schema_service.py)
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('notification_outbox')}
+    if 'claimed_at' in columns and 'claimed_by' in columns:
+        return
+
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        if 'claimed_at' not in columns:
+            batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+        if 'claimed_by' not in columns:
+            batch_op.add_column(sa.Column('claimed_by', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_column('claimed_by')
+        batch_op.drop_column('claimed_at')
@@ -0,0 +1,43 @@
+"""Add notification_outbox table
+
+Revision ID: b83d5f0e9c14
+Revises: a41f6d8c2b37
+Create Date: 2026-10-18 11:42:05.118304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83d5f0e9c14'
+down_revision = 'a41f6d8c2b37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('channel', sa.String(length=10), nullable=False),
+    sa.Column('recipient', sa.String(length=120), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('latency_ms', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_outbox_due', ['status', 'next_attempt_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_outbox_due')
+
+    op.drop_table('notification_outbox')
@@ -0,0 +1,31 @@
+"""Add patient_log_streaks table
+
+Revision ID: c5e1a7d3f260
+Revises: b83d5f0e9c14
+Create Date: 2026-10-18 12:26:41.803517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1a7d3f260'
+down_revision = 'b83d5f0e9c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('patient_log_streaks',
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('current_streak', sa.Integer(), nullable=False),
+    sa.Column('longest_streak', sa.Integer(), nullable=False),
+    sa.Column('last_logged_date', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.patient_id'], ),
+    sa.PrimaryKeyConstraint('patient_id')
+    )
+
+
+def downgrade():
+    op.drop_table('patient_log_streaks')
@@ -0,0 +1,30 @@
+"""Add patient_data_versions table
+
+Revision ID: d2f8b6a4c913
+Revises: c5e1a7d3f260
+Create Date: 2026-10-18 13:41:09.226184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f8b6a4c913'
+down_revision = 'c5e1a7d3f260'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('patient_data_versions',
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.patient_id'], ),
+    sa.PrimaryKeyConstraint('patient_id')
+    )
+
+
+def downgrade():
+    op.drop_table('patient_data_versions')
@@ -0,0 +1,31 @@
+"""Add period_start to patient_challenge
+
+Revision ID: e7a3c9d1f482
+Revises: d2f8b6a4c913
+Create Date: 2026-10-18 14:02:37.518340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c9d1f482'
+down_revision = 'd2f8b6a4c913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    #The app adds this column at startup on create_all() databases (services/schema_service.py)
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('patient_challenge')}
+    if 'period_start' in columns:
+        return
+
+    with op.batch_alter_table('patient_challenge', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('period_start', sa.Date(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('patient_challenge', schema=None) as batch_op:
+        batch_op.drop_column('period_start')
@@ -0,0 +1,56 @@
+"""Add metric_name and aggregation to challenges
+
+Revision ID: f1c4b7e2a9d3
+Revises: e7a3c9d1f482
+Create Date: 2026-10-18 15:21:44.107263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c4b7e2a9d3'
+down_revision = 'e7a3c9d1f482'
+branch_labels = None
+depends_on = None
+
+#The name -> metric mapping previously hardcoded in challenge_service.challenge_to_metric
+SEEDED_BINDINGS = {
+    "Daily Steps": ("latest_steps_taken", "sum"),
+    "Daily Calories Burned": ("latest_calories_burned", "sum"),
+    "Daily Active Time": ("latest_active_minutes", "sum"),
+    "Daily Hydration": ("latest_water_intake", "sum"),
+    "Weekly Steps": ("latest_steps_taken", "sum"),
+    "Weekly Calories Burned": ("latest_calories_burned", "sum"),
+    "Weekly Distance Walked": ("latest_distance_walked", "sum"),
+    "Weekly Running Distance": ("latest_distance_ran", "sum"),
+    "Monthly Steps": ("latest_steps_taken", "sum"),
+    "Monthly Calories Burned": ("latest_calories_burned", "sum"),
+    "Monthly Weight Loss": ("latest_weight", "change"),
+    "Monthly Fiber Intake": ("latest_fiber_intake", "sum"),
+}
+
+
+def upgrade():
+    #The app adds these columns at startup on create_all() databases (services/schema_service.py)
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('challenges')}
+    if 'metric_name' not in columns or 'aggregation' not in columns:
+        with op.batch_alter_table('challenges', schema=None) as batch_op:
+            if 'metric_name' not in columns:
+                batch_op.add_column(sa.Column('metric_name', sa.String(length=100), nullable=True))
+            if 'aggregation' not in columns:
+                batch_op.add_column(sa.Column('aggregation', sa.String(length=10), server_default='sum', nullable=False))
+
+    for name, (metric_name, aggregation) in SEEDED_BINDINGS.items():
+        op.execute(
+            sa.text("UPDATE challenges SET metric_name = :metric_name, aggregation = :aggregation "
+                    "WHERE name = :name AND metric_name IS NULL")
+            .bindparams(metric_name=metric_name, aggregation=aggregation, name=name)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.drop_column('aggregation')
+        batch_op.drop_column('metric_name')
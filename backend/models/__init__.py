@@ -9,3 +9,10 @@ from .patientChallenge import PatientChallenge
 from .challenge import Challenge
 from .patient import Patient
 from .health_history import HealthHistory  
+from .patientGoal import PatientGoal
+from .patientReward import PatientReward
+from .metric_rollup import MetricDailyRollup
+from .notification_outbox import NotificationOutbox
+from .log_streak import PatientLogStreak
+from .data_version import PatientDataVersion
+from .catalog_version import CatalogVersion
@@ -0,0 +1,43 @@
+#Imports
+from datetime import datetime
+from sqlalchemy import insert, update
+from models import db
+
+
+#CatalogVersion Model
+class CatalogVersion(db.Model):
+
+    __tablename__ = "catalog_versions"
+
+    #Columns
+    #One row per shared catalog, e.g. "challenges" (no row = version 0).
+    name = db.Column(db.String(50), primary_key=True)
+    #Bumped whenever the catalog's table changes, so every process can tell its copy is stale.
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CatalogVersion(name={self.name}, version={self.version})>"
+
+    #Methods
+    @classmethod
+    def bump(cls, connection, name):
+        """
+        Increments the catalog's version on the given connection (SQL increment, row
+        created if needed). Called from flush events, so it lands in the transaction
+        that changed the catalog.
+        """
+        table = cls.__table__
+        result = connection.execute(
+            update(table)
+            .where(table.c.name == name)
+            .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1, updated_at=datetime.utcnow()))
+
+    @classmethod
+    def current(cls, name):
+        """The catalog's version, read from the database (0 if never bumped)."""
+        version = db.session.query(cls.version).filter_by(name=name).scalar()
+        return version or 0
@@ -1,6 +1,10 @@
 from models import db
 from models.patientChallenge import PatientChallenge
 
+#How a challenge scores its metric over the period: total of the logged values, or net
+#change from the period's first value to the latest one (e.g. weight loss)
+AGGREGATION_MODES = ("sum", "change")
+
 class Challenge(db.Model):
 
     __tablename__ = "challenges"
@@ -11,6 +15,8 @@ class Challenge(db.Model):
     challenge_type = db.Column(db.String(10), nullable=False)
     goal = db.Column(db.Integer, nullable=False)
     reward_points = db.Column(db.Integer, nullable=False)
+    metric_name = db.Column(db.String(100))  #Health metric the challenge tracks (e.g. latest_steps_taken)
+    aggregation = db.Column(db.String(10), nullable=False, default="sum", server_default="sum")  #One of AGGREGATION_MODES
 
     #Relationship to track which users are participating in this challenge.
     participants = db.relationship("PatientChallenge", back_populates="challenge")
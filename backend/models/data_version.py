@@ -0,0 +1,77 @@
+#Imports
+from datetime import datetime
+from models import db
+from models.upsert import on_conflict_insert, get_or_create
+
+
+#PatientDataVersion Model
+class PatientDataVersion(db.Model):
+
+    __tablename__ = "patient_data_versions"
+
+    #Columns
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.patient_id"), primary_key=True)
+    #One row per patient (no row = version 0).
+    version = db.Column(db.Integer, nullable=False, default=0)
+    #Bumped by every write that changes what the dashboard shows for the patient.
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PatientDataVersion(patient_id={self.patient_id}, version={self.version})>"
+
+    #Methods
+    @classmethod
+    def bump(cls, patient_id):
+        """
+        Increments the patient's data version, creating the row if needed.
+        One INSERT ... ON CONFLICT DO UPDATE SET version = version + 1, so concurrent
+        workers never hand out the same version and two first writes do not collide.
+        Does not commit: the caller's write and the bump land in the same transaction.
+        """
+        now = datetime.utcnow()
+        statement = on_conflict_insert(
+            cls.__table__, {"patient_id": patient_id, "version": 1, "updated_at": now}, ["patient_id"],
+            set_={"version": cls.__table__.c.version + 1, "updated_at": now}
+        )
+        if statement is not None:
+            db.session.execute(statement)
+            return
+
+        row = get_or_create(cls, {"patient_id": patient_id}, version=0, updated_at=now)
+        row.version = cls.version + 1
+        row.updated_at = now
+
+    @classmethod
+    def bump_many(cls, patient_ids, chunk_size=500):
+        """
+        bump() for many patients (batch jobs): one multi-row upsert per chunk, or where
+        ON CONFLICT is unavailable, one read for the existing rows and one SQL increment
+        for them, with missing rows created at version 1. Does not commit.
+        """
+        patient_ids = sorted(set(patient_ids))
+        now = datetime.utcnow()
+        for start in range(0, len(patient_ids), chunk_size):
+            chunk = patient_ids[start:start + chunk_size]
+            statement = on_conflict_insert(
+                cls.__table__, [{"patient_id": patient_id, "version": 1, "updated_at": now} for patient_id in chunk],
+                ["patient_id"], set_={"version": cls.__table__.c.version + 1, "updated_at": now}
+            )
+            if statement is not None:
+                db.session.execute(statement)
+                continue
+
+            existing = {row.patient_id for row in db.session.query(cls.patient_id).filter(cls.patient_id.in_(chunk))}
+            if existing:
+                db.session.query(cls).filter(cls.patient_id.in_(existing)).update(
+                    {cls.version: cls.version + 1, cls.updated_at: now},
+                    synchronize_session=False
+                )
+            for patient_id in chunk:
+                if patient_id not in existing:
+                    db.session.add(cls(patient_id=patient_id, version=1, updated_at=now))
+
+    @classmethod
+    def current(cls, patient_id):
+        """The patient's data version, read from the database (0 if never bumped)."""
+        version = db.session.query(cls.version).filter_by(patient_id=patient_id).scalar()
+        return version or 0
@@ -11,5 +11,13 @@ class HealthHistory(db.Model):
     value = db.Column(db.Float, nullable=False)
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        #Per-patient metric windows (history, summaries, challenges, goals).
+        #value is included so SUM/first/last reads never touch the table.
+        db.Index('ix_health_history_patient_metric_time', 'patient_id', 'metric_name', 'recorded_at', 'value'),
+        #Cross-patient metric windows (leaderboards).
+        db.Index('ix_health_history_metric_time', 'metric_name', 'recorded_at', 'patient_id', 'value'),
+    )
+
     def __repr__(self):
         return f'<HealthHistory(patient_id={self.patient_id}, metric_name={self.metric_name}, value={self.value}, recorded_at={self.recorded_at})>'
@@ -0,0 +1,57 @@
+#Imports
+from datetime import timedelta
+from models import db
+from models.upsert import get_or_create
+
+
+#PatientLogStreak Model
+class PatientLogStreak(db.Model):
+
+    __tablename__ = "patient_log_streaks"
+
+    #Columns
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.patient_id"), primary_key=True)
+    #One row per patient.
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+    #Consecutive UK days logged, ending on last_logged_date.
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_logged_date = db.Column(db.Date)
+    #UK calendar day of the most recent log.
+
+    def __repr__(self):
+        return f"<PatientLogStreak(patient_id={self.patient_id}, current={self.current_streak}, longest={self.longest_streak}, last={self.last_logged_date})>"
+
+    #Methods
+    def add_log_date(self, local_date):
+        """Advances the streak for a log on local_date. Logs older than the last one are ignored."""
+        last = self.last_logged_date
+
+        if last is None or local_date > last + timedelta(days=1):
+            self.current_streak = 1
+        elif local_date == last + timedelta(days=1):
+            self.current_streak = (self.current_streak or 0) + 1
+        else:
+            return  #Same day (or an older date) does not change the streak
+
+        self.last_logged_date = local_date
+        self.longest_streak = max(self.longest_streak or 0, self.current_streak)
+
+    def streak_on(self, today):
+        """Streak shown on `today`: it only counts while the patient has logged today."""
+        if self.last_logged_date == today:
+            return self.current_streak
+        return 0
+
+    @classmethod
+    def record(cls, patient_id, local_date):
+        """
+        Folds a log into the patient's streak, creating the row if needed (a concurrent
+        first log does not conflict).
+        Does not commit, so the caller's transaction covers both the log and the streak.
+        """
+        streak = db.session.get(cls, patient_id)
+        if not streak:
+            streak = get_or_create(cls, {"patient_id": patient_id}, current_streak=0, longest_streak=0)
+
+        streak.add_log_date(local_date)
+        return streak
@@ -0,0 +1,82 @@
+#Imports
+from models import db
+from models.upsert import get_or_create
+
+
+#MetricDailyRollup Model
+class MetricDailyRollup(db.Model):
+
+    __tablename__ = "metric_daily_rollups"
+
+    #Columns
+    id = db.Column(db.Integer, primary_key=True)
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.patient_id"), nullable=False)
+    metric_name = db.Column(db.String(100), nullable=False)
+    local_date = db.Column(db.Date, nullable=False)
+    #UK calendar day the bucket covers.
+
+    entry_count = db.Column(db.Integer, nullable=False, default=0)
+    total_value = db.Column(db.Float, nullable=False, default=0)
+    min_value = db.Column(db.Float)
+    max_value = db.Column(db.Float)
+
+    first_value = db.Column(db.Float)
+    first_recorded_at = db.Column(db.DateTime)
+    last_value = db.Column(db.Float)
+    last_recorded_at = db.Column(db.DateTime)
+    #Earliest and latest entries of the day (used by "change" metrics).
+
+    __table_args__ = (
+        db.UniqueConstraint("patient_id", "metric_name", "local_date", name="uq_patient_metric_day"),
+    )
+    #One bucket per patient, metric and day; the constraint also indexes window reads.
+
+    def __repr__(self):
+        return f"<MetricDailyRollup(patient_id={self.patient_id}, metric='{self.metric_name}', date={self.local_date}, count={self.entry_count})>"
+
+    #Methods
+    def add_entry(self, value, recorded_at):
+        """Folds one logged value into the bucket."""
+        self.entry_count = (self.entry_count or 0) + 1
+        self.total_value = (self.total_value or 0) + value
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_value = value if self.max_value is None else max(self.max_value, value)
+
+        if self.first_recorded_at is None or recorded_at < self.first_recorded_at:
+            self.first_value = value
+            self.first_recorded_at = recorded_at
+
+        if self.last_recorded_at is None or recorded_at >= self.last_recorded_at:
+            self.last_value = value
+            self.last_recorded_at = recorded_at
+
+    def add_summary(self, count, total, min_value, max_value, first_value, first_recorded_at, last_value, last_recorded_at):
+        """Folds a pre-aggregated group of values into the bucket (same result as add_entry per value)."""
+        self.entry_count = (self.entry_count or 0) + count
+        self.total_value = (self.total_value or 0) + total
+        self.min_value = min_value if self.min_value is None else min(self.min_value, min_value)
+        self.max_value = max_value if self.max_value is None else max(self.max_value, max_value)
+
+        if self.first_recorded_at is None or first_recorded_at < self.first_recorded_at:
+            self.first_value = first_value
+            self.first_recorded_at = first_recorded_at
+
+        if self.last_recorded_at is None or last_recorded_at >= self.last_recorded_at:
+            self.last_value = last_value
+            self.last_recorded_at = last_recorded_at
+
+    @classmethod
+    def record(cls, patient_id, metric_name, local_date, value, recorded_at):
+        """
+        Adds a value to the patient's bucket for that day, creating it if needed (a
+        concurrent first write to the same bucket does not conflict).
+        Does not commit, so the caller's transaction covers both the log and the rollup.
+        """
+        bucket = get_or_create(
+            cls,
+            {"patient_id": patient_id, "metric_name": metric_name, "local_date": local_date},
+            entry_count=0,
+            total_value=0
+        )
+        bucket.add_entry(value, recorded_at)
+        return bucket
@@ -0,0 +1,41 @@
+#Imports
+from datetime import datetime
+from models import db
+
+
+#NotificationOutbox Model
+class NotificationOutbox(db.Model):
+
+    __tablename__ = "notification_outbox"
+
+    #Columns
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(10), nullable=False)
+    #"email" or "sms".
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200))
+    #Only used by emails.
+    body = db.Column(db.Text, nullable=False)
+
+    status = db.Column(db.String(10), nullable=False, default="pending")
+    #pending -> sending -> sent, or failed once every attempt is used up.
+    claimed_at = db.Column(db.DateTime)
+    claimed_by = db.Column(db.String(32))
+    #Lease on a "sending" message: the worker run that claimed it and when. Only an
+    #expired lease is put back in the queue, and only the lease holder records the outcome.
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    latency_ms = db.Column(db.Float)
+    #Time from queueing to delivery.
+
+    __table_args__ = (
+        db.Index("ix_notification_outbox_due", "status", "next_attempt_at", "id"),
+    )
+    #The worker only ever reads due, pending messages in id order.
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, channel='{self.channel}', status='{self.status}', attempts={self.attempts})>"
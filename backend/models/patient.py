@@ -1,6 +1,11 @@
 #Imports
+from datetime import datetime
 from models import db
 from models.health_history import HealthHistory  
+from models.metric_rollup import MetricDailyRollup
+from models.log_streak import PatientLogStreak
+from models.data_version import PatientDataVersion
+from services.period_utils import to_local_date
 
 
 #Patient Model
@@ -105,20 +110,43 @@ class Patient(db.Model):
         return f'<Patient(id={self.patient_id}, name={self.first_name} {self.last_name})>'
 
     #Methods 
-    def update_health_metric(self, metric_name, new_value):
-
-        previous_value = getattr(self, metric_name, "N/A")
+    def update_health_metric(self, metric_name, new_value, commit=True):
+        """
+        Logs a value with its rollup, streak, latest_* and data version updates, then
+        fires the metric-logged event (challenge progress and completion points).
+        commit=False leaves the transaction open for the caller to commit; the caller
+        then marks the leaderboard dirty.
+        """
+        recorded_at = datetime.utcnow()
 
         #Create a historical log entry
         history_entry = HealthHistory(
             patient_id=self.patient_id,
             metric_name=metric_name,
-            value=new_value
+            value=new_value,
+            recorded_at=recorded_at
         )
         db.session.add(history_entry)
 
+        #Fold the value into today's rollup bucket and the log streak (same transaction)
+        local_date = to_local_date(recorded_at)
+        MetricDailyRollup.record(self.patient_id, metric_name, local_date, new_value, recorded_at)
+        PatientLogStreak.record(self.patient_id, local_date)
+
         #Update the "latest_" field on the patient model
         setattr(self, metric_name, new_value)
+        PatientDataVersion.bump(self.patient_id)
+
+        #Imported here because the challenge services import this model
+        from services.challenge_events import dispatch_metric_logged
+        dispatch_metric_logged(self, metric_name, new_value, recorded_at)
+
+        if not commit:
+            return True
         db.session.commit()
 
+        #Imported here because the leaderboard service imports this model
+        from services.leaderboard_service import mark_leaderboard_dirty
+        mark_leaderboard_dirty(metric_name)
+
         return True
@@ -8,6 +8,7 @@ class PatientChallenge(db.Model):
     challenge_id = db.Column(db.Integer, db.ForeignKey("challenges.id"), nullable=False)
     progress = db.Column(db.Integer, default=0)
     completed = db.Column(db.Boolean, default=False)
+    period_start = db.Column(db.Date)  #First UK date of the challenge period `progress` belongs to (None = recompute on next log)
 
     patient = db.relationship("Patient", back_populates="challenges")
     challenge = db.relationship("Challenge", back_populates="participants")
@@ -0,0 +1,57 @@
+#Imports
+from sqlalchemy.exc import IntegrityError
+from models import db
+
+
+#Concurrent-safe Row Creation
+#Per-patient rows (data versions, day rollups, log streaks) are created by the first
+#write that needs them. Reading first and inserting when nothing was found lets two
+#concurrent first writes both insert, and the loser's whole transaction fails with an
+#IntegrityError. These helpers make the insert itself tolerate the conflict:
+#INSERT ... ON CONFLICT on SQLite and PostgreSQL, a savepoint per row elsewhere.
+
+
+def on_conflict_insert(table, values, index_elements, set_=None):
+    """
+    INSERT ... ON CONFLICT (index_elements) DO NOTHING, or DO UPDATE SET set_.
+    values is one dict or a list of them. Returns None on dialects without ON CONFLICT.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+
+    statement = insert(table).values(values)
+    if set_:
+        return statement.on_conflict_do_update(index_elements=index_elements, set_=set_)
+    return statement.on_conflict_do_nothing(index_elements=index_elements)
+
+
+def insert_missing(model, rows, key_columns):
+    """Inserts the rows (dicts) whose key is not taken yet, in the caller's transaction."""
+    if not rows:
+        return
+
+    statement = on_conflict_insert(model.__table__, rows, key_columns)
+    if statement is not None:
+        db.session.execute(statement)
+        return
+
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.add(model(**row))
+        except IntegrityError:
+            pass  #Created by a concurrent writer
+
+
+def get_or_create(model, key, **defaults):
+    """The row with this key (dict of unique columns), created with defaults if missing."""
+    row = model.query.filter_by(**key).first()
+    if row is None:
+        insert_missing(model, [{**key, **defaults}], list(key))
+        row = model.query.filter_by(**key).one()
+    return row
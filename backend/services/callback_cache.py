@@ -0,0 +1,311 @@
+#Imports
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from functools import wraps
+from flask import current_app, has_app_context
+from models.data_version import PatientDataVersion
+from models.catalog_version import CatalogVersion
+from services.identity_service import resolve_patient_id
+from services.challenge_catalog import get_challenge_catalog
+from services.period_utils import UK_TZ
+
+
+#Callback Output Cache
+#Dash callbacks that only depend on one patient's data are cached under
+#(callback, username, args, patient data version, catalog versions, UK date):
+# - the data version is bumped in the same transaction as every write that changes
+#   what those callbacks show, so a write makes the old entries unreachable
+# - callbacks that also render a shared catalog name it (catalogs=("challenges",)),
+#   and the version of that catalog joins the key, so an admin edit does the same
+# - the UK date keeps day-window views ("today", "this week") from outliving midnight
+#Backends: "memory" (per-process LRU) or "disk" (SQLite file shared by all workers).
+#CALLBACK_CACHE_BACKEND = "off" disables caching.
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_TTL_SECONDS = 300
+MISSING = object()
+
+
+class CacheStats:
+    """Hit/miss counters per callback (kept per process, whichever backend is used)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.by_callback = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def record(self, callback, hit):
+        with self._lock:
+            self.by_callback[callback]["hits" if hit else "misses"] += 1
+
+    def add(self, field, count=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + count)
+
+    def snapshot(self):
+        with self._lock:
+            callbacks = {name: dict(counts) for name, counts in self.by_callback.items()}
+            hits = sum(counts["hits"] for counts in callbacks.values())
+            lookups = hits + sum(counts["misses"] for counts in callbacks.values())
+            return {
+                "hits": hits,
+                "misses": lookups - hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "callbacks": callbacks,
+            }
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, stats, max_entries=DEFAULT_CACHE_SIZE):
+        self.stats = stats
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.stats.add("expirations")
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self.stats.add("stores")
+        if evicted:
+            self.stats.add("evictions", evicted)
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCacheBackend:
+    """
+    Pickled entries in a SQLite file, shared by every worker process on the host.
+    Least recently read entries are evicted once the table exceeds max_entries.
+    """
+
+    name = "disk"
+
+    def __init__(self, stats, path, max_entries=DEFAULT_CACHE_SIZE):
+        self.stats = stats
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS callback_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_callback_cache_accessed ON callback_cache (accessed_at)")
+
+    def _connect(self):
+        #One connection per thread and process (a forked worker opens its own)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT value, expires_at FROM callback_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return MISSING
+        value, expires_at = row
+        now = time.time()
+        if expires_at < now:
+            conn.execute("DELETE FROM callback_cache WHERE key = ?", (key,))
+            self.stats.add("expirations")
+            return MISSING
+        conn.execute("UPDATE callback_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return pickle.loads(value)
+
+    def set(self, key, value, ttl_seconds):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO callback_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now + ttl_seconds, now)
+        )
+        self.stats.add("stores")
+
+        overflow = self.size() - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM callback_cache WHERE key IN "
+                "(SELECT key FROM callback_cache ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+            self.stats.add("evictions", overflow)
+
+    def size(self):
+        return self._connect().execute("SELECT COUNT(*) FROM callback_cache").fetchone()[0]
+
+    def clear(self):
+        self._connect().execute("DELETE FROM callback_cache")
+
+
+#Cache Set-up
+
+cache_stats = CacheStats()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def build_backend(config):
+    kind = config.get("CALLBACK_CACHE_BACKEND", "memory")
+    size = config.get("CALLBACK_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+    if kind == "off":
+        return None
+    if kind == "memory":
+        return MemoryCacheBackend(cache_stats, size)
+    if kind == "disk":
+        path = config.get("CALLBACK_CACHE_PATH") or os.path.join(current_app.instance_path, "callback_cache.db")
+        return DiskCacheBackend(cache_stats, path, size)
+    raise ValueError(f"Invalid callback cache backend: {kind}. Valid options: memory, disk, off.")
+
+
+def get_backend():
+    """The configured backend (built on first use), or None when caching is off."""
+    global _backend
+    if _backend is None and has_app_context():
+        with _backend_lock:
+            if _backend is None:
+                _backend = build_backend(current_app.config) or False
+    return _backend or None
+
+
+def reset_callback_cache():
+    """Drops the backend (the next call rebuilds it from config) and the stats."""
+    global _backend
+    with _backend_lock:
+        if _backend:
+            _backend.clear()
+        _backend = None
+    cache_stats.reset()
+
+
+def callback_cache_stats():
+    stats = cache_stats.snapshot()
+    backend = get_backend()
+    stats["backend"] = backend.name if backend else "off"
+    stats["size"] = backend.size() if backend else 0
+    return stats
+
+
+def render_cache_metrics():
+    """Cache counters in the Prometheus text format (appended to /metrics)."""
+    stats = cache_stats.snapshot()
+    lines = []
+    for field in ("hits", "misses"):
+        metric = f"glucotrack_callback_cache_{field}_total"
+        lines += [f"# HELP {metric} Callback cache {field}.", f"# TYPE {metric} counter"]
+        for callback, counts in sorted(stats["callbacks"].items()):
+            lines.append(f'{metric}{{callback="{callback}"}} {counts[field]}')
+    for field in ("stores", "evictions", "expirations"):
+        metric = f"glucotrack_callback_cache_{field}_total"
+        lines += [f"# HELP {metric} Callback cache {field}.", f"# TYPE {metric} counter", f"{metric} {stats[field]}"]
+    return "\n".join(lines) + "\n"
+
+
+#Keys and Decorator
+
+def username_from_args(args):
+    """Callbacks receive the username-store data ({"username": ...}) as one of their arguments."""
+    for arg in args:
+        if isinstance(arg, dict) and arg.get("username"):
+            return arg["username"]
+    return None
+
+
+def catalog_version(name):
+    """
+    Version of the catalog data this process renders. For challenges that is the
+    in-process snapshot's version (it trails CatalogVersion by at most one check
+    interval), so output built from an old snapshot is never stored under a new version.
+    """
+    if name == "challenges":
+        return get_challenge_catalog().version
+    return CatalogVersion.current(name)
+
+
+def make_key(callback, username, args, version, local_date, catalog_versions=()):
+    encoded_args = json.dumps(args, sort_keys=True, default=str)
+    digest = hashlib.sha1(encoded_args.encode("utf-8")).hexdigest()
+    catalogs = ",".join(f"{name}={catalog}" for name, catalog in catalog_versions)
+    return f"{callback}:{username}:{version}:{catalogs}:{local_date.isoformat()}:{digest}"
+
+
+def cached_callback(func=None, catalogs=()):
+    """
+    Caches a per-patient Dash callback's output (see module notes). Use as
+    @cached_callback, or @cached_callback(catalogs=("challenges",)) when the output
+    also shows catalog data.
+    """
+    if func is None:
+        return lambda func: cached_callback(func, catalogs)
+    name = func.__name__
+
+    @wraps(func)
+    def cached(*args):
+        backend = get_backend()
+        username = username_from_args(args) if backend else None
+        patient_id = resolve_patient_id(username) if username else None
+        if not patient_id:
+            return func(*args)
+
+        version = PatientDataVersion.current(patient_id)
+        catalog_versions = [(catalog, catalog_version(catalog)) for catalog in catalogs]
+        key = make_key(name, username, args, version, datetime.now(UK_TZ).date(), catalog_versions)
+
+        value = backend.get(key)
+        cache_stats.record(name, hit=value is not MISSING)
+        if value is not MISSING:
+            return value
+
+        value = func(*args)
+        #dash.no_update is a signal to the renderer, not an output
+        if type(value).__name__ != "NoUpdate":
+            backend.set(key, value, current_app.config.get("CALLBACK_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        return value
+
+    return cached
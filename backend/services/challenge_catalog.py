@@ -0,0 +1,164 @@
+#Imports
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from types import MappingProxyType
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from models.challenge import Challenge, AGGREGATION_MODES
+from models.catalog_version import CatalogVersion
+from services.period_utils import UK_TZ, get_period_dates
+
+
+#Challenge Catalog
+#The challenges table is small and changes only when challenges are seeded or edited,
+#so each process holds an immutable snapshot of it: plain tuples indexed by metric and
+#by (metric, period), read-only records for the UI and the current period windows.
+#Snapshots carry the "challenges" CatalogVersion they were built from:
+# - a flush that inserts/updates/deletes a Challenge bumps that version in the same
+#   transaction, and the committing process drops its snapshot straight away
+# - other processes compare versions at most every CHALLENGE_CATALOG_CHECK_SECONDS
+#   and rebuild only when it moved
+#The period windows are re-dated at UK midnight without touching the database.
+#The challenge reconciliation job drops the snapshot too, which picks up edits made
+#outside the ORM.
+
+CATALOG_NAME = "challenges"
+PERIODS = ("daily", "weekly", "monthly")
+DEFAULT_CHECK_SECONDS = 30
+
+ChallengeRef = namedtuple(
+    "ChallengeRef",
+    ["id", "name", "description", "challenge_type", "goal", "reward_points", "metric_name", "aggregation"]
+)
+
+
+class ChallengeCatalog:
+    """Immutable snapshot of the challenges table at one version, dated for one UK day."""
+
+    def __init__(self, challenges, version, today):
+        self.challenges = tuple(sorted(challenges, key=lambda ref: ref.id))
+        self.version = version
+        self.today = today
+        self.windows = MappingProxyType({period: get_period_dates(period, today) for period in PERIODS})
+
+        #What fetch_challenges hands to the UI (read-only, shared between callers)
+        self.records = tuple(MappingProxyType(ref._asdict()) for ref in self.challenges)
+        self.by_id = MappingProxyType({ref.id: ref for ref in self.challenges})
+
+        by_metric, by_metric_period = {}, {}
+        for ref in self.challenges:
+            if not ref.metric_name:
+                continue
+            if ref.aggregation not in AGGREGATION_MODES:
+                print(f"[ERROR] Challenge '{ref.name}' has unknown aggregation '{ref.aggregation}'. Skipping.")
+                continue
+            by_metric.setdefault(ref.metric_name, []).append(ref)
+            by_metric_period.setdefault((ref.metric_name, ref.challenge_type), []).append(ref)
+
+        self.by_metric = MappingProxyType({key: tuple(refs) for key, refs in by_metric.items()})
+        self.by_metric_period = MappingProxyType({key: tuple(refs) for key, refs in by_metric_period.items()})
+
+    @classmethod
+    def from_rows(cls, challenges, version, today):
+        refs = [
+            ChallengeRef(ch.id, ch.name, ch.description, ch.challenge_type, ch.goal,
+                         ch.reward_points, ch.metric_name, ch.aggregation)
+            for ch in challenges
+        ]
+        return cls(refs, version, today)
+
+    def on_day(self, today):
+        """The same challenges with windows for another day."""
+        return ChallengeCatalog(self.challenges, self.version, today)
+
+    def window(self, period, today=None):
+        """(start_date, end_date) of the period containing today (precomputed for the snapshot's day)."""
+        if today is None or today == self.today:
+            return self.windows[period]
+        return get_period_dates(period, today)
+
+    def for_metric(self, metric_name):
+        return self.by_metric.get(metric_name, ())
+
+    def for_metric_period(self, metric_name, period):
+        return self.by_metric_period.get((metric_name, period), ())
+
+    def for_metrics(self, metric_names):
+        return tuple(ref for metric_name in sorted(set(metric_names)) for ref in self.for_metric(metric_name))
+
+
+_catalog = None
+_checked_at = 0.0
+_catalog_lock = threading.Lock()
+
+
+def check_interval():
+    if has_app_context():
+        return current_app.config.get("CHALLENGE_CATALOG_CHECK_SECONDS", DEFAULT_CHECK_SECONDS)
+    return DEFAULT_CHECK_SECONDS
+
+
+def get_challenge_catalog():
+    """
+    The process-wide snapshot. Between version checks this is a date comparison and
+    nothing else; a check costs one primary-key read, and a rebuild one table read.
+    """
+    global _catalog, _checked_at
+    today = datetime.now(UK_TZ).date()
+    catalog = _catalog
+
+    if catalog is not None and time.monotonic() - _checked_at < check_interval():
+        if catalog.today != today:
+            catalog = _catalog = catalog.on_day(today)
+        return catalog
+
+    with _catalog_lock:
+        version = CatalogVersion.current(CATALOG_NAME)
+        if _catalog is None or _catalog.version != version:
+            _catalog = ChallengeCatalog.from_rows(Challenge.query.all(), version, today)
+            print(f"[CATALOG] Loaded {len(_catalog.challenges)} challenges (version {version}).")
+        elif _catalog.today != today:
+            _catalog = _catalog.on_day(today)
+        _checked_at = time.monotonic()
+        return _catalog
+
+
+def invalidate_challenge_catalog():
+    """Drops this process's snapshot; the next lookup rebuilds it from the table."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+#Version bump on change, local rebuild once the change is committed
+
+@event.listens_for(Challenge, "after_insert")
+@event.listens_for(Challenge, "after_update")
+@event.listens_for(Challenge, "after_delete")
+def bump_catalog_version(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and not session.info.get("challenges_changed"):
+        CatalogVersion.bump(connection, CATALOG_NAME)
+        session.info["challenges_changed"] = True
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def reset_bump_flag(session, flush_context):
+    #One bump per flush; keep a marker so the commit still drops the snapshot
+    if session.info.pop("challenges_changed", False):
+        session.info["challenges_committing"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def drop_catalog_after_commit(session):
+    if session.info.pop("challenges_committing", False):
+        invalidate_challenge_catalog()
+
+
+@event.listens_for(Session, "after_rollback")
+def clear_challenge_flag(session):
+    session.info.pop("challenges_changed", None)
+    session.info.pop("challenges_committing", None)
@@ -0,0 +1,105 @@
+#Imports
+from models import db
+from models.patientChallenge import PatientChallenge
+from services.challenge_service import evaluate_challenges, get_cumulative_metric
+from services.challenge_catalog import get_challenge_catalog, invalidate_challenge_catalog
+from services.rollup_service import fetch_window_first_value
+from services.period_utils import to_local_date
+
+
+#Challenge Progress Events
+#Patient.update_health_metric fires a "metric logged" event inside its transaction.
+#The challenge listener looks the metric up in the challenge catalog (metric -> challenges)
+#and applies the logged value to each affected PatientChallenge:
+# - sum challenges: progress += value while the row belongs to the current period
+#   (period_start); the first log of a new period starts from the window total once
+# - net-change challenges (weight loss): window's first value - this value, read from
+#   the earliest day bucket (one index seek)
+#reconcile_challenge_progress() recomputes everything from the rollups on a schedule
+#and reports rows that had drifted (e.g. logs written outside this path).
+
+
+#Dispatcher
+
+_listeners = []
+
+
+def on_metric_logged(listener):
+    """Registers listener(patient, metric_name, value, recorded_at) for every logged value."""
+    _listeners.append(listener)
+    return listener
+
+
+def dispatch_metric_logged(patient, metric_name, value, recorded_at):
+    """Runs the listeners in the caller's transaction (they stage changes; the caller commits)."""
+    for listener in _listeners:
+        listener(patient, metric_name, value, recorded_at)
+
+
+@on_metric_logged
+def apply_challenge_deltas(patient, metric_name, value, recorded_at):
+    """Folds one logged value into the patient's progress on the challenges it feeds."""
+    catalog = get_challenge_catalog()
+    refs = catalog.for_metric(metric_name)
+    if not refs:
+        return
+
+    patient_id = patient.patient_id
+    local_date = to_local_date(recorded_at)
+    existing = {
+        pc.challenge_id: pc
+        for pc in PatientChallenge.query.filter(
+            PatientChallenge.patient_id == patient_id,
+            PatientChallenge.challenge_id.in_([ref.id for ref in refs])
+        )
+    }
+
+    for ref in refs:
+        start_date, end_date = catalog.window(ref.challenge_type, local_date)
+
+        patient_challenge = existing.get(ref.id)
+        if not patient_challenge:
+            patient_challenge = PatientChallenge(patient_id=patient_id, challenge_id=ref.id, progress=0, completed=False)
+            db.session.add(patient_challenge)
+
+        if ref.aggregation == "change":
+            first_value = fetch_window_first_value(patient_id, metric_name, start_date, end_date)
+            raw_progress = max(0, first_value - value) if first_value is not None else 0
+        elif patient_challenge.period_start == start_date:
+            raw_progress = (patient_challenge.progress or 0) + value
+        else:
+            #New period (or a row never stamped): the window total includes this log
+            raw_progress = get_cumulative_metric(patient_id, metric_name, ref.challenge_type)
+
+        patient_challenge.progress = min(raw_progress, ref.goal)
+        patient_challenge.period_start = start_date
+
+        if patient_challenge.progress >= ref.goal and not patient_challenge.completed:
+            patient_challenge.completed = True
+            patient.reward_points = (patient.reward_points or 0) + ref.reward_points
+            print(f"[🏆 POINTS AWARDED] Patient {patient_id} earned {ref.reward_points} points!")
+
+
+#Reconciliation
+
+def stored_progress(patient_ids=None):
+    query = db.session.query(PatientChallenge.patient_id, PatientChallenge.challenge_id, PatientChallenge.progress)
+    if patient_ids is not None:
+        query = query.filter(PatientChallenge.patient_id.in_(list(patient_ids)))
+    return {(row.patient_id, row.challenge_id): row.progress or 0 for row in query}
+
+
+def reconcile_challenge_progress(patient_ids=None):
+    """
+    Recomputes stored challenge progress from the rollups (evaluate_challenges) and
+    rebuilds the challenge catalog. Returns {"rows", "drifted"}: rows whose delta-maintained
+    progress differed from the recomputed value.
+    """
+    invalidate_challenge_catalog()
+    before = stored_progress(patient_ids)
+    evaluate_challenges(patient_ids)
+    after = stored_progress(patient_ids)
+
+    drifted = sum(1 for key, progress in after.items() if key in before and abs(before[key] - progress) > 1e-6)
+    print(f"[RECONCILE] Challenge progress: {len(after)} rows checked, {drifted} drifted.")
+    return {"rows": len(after), "drifted": drifted}
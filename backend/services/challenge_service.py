@@ -1,90 +1,46 @@
 from models.challenge import Challenge
-from models.user import User
 from models.patient import Patient
 from models.patientChallenge import PatientChallenge
+from models.data_version import PatientDataVersion
 from models import db
 from datetime import datetime
 
-from models.health_history import HealthHistory
 from services.user_service import update_user_points, fetch_user_points
-from datetime import datetime, timedelta
-from sqlalchemy import func
-
-from pytz import timezone, UTC
-
-UK_TZ = timezone("Europe/London")  #Define local timezone
-
-def get_cumulative_metric(patient_id, metric_name, period='daily'):
+from services.identity_service import resolve_patient, resolve_patient_id
+from services.rollup_service import (
+    fetch_window_rollup,
+    fetch_cohort_window_sums,
+    fetch_cohort_window_changes
+)
+from services.challenge_catalog import get_challenge_catalog
+
+def get_cumulative_metric(patient_id, metric_name, period='daily', aggregation='sum'):
     """
     Fetch cumulative metric (e.g., steps, calories burned, weight loss, etc.) for a given period.
-    Handles UK timezone to align challenge periods correctly.
+    aggregation='change' scores the net drop from the period's first value to the latest one.
+    Reads the UK-calendar day rollups, so the cost is bounded by the window length (max 31 buckets).
     """
-
-    now_uk = datetime.now(UK_TZ)
-    today = now_uk.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    if period == 'daily':
-        start_date = today
-        end_date = start_date + timedelta(days=1)
-    elif period == 'weekly':
-        start_date = (today - timedelta(days=today.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
-        end_date = start_date + timedelta(days=7)
-    elif period == 'monthly':
-        start_date = today.replace(day=1)
-        next_month = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-        end_date = next_month
-    else:
+    if period not in ('daily', 'weekly', 'monthly'):
         raise ValueError(f"Invalid period: {period}. Valid options: 'daily', 'weekly', 'monthly'.")
 
-    #Convert to UTC to match DB timestamps
-    start_date_utc = start_date.astimezone(UTC)
-    end_date_utc = end_date.astimezone(UTC)
-
-    if metric_name == "latest_weight":
-        weight_records = (
-            HealthHistory.query.filter(
-                HealthHistory.patient_id == patient_id,
-                HealthHistory.metric_name == metric_name,
-                HealthHistory.recorded_at >= start_date_utc,
-                HealthHistory.recorded_at < end_date_utc
-            )
-            .order_by(HealthHistory.recorded_at.asc())
-            .all()
-        )
-
-        if weight_records:
-            start_weight = weight_records[0].value
-            latest_weight = weight_records[-1].value
-            weight_loss = max(0, start_weight - latest_weight)
-            return weight_loss
-
+    window = fetch_window_rollup(patient_id, metric_name, period)
+    if not window:
         return 0
 
-    #Sum other metrics in the window
-    cumulative_value = db.session.query(func.sum(HealthHistory.value)).filter(
-        HealthHistory.patient_id == patient_id,
-        HealthHistory.metric_name == metric_name,
-        HealthHistory.recorded_at >= start_date_utc,
-        HealthHistory.recorded_at < end_date_utc
-    ).scalar() or 0
+    if aggregation == "change":
+        #e.g. weight loss = first weigh-in of the period minus the latest one
+        return max(0, window["first"] - window["last"])
 
-    return cumulative_value
+    return window["sum"]
 
 
 def fetch_challenges():
-    """Fetch all challenges from the database."""
+    """
+    All challenges as read-only dicts (id, name, description, goal, challenge_type,
+    reward_points, metric_name, aggregation) from the in-process catalog snapshot.
+    """
     try:
-        challenges = Challenge.query.all()
-        print(f"[DEBUG] Found {len(challenges)} challenges in DB.")  #Debugging log
-
-        return [{
-            "id": ch.id,
-            "name": ch.name,
-            "description": ch.description,
-            "goal": ch.goal,
-            "challenge_type": ch.challenge_type,
-            "reward_points": ch.reward_points  #Include points to be earned
-        } for ch in challenges]
+        return get_challenge_catalog().records
 
     except Exception as e:
         print(f"[ERROR] Failed to fetch challenges: {e}")
@@ -95,12 +51,7 @@ def fetch_patient_progress(username, challenge_id):
     Fetch the patient's challenge progress and check if it's completed.
     """
     try:
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            print(f"[ERROR] User {username} not found.")
-            return 0
-
-        patient = Patient.query.filter_by(patient_id=user.patient_id).first()
+        patient = resolve_patient(username)
         if not patient:
             print(f"[ERROR] No patient record for user {username}.")
             return 0
@@ -110,15 +61,14 @@ def fetch_patient_progress(username, challenge_id):
             challenge_id=challenge_id
         ).first()
 
-        challenge = Challenge.query.filter_by(id=challenge_id).first()
+        challenge = get_challenge_catalog().by_id.get(challenge_id)
         if not challenge:
             print(f"[ERROR] Challenge ID {challenge_id} not found.")
             return 0
 
-        #Map to health metric and calculate progress
-        metric_name = challenge_to_metric(challenge.name)
+        #Calculate progress on the challenge's health metric
         period = challenge.challenge_type
-        progress = get_cumulative_metric(patient.patient_id, metric_name, period)
+        progress = get_cumulative_metric(patient.patient_id, challenge.metric_name, period, challenge.aggregation)
 
         if not patient_challenge and progress >= challenge.goal:
             #Mark challenge as completed (one-time creation)
@@ -140,12 +90,7 @@ def fetch_patient_progress(username, challenge_id):
 def update_challenge_progress(username, challenge_id, amount=0, suppress_completion_logs=False):
     """Updates a user's challenge progress based on their logged activity and awards points if completed."""
     try:
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            print(f"[ERROR] User {username} not found.")
-            return False
-
-        patient = Patient.query.filter_by(patient_id=user.patient_id).first()
+        patient = resolve_patient(username)
         if not patient:
             print(f"[ERROR] No patient record for user {username}.")
             return False
@@ -155,18 +100,17 @@ def update_challenge_progress(username, challenge_id, amount=0, suppress_complet
             challenge_id=challenge_id
         ).first()
 
-        challenge = Challenge.query.filter_by(id=challenge_id).first()
+        challenge = get_challenge_catalog().by_id.get(challenge_id)
         if not challenge:
             print(f"[ERROR] Challenge ID {challenge_id} not found.")
             return False
 
-        metric_name = challenge_to_metric(challenge.name)
-        if not metric_name:
-            print(f"[ERROR] No metric mapping found for challenge: {challenge.name}")
+        if not challenge.metric_name:
+            print(f"[ERROR] No metric bound to challenge: {challenge.name}")
             return False
 
         period = challenge.challenge_type
-        new_progress = get_cumulative_metric(patient.patient_id, metric_name, period)
+        new_progress = get_cumulative_metric(patient.patient_id, challenge.metric_name, period, challenge.aggregation)
 
         if not patient_challenge:
             if not suppress_completion_logs:
@@ -207,58 +151,142 @@ def update_challenge_progress(username, challenge_id, amount=0, suppress_complet
     except Exception as e:
         print(f"[ERROR] Failed to update challenge progress: {e}")
         return False
-        
-def challenge_to_metric(challenge_name):
+
+def compute_challenge_progress(challenges, patient_ids=None, today=None):
+    """
+    Computes raw progress for every (patient, challenge) pair without writing anything.
+    Uses one grouped rollup aggregate for summed metrics and one bucket read for
+    change metrics, however many challenges or patients are involved.
+    Returns {patient_id: {challenge_id: progress}}.
+    """
+    sum_challenges, change_challenges = {}, {}
+    for ch in challenges:
+        if ch.metric_name:
+            by_metric = change_challenges if ch.aggregation == "change" else sum_challenges
+            by_metric.setdefault(ch.metric_name, []).append(ch)
+
+    catalog = get_challenge_catalog()
+    windows = {period: catalog.window(period, today) for period in {ch.challenge_type for ch in challenges}}
+
+    sums = fetch_cohort_window_sums(set(sum_challenges), windows, patient_ids)
+    changes = fetch_cohort_window_changes(set(change_challenges), windows, patient_ids)
+
+    #Patients with no activity in a window simply have zero progress
+    tracked = [ch for ch in challenges if ch.metric_name]
+    patients = set(patient_ids or []) | {key[0] for key in sums} | {key[0] for key in changes}
+    progress = {patient_id: {ch.id: 0 for ch in tracked} for patient_id in patients}
+
+    for (patient_id, metric_name), per_window in sums.items():
+        for ch in sum_challenges[metric_name]:
+            progress[patient_id][ch.id] = per_window.get(ch.challenge_type, 0)
+
+    for (patient_id, metric_name), per_window in changes.items():
+        for ch in change_challenges[metric_name]:
+            if ch.challenge_type in per_window:
+                first, last = per_window[ch.challenge_type]
+                progress[patient_id][ch.id] = max(0, first - last)
+
+    return progress
+
+
+def evaluate_challenges(patient_ids=None, challenges=None, today=None, commit=True):
     """
-    Maps a challenge name to the corresponding health history metric.
-    Only includes mappings for seeded challenges.
+    Batch challenge engine: recomputes progress for all challenges of the given
+    patients (or of everyone) and writes every PatientChallenge change, including
+    completion points, in a single transaction (left open with commit=False).
+    challenges defaults to the whole catalog (Challenge rows or catalog refs both work).
+    Returns {patient_id: {challenge_id: progress}} with uncapped progress.
     """
-    mapping = {
-        #Daily Challenges
-        "Daily Steps": "latest_steps_taken",
-        "Daily Calories Burned": "latest_calories_burned",
-        "Daily Active Time": "latest_active_minutes",
-        "Daily Hydration": "latest_water_intake",
-
-        #Weekly Challenges
-        "Weekly Steps": "latest_steps_taken",
-        "Weekly Calories Burned": "latest_calories_burned",
-        "Weekly Distance Walked": "latest_distance_walked",
-        "Weekly Running Distance": "latest_distance_ran",
-
-        #Monthly Challenges
-        "Monthly Steps": "latest_steps_taken",
-        "Monthly Calories Burned": "latest_calories_burned",
-        "Monthly Weight Loss": "latest_weight",
-        "Monthly Fiber Intake": "latest_fiber_intake"
-    }
-
-    return mapping.get(challenge_name, None)  #Returns None if the challenge isn't found
+    catalog = get_challenge_catalog()
+    challenges = challenges if challenges is not None else catalog.challenges
+    if not challenges:
+        return {}
+
+    progress = compute_challenge_progress(challenges, patient_ids, today)
+    challenges_by_id = {ch.id: ch for ch in challenges}
+    period_starts = {ch.id: catalog.window(ch.challenge_type, today)[0] for ch in challenges}
+
+    existing_query = PatientChallenge.query.filter(PatientChallenge.challenge_id.in_(list(challenges_by_id)))
+    if patient_ids is not None:
+        existing_query = existing_query.filter(PatientChallenge.patient_id.in_(list(patient_ids)))
+    existing = {(pc.patient_id, pc.challenge_id): pc for pc in existing_query}
+
+    #Stored rows with no activity this period fall back to zero
+    for (patient_id, challenge_id) in existing:
+        if challenges_by_id[challenge_id].metric_name:
+            progress.setdefault(patient_id, {}).setdefault(challenge_id, 0)
+
+    points_awarded = {}
+    changed_patients = set()
+
+    for patient_id, per_challenge in progress.items():
+        for challenge_id, value in per_challenge.items():
+            challenge = challenges_by_id[challenge_id]
+            patient_challenge = existing.get((patient_id, challenge_id))
+
+            if not patient_challenge:
+                patient_challenge = PatientChallenge(
+                    patient_id=patient_id,
+                    challenge_id=challenge_id,
+                    progress=0,
+                    completed=False
+                )
+                db.session.add(patient_challenge)
+                changed_patients.add(patient_id)
+
+            capped = min(value, challenge.goal)
+            if patient_challenge.progress != capped:
+                changed_patients.add(patient_id)
+            patient_challenge.progress = capped
+            patient_challenge.period_start = period_starts[challenge_id]
+
+            if patient_challenge.progress >= challenge.goal and not patient_challenge.completed:
+                patient_challenge.completed = True
+                points_awarded[patient_id] = points_awarded.get(patient_id, 0) + challenge.reward_points
+
+    if points_awarded:
+        for patient in Patient.query.filter(Patient.patient_id.in_(list(points_awarded))):
+            patient.reward_points = (patient.reward_points or 0) + points_awarded[patient.patient_id]
+            print(f"[🏆 POINTS AWARDED] Patient {patient.patient_id} earned {points_awarded[patient.patient_id]} points!")
+
+    #Cached dashboard/profile views show progress and points: make their entries unreachable
+    changed_patients |= set(points_awarded)
+    if changed_patients:
+        PatientDataVersion.bump_many(changed_patients)
+
+    if commit:
+        db.session.commit()
+    return progress
+
+
+def refresh_patient_challenges(username):
+    """
+    Recalculates and stores progress for every challenge of one user.
+    Returns {challenge_id: progress} (uncapped, for display).
+    """
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
+        print(f"[ERROR] No patient record for user {username}.")
+        return {}
+
+    return evaluate_challenges([patient_id]).get(patient_id, {})
+
 
 def refresh_all_challenge_progress(username):
     """
     Recalculates all challenge progress for the user.
     Useful for login or first-time session loads.
     """
-    challenges = fetch_challenges()  #Returns list of all defined challenges
-    for challenge in challenges:
-        update_challenge_progress(
-            username=username,
-            challenge_id=challenge["id"],
-            amount=0,  
-            suppress_completion_logs=True  #Prevent duplicate console logs
-        )
+    refresh_patient_challenges(username)
 
 def get_nearly_completed_challenges(username, top_n=3):
     """
     Returns up to `top_n` incomplete challenges with the highest progress % for a user.
     """
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
         return []
 
-    patient_id = user.patient.patient_id
-
     #Join PatientChallenge with Challenge to get details
     records = (
         db.session.query(PatientChallenge, Challenge)
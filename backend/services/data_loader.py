@@ -1,7 +1,11 @@
 import os
-import random
+import time
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert, update
+from werkzeug.security import generate_password_hash
 from faker import Faker  #Import Faker to generate random names
 from models import db  #Import db from models to handle database interactions
 from models.user import User  #Import User model to interact with User table
@@ -73,146 +77,28 @@ def load_data_from_csv():
             print("[INFO] No diabetic patients found in the CSV. Exiting.")
             return
 
-        #Get all Patient IDs from the database as a set
-        print("[INFO] Checking existing patients in the database...")
-        existing_patient_ids = {p.patient_id for p in Patient.query.all()}
+        #Only the first CSV_PATIENT_LIMIT diabetic patients are provisioned at start-up
+        limit = current_app.config.get("CSV_PATIENT_LIMIT")
+        if limit:
+            df = df.head(limit)
 
-        #Prevent reseeding if 10 or more patients already exist
-        if Patient.query.count() >= 10:
-            print("[INFO] 10 or more patients already exist. Skipping CSV seeding.")
-            print_first_user()
-            return
-
-        #Get all Patient IDs from the CSV as a set
-        csv_patient_ids = set(df['PatientID'])
-
-        #Check if all patients in the CSV already exist in the database
-        if csv_patient_ids.issubset(existing_patient_ids):
-            print("[INFO] Data already loaded. No new patients to process.")#
+        #Upsert by PatientID: skip entirely when every CSV patient is already loaded
+        existing_patient_ids = {row.patient_id for row in db.session.query(Patient.patient_id)}
+        if set(df['PatientID'].astype(int)).issubset(existing_patient_ids):
+            print("[INFO] Data already loaded. No new patients to process.")
             print_first_user()  #Print the first user's username every time
             return  #Early exit
 
         print("[INFO] New data found. Proceeding to load data...")
-
-        #Create and load Patient records
-        patient_ids = set()  #Track already loaded patient IDs to avoid duplicates
-
-        #Limiting to 10 patients
-        for _, row in df.iterrows():
-            if len(patient_ids) >= 10:
-                break  #Limit to only 10 users
-
-            patient_id = row['PatientID']
-            if patient_id in existing_patient_ids or patient_id in patient_ids:
-                continue
-
-            #Generate random first and last names based on gender
-            if row.get('Gender') == 0:  #Male
-                first_name = fake.first_name_male()
-            elif row.get('Gender') == 1:  #Female
-                first_name = fake.first_name_female()
-            else:
-                first_name = fake.first_name()  #Fallback in case gender is missing or other values
-
-            last_name = fake.last_name()  #Generate a random last name
-            
-            #Generate fake but unique email and phone number
-            email = fake.unique.email()
-            phone_number = fake.unique.phone_number()
-
-            #Generate a realistic points balance (100-1000)
-            reward_points = random.randint(100, 1000)
-
-            #Create and add the patient record
-            new_patient = Patient(
-                patient_id=patient_id,
-                first_name=first_name,
-                last_name=last_name,
-                age=row.get('Age'),
-                gender=row.get('Gender'),
-                diagnosis=row.get('Diagnosis'),
-                latest_fasting_blood_sugar=round(row.get('FastingBloodSugar'), 2) if pd.notnull(row.get('FastingBloodSugar')) else None,
-                latest_blood_pressure_systolic=int(row.get('SystolicBP')) if pd.notnull(row.get('SystolicBP')) else None,
-                latest_blood_pressure_diastolic=int(row.get('DiastolicBP')) if pd.notnull(row.get('DiastolicBP')) else None,
-                latest_bmi=round(row.get('BMI'), 2) if pd.notnull(row.get('BMI')) else None,
-                latest_cholesterol_total=round(row.get('CholesterolTotal'), 2) if pd.notnull(row.get('CholesterolTotal')) else None,
-                latest_hba1c=round(row.get('HbA1c'), 2) if pd.notnull(row.get('HbA1c')) else None,
-                ethnicity=row.get('Ethnicity'),
-                smoking=row.get('Smoking'),
-                alcohol_consumption=row.get('AlcoholConsumption'),
-                physical_activity=row.get('PhysicalActivity'),
-                diet_quality=row.get('DietQuality'),
-                sleep_quality=row.get('SleepQuality'),
-                family_history_diabetes=row.get('FamilyHistoryDiabetes'),
-                gestational_diabetes=row.get('GestationalDiabetes'),
-                polycystic_ovary_syndrome=row.get('PolycysticOvarySyndrome'),
-                previous_pre_diabetes=row.get('PreviousPreDiabetes'),
-                hypertension=row.get('Hypertension'),
-                antihypertensive_medications=row.get('AntihypertensiveMedications'),
-                statins=row.get('Statins'),
-                antidiabetic_medications=row.get('AntidiabeticMedications'),
-                medical_checkups_frequency=row.get('MedicalCheckupsFrequency'),
-                medication_adherence=row.get('MedicationAdherence'),
-                health_literacy=row.get('HealthLiteracy'),
-                #Privacy settings
-                show_on_leaderboard=True,
-                email_alerts=True,
-                sms_alerts=True,
-                data_export_consent=False,
-                email=email,
-                phone_number=phone_number,
-
-                reward_points=reward_points,
-
-                #New Metrics
-                #New Metrics with rounding applied
-                latest_calories_consumed=round(random.uniform(1200, 3000), 2),
-                latest_protein_intake=round(random.uniform(50, 150), 2),
-                latest_carbs_intake=round(random.uniform(150, 350), 2),
-                latest_fats_intake=round(random.uniform(40, 100), 2),
-                latest_fiber_intake=round(random.uniform(10, 40), 2),
-                latest_water_intake=round(random.uniform(1.5, 4.0), 2),
-                latest_steps_taken=random.randint(2000, 15000),  #integers don’t need rounding
-                latest_active_minutes=random.randint(10, 180),
-                latest_calories_burned=round(random.uniform(200, 800), 2),
-                latest_distance_walked=round(random.uniform(0.5, 10), 2),
-                latest_workout_sessions=random.randint(0, 5),
-                latest_heart_rate=random.randint(60, 120),
-                latest_distance_ran=round(random.uniform(0, 10), 2),
-                latest_weight=round(random.uniform(50, 120), 2),
-                latest_height=round(random.uniform(150, 200), 2),
-            )
-
-            #Add the patient to the session
-            db.session.add(new_patient)
-            patient_ids.add(patient_id)  #Mark this patient as loaded
-
-            #Create User records
-            username = generate_username(last_name, patient_id)
-
-            #Default password here
-            default_password = "DefaultPassword123"  
-
-            if User.query.filter_by(username=username).first():
-                print(f"[WARNING] Username {username} already exists. Skipping this user.")
-                continue
-
-            new_user = User(username=username, password=default_password, patient_id=new_patient.patient_id)
-
-            db.session.add(new_user)
-
-        #Commit remaining records
-        db.session.commit()
-        print(f"[INFO] Committed 10 patients and users.")
-
-        print(f"[INFO] Total new patients and users loaded: {len(patient_ids)}")
+        summary = bulk_load_patients(df, chunk_size=current_app.config.get("CSV_IMPORT_CHUNK_SIZE", 1000))
+        print(f"[INFO] Total new patients and users loaded: {summary['inserted']} ({summary['updated']} updated)")
         
         seed_challenges()
         
         #Seed challenge progress
         seed_patient_challenge_progress()
 
-        #Seed historical health data for all patients
+        #Seed historical health data (rollups and streaks are written alongside)
         seed_health_history()
 
         print("[INFO] Historical health data successfully seeded for all users.")
@@ -225,151 +111,260 @@ def load_data_from_csv():
 def seed_patient_challenge_progress():
  
     print("[INFO] Seeding challenge progress for patients...")
-    patients = Patient.query.all()
-    challenges = Challenge.query.all()
+    patient_ids = [row.patient_id for row in db.session.query(Patient.patient_id)]
+    challenge_ids = [row.id for row in db.session.query(Challenge.id)]
 
-    if not challenges:
+    if not challenge_ids:
         print("[WARNING] No challenges found. Skipping challenge progress seeding.")
         return
 
-    total_entries = 0
-
-    for patient in patients:
-        for challenge in challenges:
-            #Skip if patient already has this challenge
-            existing_entry = PatientChallenge.query.filter_by(patient_id=patient.patient_id, challenge_id=challenge.id).first()
-            if existing_entry:
-                continue
-
-            #Start progress at 0 (it will be updated dynamically based on health history)
-            new_entry = PatientChallenge(
-                patient_id=patient.patient_id,
-                challenge_id=challenge.id,
-                progress=0,
-                completed=False
-            )
+    #Skip pairs the patient already has (one read instead of one query per pair)
+    existing_pairs = set(db.session.query(PatientChallenge.patient_id, PatientChallenge.challenge_id))
 
-            db.session.add(new_entry)
-            total_entries += 1
+    #Start progress at 0 (it will be updated dynamically based on health history)
+    new_entries = [
+        {"patient_id": patient_id, "challenge_id": challenge_id, "progress": 0, "completed": False}
+        for patient_id in patient_ids
+        for challenge_id in challenge_ids
+        if (patient_id, challenge_id) not in existing_pairs
+    ]
+    total_entries = len(new_entries)
 
+    if new_entries:
+        db.session.execute(insert(PatientChallenge), new_entries)
     db.session.commit()
     print(f"[INFO] Assigned {total_entries} challenge progress records successfully.")
-    
-from pytz import UTC, timezone
-UK_TZ = timezone("Europe/London")
 
-def seed_health_history():
 
-    print("[INFO] Seeding historical health data for the first five users...")
+def seed_health_history(days=30, seed=None):
+    """
+    Seeds synthetic history for every patient that has none yet.
+    The generator writes log rows, day rollups and streaks in bulk (see history_generator).
+    """
+    #Imported here: history_generator reads health_metrics_ranges from this module
+    from services.history_generator import generate_health_history, patients_without_history
 
-    users = User.query.limit(10).all()
-    if not users:
-        print("[WARNING] No users found. Skipping seeding.")
+    patient_ids = patients_without_history()
+    if not patient_ids:
+        print("[INFO] All patients already have health history. Skipping seeding.")
         return
 
-    total_entries = 0
-    today_uk = datetime.now(UK_TZ).date()
+    print(f"[INFO] Seeding {days} days of health history for {len(patient_ids)} patients...")
+    summary = generate_health_history(patient_ids, days=days, seed=seed)
+    print(f"[INFO] Seeded {summary['rows']} historical health records ({summary['rows_per_second']} rows/s).")
 
-    for user in users:
-        if not user.patient:
-            print(f"[WARNING] User {user.username} has no associated patient record. Skipping.")
-            continue
 
-        patient = user.patient
+def generate_username(last_name, patient_id):
+    """
+    Generates a username using the first 3 letters of the last name and the patient ID.
+    """
+    return last_name[:3].lower() + str(patient_id)
 
-        #Start seeding from 29 days ago
-        start_date = datetime.combine(today_uk - timedelta(days=29), datetime.min.time()).astimezone(UTC)
 
-        #Automatically detect all "latest_" metrics
-        latest_metrics = {
-            attr: getattr(patient, attr)
-            for attr in dir(patient)
-            if attr.startswith("latest_") and not callable(getattr(patient, attr)) and not attr.startswith("__")
-        }
+#Bulk Patient Import
+
+#CSV column -> Patient column for everything taken straight from the dataset
+CSV_COLUMN_MAP = {
+    "PatientID": "patient_id",
+    "Age": "age",
+    "Gender": "gender",
+    "Ethnicity": "ethnicity",
+    "Diagnosis": "diagnosis",
+    "Smoking": "smoking",
+    "AlcoholConsumption": "alcohol_consumption",
+    "PhysicalActivity": "physical_activity",
+    "DietQuality": "diet_quality",
+    "SleepQuality": "sleep_quality",
+    "FamilyHistoryDiabetes": "family_history_diabetes",
+    "GestationalDiabetes": "gestational_diabetes",
+    "PolycysticOvarySyndrome": "polycystic_ovary_syndrome",
+    "PreviousPreDiabetes": "previous_pre_diabetes",
+    "Hypertension": "hypertension",
+    "AntihypertensiveMedications": "antihypertensive_medications",
+    "Statins": "statins",
+    "AntidiabeticMedications": "antidiabetic_medications",
+    "MedicalCheckupsFrequency": "medical_checkups_frequency",
+    "MedicationAdherence": "medication_adherence",
+    "HealthLiteracy": "health_literacy",
+    "FastingBloodSugar": "latest_fasting_blood_sugar",
+    "BMI": "latest_bmi",
+    "CholesterolTotal": "latest_cholesterol_total",
+    "HbA1c": "latest_hba1c",
+    "SystolicBP": "latest_blood_pressure_systolic",
+    "DiastolicBP": "latest_blood_pressure_diastolic",
+}
+ROUNDED_CSV_COLUMNS = ["latest_fasting_blood_sugar", "latest_bmi", "latest_cholesterol_total", "latest_hba1c"]
+INTEGER_CSV_COLUMNS = ["latest_blood_pressure_systolic", "latest_blood_pressure_diastolic"]
 
-        for metric, latest_value in latest_metrics.items():
-            if latest_value is None or latest_value == "N/A":
-                min_val, max_val = health_metrics_ranges.get(metric, (50, 100))
-                latest_value = round(random.uniform(min_val, max_val), 2)
-            else:
-                latest_value = round(latest_value, 2)
-
-            #Seed 29 historical days
-            for day in range(29):
-                record_date = start_date + timedelta(days=day)
-
-                existing_record = HealthHistory.query.filter_by(
-                    patient_id=patient.patient_id,
-                    metric_name=metric,
-                    recorded_at=record_date
-                ).first()
-
-                if not existing_record:
-                    variation = round(random.uniform(latest_value * 0.8, latest_value * 1.2), 2)
-                    db.session.add(HealthHistory(
-                        patient_id=patient.patient_id,
-                        metric_name=metric,
-                        value=variation,
-                        recorded_at=record_date
-                    ))
-                    total_entries += 1
-
-            #Ensure a clean log is created for today at 00:00 UK time (UTC converted)
-            today_utc = datetime.combine(today_uk, datetime.min.time()).astimezone(UTC)
-
-            existing_today = HealthHistory.query.filter_by(
-                patient_id=patient.patient_id,
-                metric_name=metric,
-                recorded_at=today_utc
-            ).first()
-
-            if not existing_today:
-                db.session.add(HealthHistory(
-                    patient_id=patient.patient_id,
-                    metric_name=metric,
-                    value=latest_value,
-                    recorded_at=today_utc
-                ))
-                total_entries += 1
+#Synthetic metrics stored as whole numbers (the rest are rounded to 2 dp)
+INTEGER_METRICS = {"latest_steps_taken", "latest_active_minutes", "latest_workout_sessions", "latest_heart_rate"}
 
-    db.session.commit()
-    print(f"[INFO] Seeded {total_entries} historical health records for the first five users.")
+DEFAULT_PASSWORD = "DefaultPassword123"
+NAME_POOL_SIZE = 500
 
 
-def generate_username(last_name, patient_id):
+def read_patient_csv(csv_file_path, diabetic_only=True):
+    """Reads a patient export, optionally keeping only diabetic patients (Diagnosis = 1)."""
+    df = pd.read_csv(csv_file_path)
+    if diabetic_only and "Diagnosis" in df.columns:
+        df = df[df["Diagnosis"] == 1]
+    return df.drop_duplicates(subset="PatientID", keep="last")
+
+
+def map_csv_columns(df):
+    """CSV rows -> DataFrame of Patient columns taken from the dataset (vectorised)."""
+    mapped = df[[column for column in CSV_COLUMN_MAP if column in df.columns]].rename(columns=CSV_COLUMN_MAP)
+    mapped["patient_id"] = mapped["patient_id"].astype(int)
+
+    for column in ROUNDED_CSV_COLUMNS:
+        if column in mapped:
+            mapped[column] = mapped[column].round(2)
+    for column in INTEGER_CSV_COLUMNS:
+        if column in mapped:
+            mapped[column] = mapped[column].round().astype("Int64")
+
+    return mapped
+
+
+def generate_patient_profiles(mapped, rng):
     """
-    Generates a username using the first 3 letters of the last name and the patient ID.
+    Synthetic names, contact details, points and latest_* metrics for new patients.
+    Names are drawn from Faker pools built once, so cost does not grow per row.
     """
-    return last_name[:3].lower() + str(patient_id)
+    count = len(mapped)
+    male_names = np.array([fake.first_name_male() for _ in range(NAME_POOL_SIZE)])
+    female_names = np.array([fake.first_name_female() for _ in range(NAME_POOL_SIZE)])
+    last_names = np.array([fake.last_name() for _ in range(NAME_POOL_SIZE)])
+
+    gender = mapped["gender"].to_numpy() if "gender" in mapped else np.full(count, -1)
+    first_names = np.where(
+        gender == 0,
+        rng.choice(male_names, count),
+        rng.choice(female_names, count)
+    )
+
+    profiles = pd.DataFrame({
+        "patient_id": mapped["patient_id"].to_numpy(),
+        "first_name": first_names,
+        "last_name": rng.choice(last_names, count),
+        "reward_points": rng.integers(100, 1001, count),
+        "show_on_leaderboard": True,
+        "email_alerts": True,
+        "sms_alerts": True,
+        "data_export_consent": False,
+    })
+
+    #Unique by construction: the patient ID is part of both
+    ids = profiles["patient_id"].astype(str)
+    profiles["email"] = profiles["first_name"].str.lower() + "." + profiles["last_name"].str.lower() + "." + ids + "@example.com"
+    profiles["phone_number"] = "+447" + pd.Series(rng.integers(100000000, 1000000000, count)).astype(str)
+
+    for metric, (low, high) in health_metrics_ranges.items():
+        if metric in INTEGER_METRICS:
+            profiles[metric] = rng.integers(int(low), int(high) + 1, count)
+        else:
+            profiles[metric] = rng.uniform(low, high, count).round(2)
+
+    return profiles
+
+
+def to_records(frame):
+    """DataFrame -> list of dicts with native Python values and None for missing."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def bulk_load_patients(df, chunk_size=1000, seed=None):
+    """
+    Upserts patients (and creates their users) from a CSV DataFrame in chunks.
+
+    Existing PatientIDs get their dataset columns updated; new ones are inserted with
+    synthetic profile fields and a user account. Each chunk is one bulk INSERT per
+    table plus one bulk UPDATE, committed together.
+
+    Returns {"rows", "inserted", "updated", "users", "seconds", "rows_per_second"}.
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    mapped = map_csv_columns(df)
+
+    #One hash for the shared default password instead of one per user
+    password_hash = generate_password_hash(DEFAULT_PASSWORD)
+    summary = {"rows": len(mapped), "inserted": 0, "updated": 0, "users": 0}
+
+    for start in range(0, len(mapped), chunk_size):
+        chunk = mapped.iloc[start:start + chunk_size]
+        chunk_ids = chunk["patient_id"].tolist()
+
+        existing_ids = {
+            row.patient_id for row in
+            db.session.query(Patient.patient_id).filter(Patient.patient_id.in_(chunk_ids))
+        }
+        is_existing = chunk["patient_id"].isin(existing_ids)
+
+        updates = chunk[is_existing]
+        if not updates.empty:
+            db.session.execute(update(Patient), to_records(updates))
+
+        new_patients = chunk[~is_existing]
+        if not new_patients.empty:
+            profiles = generate_patient_profiles(new_patients, rng)
+            db.session.execute(insert(Patient), to_records(new_patients.merge(profiles, on="patient_id")))
+
+            usernames = profiles["last_name"].str[:3].str.lower() + profiles["patient_id"].astype(str)
+            taken = {
+                row.username for row in
+                db.session.query(User.username).filter(User.username.in_(usernames.tolist()))
+            }
+            users = pd.DataFrame({"username": usernames, "patient_id": profiles["patient_id"]})
+            users = users[~users["username"].isin(taken)]
+            if not users.empty:
+                users["password_hash"] = password_hash
+                users["last_login"] = datetime.utcnow()
+                db.session.execute(insert(User), to_records(users))
+            summary["users"] += len(users)
+
+        db.session.commit()
+        summary["inserted"] += len(new_patients)
+        summary["updated"] += len(updates)
+        print(f"[IMPORT] {start + len(chunk)}/{len(mapped)} rows processed.")
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    summary["rows_per_second"] = round(len(mapped) / summary["seconds"], 1) if summary["seconds"] else None
+    print(
+        f"[IMPORT] {summary['inserted']} patients inserted, {summary['updated']} updated, "
+        f"{summary['users']} users created in {summary['seconds']}s ({summary['rows_per_second']} rows/s)."
+    )
+    return summary
 
 from models import db
 from models.challenge import Challenge
 
-def seed_challenges():
-    challenges = [
-        #Daily Challenges
-        {"name": "Daily Steps", "description": "Walk 5,000 steps today.", "goal": 5000, "challenge_type": "daily", "reward_points": 10},
-        {"name": "Daily Calories Burned", "description": "Burn 300 calories today.", "goal": 300, "challenge_type": "daily", "reward_points": 10},
-        {"name": "Daily Active Time", "description": "Log at least 30 active minutes today.", "goal": 30, "challenge_type": "daily", "reward_points": 10},
-        {"name": "Daily Hydration", "description": "Drink at least 2.5L of water today.", "goal": 2.5, "challenge_type": "daily", "reward_points": 10},
+#Seeded challenges; metric_name/aggregation bind each one to the health metric it scores
+SEEDED_CHALLENGES = [
+    #Daily Challenges
+    {"name": "Daily Steps", "description": "Walk 5,000 steps today.", "goal": 5000, "challenge_type": "daily", "reward_points": 10, "metric_name": "latest_steps_taken", "aggregation": "sum"},
+    {"name": "Daily Calories Burned", "description": "Burn 300 calories today.", "goal": 300, "challenge_type": "daily", "reward_points": 10, "metric_name": "latest_calories_burned", "aggregation": "sum"},
+    {"name": "Daily Active Time", "description": "Log at least 30 active minutes today.", "goal": 30, "challenge_type": "daily", "reward_points": 10, "metric_name": "latest_active_minutes", "aggregation": "sum"},
+    {"name": "Daily Hydration", "description": "Drink at least 2.5L of water today.", "goal": 2.5, "challenge_type": "daily", "reward_points": 10, "metric_name": "latest_water_intake", "aggregation": "sum"},
 
 
-        #Weekly Challenges
-        {"name": "Weekly Steps", "description": "Walk 35,000 steps this week.", "goal": 35000, "challenge_type": "weekly", "reward_points": 50},
-        {"name": "Weekly Calories Burned", "description": "Burn 2,000 calories this week.", "goal": 2000, "challenge_type": "weekly", "reward_points": 50},
-        {"name": "Weekly Distance Walked", "description": "Walk 15 kilometers this week.", "goal": 15, "challenge_type": "weekly", "reward_points": 50},
-        {"name": "Weekly Running Distance", "description": "Run at least 10 km this week.", "goal": 10, "challenge_type": "weekly", "reward_points": 50},
+    #Weekly Challenges
+    {"name": "Weekly Steps", "description": "Walk 35,000 steps this week.", "goal": 35000, "challenge_type": "weekly", "reward_points": 50, "metric_name": "latest_steps_taken", "aggregation": "sum"},
+    {"name": "Weekly Calories Burned", "description": "Burn 2,000 calories this week.", "goal": 2000, "challenge_type": "weekly", "reward_points": 50, "metric_name": "latest_calories_burned", "aggregation": "sum"},
+    {"name": "Weekly Distance Walked", "description": "Walk 15 kilometers this week.", "goal": 15, "challenge_type": "weekly", "reward_points": 50, "metric_name": "latest_distance_walked", "aggregation": "sum"},
+    {"name": "Weekly Running Distance", "description": "Run at least 10 km this week.", "goal": 10, "challenge_type": "weekly", "reward_points": 50, "metric_name": "latest_distance_ran", "aggregation": "sum"},
 
 
-        #Monthly Challenges
-        {"name": "Monthly Steps", "description": "Walk 150,000 steps this month.", "goal": 150000, "challenge_type": "monthly", "reward_points": 100},
-        {"name": "Monthly Calories Burned", "description": "Burn 8,000 calories this month.", "goal": 8000, "challenge_type": "monthly", "reward_points": 100},
-        {"name": "Monthly Weight Loss", "description": "Lose 2 kg this month.", "goal": 2, "challenge_type": "monthly", "reward_points": 100},
-        {"name": "Monthly Fiber Intake", "description": "Consume at least 500g of fiber this month.", "goal": 500, "challenge_type": "monthly", "reward_points": 10},
-    ]   
+    #Monthly Challenges
+    {"name": "Monthly Steps", "description": "Walk 150,000 steps this month.", "goal": 150000, "challenge_type": "monthly", "reward_points": 100, "metric_name": "latest_steps_taken", "aggregation": "sum"},
+    {"name": "Monthly Calories Burned", "description": "Burn 8,000 calories this month.", "goal": 8000, "challenge_type": "monthly", "reward_points": 100, "metric_name": "latest_calories_burned", "aggregation": "sum"},
+    {"name": "Monthly Weight Loss", "description": "Lose 2 kg this month.", "goal": 2, "challenge_type": "monthly", "reward_points": 100, "metric_name": "latest_weight", "aggregation": "change"},
+    {"name": "Monthly Fiber Intake", "description": "Consume at least 500g of fiber this month.", "goal": 500, "challenge_type": "monthly", "reward_points": 10, "metric_name": "latest_fiber_intake", "aggregation": "sum"},
+]
 
+def seed_challenges():
     #Insert the challenges into the database
-    for challenge in challenges:
+    for challenge in SEEDED_CHALLENGES:
         existing_challenge = Challenge.query.filter_by(name=challenge["name"]).first()
         if not existing_challenge:
             new_challenge = Challenge(
@@ -377,13 +372,36 @@ def seed_challenges():
                 description=challenge["description"],
                 goal=challenge["goal"],
                 challenge_type=challenge["challenge_type"],
-                reward_points=challenge["reward_points"]
+                reward_points=challenge["reward_points"],
+                metric_name=challenge["metric_name"],
+                aggregation=challenge["aggregation"]
             )
             db.session.add(new_challenge)
 
     db.session.commit()
     print("[INFO] Successfully seeded challenges!")
 
+def ensure_challenge_bindings():
+    """
+    Binds seeded challenges created before challenges carried their metric (metric_name
+    is NULL) to it. Runs on every startup, independently of the CSV import; no-op once bound.
+    """
+    bindings = {challenge["name"]: challenge for challenge in SEEDED_CHALLENGES}
+    unbound = Challenge.query.filter(
+        Challenge.metric_name.is_(None),
+        Challenge.name.in_(list(bindings))
+    ).all()
+    if not unbound:
+        return 0
+
+    for challenge in unbound:
+        challenge.metric_name = bindings[challenge.name]["metric_name"]
+        challenge.aggregation = bindings[challenge.name]["aggregation"]
+
+    db.session.commit()
+    print(f"[INFO] Bound {len(unbound)} seeded challenges to their metrics.")
+    return len(unbound)
+
 def print_first_user():
     """
     Fetches and prints the first patient's full details, including patient fields,
@@ -0,0 +1,96 @@
+#Imports
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from models import db
+
+
+#Database Engine Configuration
+#Engine options are built from Config before Flask-SQLAlchemy creates the engine:
+# - SQLite: pragmas applied to every new DBAPI connection through a "connect" event
+#   (WAL lets dashboard reads run while a log write or scheduler job holds the write lock;
+#   synchronous=NORMAL is durable across app crashes in WAL mode and skips an fsync per commit)
+# - Server databases (PostgreSQL/MySQL): pool sizing, recycling and pre-ping
+#SQLITE_TUNING = false leaves SQLite on its defaults (rollback journal, synchronous=FULL).
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def is_sqlite(database_uri):
+    return make_url(database_uri).get_backend_name() == "sqlite"
+
+
+def choice(config, key, allowed):
+    """Upper-cased config value, checked against the allowed set (values end up in PRAGMA text)."""
+    value = str(config[key]).upper()
+    if value not in allowed:
+        raise ValueError(f"Invalid {key}: {config[key]}. Valid options: {', '.join(sorted(allowed))}.")
+    return value
+
+
+def sqlite_pragmas(config):
+    """(name, value) pragmas for each new SQLite connection, in the order they are applied."""
+    if not config.get("SQLITE_TUNING", True):
+        return []
+
+    return [
+        #Set first so the journal mode switch waits for a lock instead of failing
+        ("busy_timeout", int(config["SQLITE_BUSY_TIMEOUT_MS"])),
+        ("journal_mode", choice(config, "SQLITE_JOURNAL_MODE", JOURNAL_MODES)),
+        ("synchronous", choice(config, "SQLITE_SYNCHRONOUS", SYNCHRONOUS_MODES)),
+        ("temp_store", choice(config, "SQLITE_TEMP_STORE", TEMP_STORES)),
+        ("mmap_size", int(config["SQLITE_MMAP_SIZE"])),
+        ("cache_size", int(config["SQLITE_CACHE_SIZE"])),
+    ]
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    if is_sqlite(config["SQLALCHEMY_DATABASE_URI"]):
+        #The pragma sets the busy timeout; the driver timeout (seconds) is kept in step with it
+        return {"connect_args": {"timeout": int(config["SQLITE_BUSY_TIMEOUT_MS"]) / 1000}}
+
+    return {
+        "pool_size": int(config["DB_POOL_SIZE"]),
+        "max_overflow": int(config["DB_MAX_OVERFLOW"]),
+        "pool_timeout": int(config["DB_POOL_TIMEOUT"]),
+        "pool_recycle": int(config["DB_POOL_RECYCLE"]),
+        "pool_pre_ping": bool(config["DB_POOL_PRE_PING"]),
+    }
+
+
+def attach_sqlite_pragmas(engine, pragmas):
+    """Runs the pragmas on every new connection the engine opens."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def read_sqlite_settings(engine):
+    """Current pragma values on a fresh connection (to confirm the tuning took effect)."""
+    names = ["journal_mode", "synchronous", "busy_timeout", "temp_store", "mmap_size", "cache_size"]
+    with engine.connect() as conn:
+        return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
+
+
+def init_database(app):
+    """
+    Binds db to the app with the tuned engine options; replaces db.init_app(app).
+    Options already present in SQLALCHEMY_ENGINE_OPTIONS take precedence.
+    """
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(app.config),
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    }
+    db.init_app(app)
+
+    if is_sqlite(app.config["SQLALCHEMY_DATABASE_URI"]):
+        pragmas = sqlite_pragmas(app.config)
+        if pragmas:
+            with app.app_context():
+                attach_sqlite_pragmas(db.engine, pragmas)
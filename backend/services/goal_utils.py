@@ -1,39 +1,81 @@
 import pandas as pd
-from datetime import datetime, timedelta
-import calendar
-from pytz import timezone
-from services.user_service import fetch_health_history, METRIC_GOAL_BEHAVIOR
+import numpy as np
+from sqlalchemy import func
+from models import db
+from models.health_history import HealthHistory
+from models.metric_rollup import MetricDailyRollup
+from services.identity_service import resolve_patient_id
+from services.user_service import METRIC_GOAL_BEHAVIOR
+from services.period_utils import UK_TZ, get_period_dates, get_period_bounds, to_naive_utc, PERIOD_ALIASES
 
-UK_TZ = timezone("Europe/London")  #Local timezone for correct goal windows
 
-def calculate_goal_progress(username, metric_name, goal_type, goal_value=None):
-    df = fetch_health_history(username, metric_name)
-    if df.empty:
-        return None, None, [], [], 0
+#Goal Window Queries
 
-    df["Date"] = pd.to_datetime(df["Date"]).dt.tz_localize("UTC").dt.tz_convert(UK_TZ)
+def fetch_goal_window(patient_id, metric_name, start=None, end=None):
+    """
+    Date/Value rows logged in [start, end) (naive UTC), oldest first.
+    Reads two columns off the (patient_id, metric_name, recorded_at) index, so the
+    cost follows the rows in the window rather than the patient's lifetime history.
+    No bounds = the whole history.
+    """
+    query = (
+        db.session.query(HealthHistory.recorded_at, HealthHistory.value)
+        .filter(
+            HealthHistory.patient_id == patient_id,
+            HealthHistory.metric_name == metric_name,
+            HealthHistory.recorded_at.isnot(None)
+        )
+    )
+    if start is not None:
+        query = query.filter(HealthHistory.recorded_at >= start, HealthHistory.recorded_at < end)
 
-    today = datetime.now(UK_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = query.order_by(HealthHistory.recorded_at.asc()).all()
+    return pd.DataFrame(rows, columns=["Date", "Value"])
 
-    #Define time window based on goal_type
-    if goal_type == "daily":
-        start = today
-        end = today + timedelta(days=1)
-    elif goal_type == "weekly":
-        start = today - timedelta(days=today.weekday())
-        end = start + timedelta(days=7)
-    elif goal_type == "monthly":
-        start = today.replace(day=1)
-        last_day = calendar.monthrange(today.year, today.month)[1]
-        end = today.replace(day=last_day, hour=23, minute=59, second=59)
+
+def fetch_baseline_value(patient_id, metric_name):
+    """First-ever logged value for the metric (the baseline for "change" goals), or None."""
+    return (
+        db.session.query(HealthHistory.value)
+        .filter(
+            HealthHistory.patient_id == patient_id,
+            HealthHistory.metric_name == metric_name,
+            HealthHistory.recorded_at.isnot(None)
+        )
+        .order_by(HealthHistory.recorded_at.asc())
+        .limit(1)
+        .scalar()
+    )
+
+
+def calculate_goal_progress(username, metric_name, goal_type, goal_value=None, today=None):
+    """
+    Progress towards one goal over its current UK window (daily/weekly/monthly;
+    any other goal_type covers the whole history).
+    Returns (start, end, x_data, y_data, progress_value).
+    """
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
+        return None, None, [], [], 0
+
+    #Only the window's rows are fetched and converted to UK time
+    if goal_type in PERIOD_ALIASES:
+        start, end = get_period_bounds(goal_type, today)
+        df_period = fetch_goal_window(patient_id, metric_name, to_naive_utc(start), to_naive_utc(end))
     else:
-        start = df["Date"].min()
-        end = df["Date"].max()
+        df_period = fetch_goal_window(patient_id, metric_name)
+        if df_period.empty:
+            return None, None, [], [], 0
+
+    df_period["Value"] = df_period["Value"].round(2)
+    df_period["Date"] = pd.to_datetime(df_period["Date"]).dt.tz_localize("UTC").dt.tz_convert(UK_TZ)
+
+    if goal_type not in PERIOD_ALIASES:
+        start = df_period["Date"].min()
+        end = df_period["Date"].max()
 
     behavior = METRIC_GOAL_BEHAVIOR.get(metric_name, "cumulative")
 
-    #Filter for goal window
-    df_period = df[(df["Date"] >= start) & (df["Date"] <= end)].copy()
     if df_period.empty:
         return start, end, [], [], 0
 
@@ -59,8 +101,7 @@ def calculate_goal_progress(username, metric_name, goal_type, goal_value=None):
 
     elif behavior == "change":
         #Use the first-ever recorded value as the baseline
-        df_sorted = df.sort_values("Date")
-        start_value = df_sorted.iloc[0]["Value"]
+        start_value = round(fetch_baseline_value(patient_id, metric_name), 2)
         current_value = df_period.iloc[-1]["Value"]
 
         required_change = abs(goal_value - start_value)
@@ -89,3 +130,165 @@ def calculate_goal_progress(username, metric_name, goal_type, goal_value=None):
         progress_value = y_data.iloc[-1]
 
     return start, end, x_data, y_data, round(progress_value, 2)
+
+
+#Bulk Goal Evaluation
+
+GOAL_COLUMNS = ["goal_id", "patient_id", "metric_name", "goal_type", "goal_value"]
+
+
+def fetch_window_buckets_frame(patient_ids, metric_names, start_date=None, end_date=None):
+    """Day buckets for the given patients and metrics as a DataFrame, oldest first."""
+    R = MetricDailyRollup
+    query = (
+        db.session.query(R.patient_id, R.metric_name, R.local_date, R.entry_count, R.total_value, R.last_value)
+        .filter(R.patient_id.in_(patient_ids), R.metric_name.in_(metric_names), R.entry_count > 0)
+    )
+    if start_date is not None:
+        query = query.filter(R.local_date >= start_date, R.local_date < end_date)
+
+    rows = query.order_by(R.local_date.asc()).all()
+    return pd.DataFrame(rows, columns=["patient_id", "metric_name", "local_date", "entry_count", "total_value", "last_value"])
+
+
+def fetch_baseline_values(patient_ids, metric_names):
+    """
+    First-ever logged value per (patient, metric), the baseline for "change" goals.
+    Returns a DataFrame with patient_id, metric_name, baseline.
+    """
+    R = MetricDailyRollup
+    first_days = (
+        db.session.query(R.patient_id, R.metric_name, func.min(R.local_date).label("first_date"))
+        .filter(R.patient_id.in_(patient_ids), R.metric_name.in_(metric_names), R.entry_count > 0)
+        .group_by(R.patient_id, R.metric_name)
+        .subquery()
+    )
+    rows = (
+        db.session.query(R.patient_id, R.metric_name, R.first_value)
+        .join(first_days, (R.patient_id == first_days.c.patient_id)
+              & (R.metric_name == first_days.c.metric_name)
+              & (R.local_date == first_days.c.first_date))
+        .all()
+    )
+    return pd.DataFrame(rows, columns=["patient_id", "metric_name", "baseline"])
+
+
+def evaluate_goals(goals, today=None):
+    """
+    Vectorised progress for many PatientGoal rows at once.
+
+    The day rollups covering every goal's window (the union of the daily, weekly and
+    monthly windows) are read in one query, then each goal keeps the buckets inside
+    its own window and is aggregated with pandas, so the cost follows the number of
+    goals rather than users x metrics x lifetime history. Progress follows
+    calculate_goal_progress: cumulative = window sum, average = window mean,
+    change = % of the way from the first-ever value to the goal.
+
+    Returns a DataFrame (in the order the goals were given) with the goal columns
+    plus progress_value, last_value and percent.
+    """
+    goals_df = pd.DataFrame(
+        [(g.id, g.patient_id, g.metric_name, g.goal_type or "daily", g.goal_value) for g in goals],
+        columns=GOAL_COLUMNS
+    )
+    if goals_df.empty:
+        return goals_df.assign(behavior=[], progress_value=[], last_value=[], percent=[])
+
+    goals_df["behavior"] = goals_df["metric_name"].map(METRIC_GOAL_BEHAVIOR).fillna("cumulative")
+
+    #Window per goal type (unknown types cover the whole history)
+    windows = {
+        goal_type: get_period_dates(goal_type, today) if goal_type in PERIOD_ALIASES else (None, None)
+        for goal_type in goals_df["goal_type"].unique()
+    }
+    goals_df["window_start"] = goals_df["goal_type"].map(lambda goal_type: windows[goal_type][0])
+    goals_df["window_end"] = goals_df["goal_type"].map(lambda goal_type: windows[goal_type][1])
+
+    if goals_df["window_start"].isna().any():
+        start_date, end_date = None, None
+    else:
+        start_date, end_date = goals_df["window_start"].min(), goals_df["window_end"].max()
+
+    buckets = fetch_window_buckets_frame(
+        goals_df["patient_id"].unique().tolist(), goals_df["metric_name"].unique().tolist(), start_date, end_date
+    )
+
+    #Each goal keeps the buckets inside its own window
+    joined = goals_df[["goal_id", "patient_id", "metric_name", "window_start", "window_end"]].merge(
+        buckets, on=["patient_id", "metric_name"]
+    )
+    in_window = (
+        (joined["window_start"].isna() | (joined["local_date"] >= joined["window_start"]))
+        & (joined["window_end"].isna() | (joined["local_date"] < joined["window_end"]))
+    )
+    window = (
+        joined[in_window].sort_values(["goal_id", "local_date"])
+        .groupby("goal_id")
+        .agg(total=("total_value", "sum"), count=("entry_count", "sum"), last_value=("last_value", "last"))
+        .reset_index()
+    )
+    result = goals_df.drop(columns=["window_start", "window_end"]).merge(window, on="goal_id", how="left")
+
+    change_goals = result[result["behavior"] == "change"]
+    if change_goals.empty:
+        result["baseline"] = np.nan
+    else:
+        baselines = fetch_baseline_values(change_goals["patient_id"].unique().tolist(), change_goals["metric_name"].unique().tolist())
+        result = result.merge(baselines, on=["patient_id", "metric_name"], how="left")
+
+    has_data = result["count"].fillna(0) > 0
+    total = result["total"].fillna(0)
+    mean = total / result["count"].where(has_data)
+
+    #"change" goals: progress is already a percentage of the required change
+    required = (result["goal_value"] - result["baseline"]).abs()
+    actual = (result["last_value"] - result["baseline"]).abs()
+    direction_correct = (
+        ((result["baseline"] > result["goal_value"]) & (result["last_value"] < result["baseline"]))
+        | ((result["baseline"] < result["goal_value"]) & (result["last_value"] > result["baseline"]))
+    )
+    change_percent = (actual / required.replace(0, np.nan) * 100).clip(upper=100).round(1)
+    change_progress = np.where(~direction_correct, 0, np.where(required == 0, 100, change_percent))
+
+    result["progress_value"] = np.select(
+        [~has_data, result["behavior"] == "average", result["behavior"] == "change"],
+        [0, mean, change_progress],
+        default=total
+    ).astype(float).round(2)
+
+    percent_of_goal = (result["progress_value"] / result["goal_value"].replace(0, np.nan) * 100).clip(upper=100).round(1)
+    result["percent"] = np.where(result["behavior"] == "change", result["progress_value"], percent_of_goal.fillna(0))
+    result["last_value"] = result["last_value"].fillna(0)
+
+    return result[GOAL_COLUMNS + ["behavior", "progress_value", "last_value", "percent"]]
+
+
+def goal_label(metric_name):
+    """Readable goal name, e.g. latest_steps -> Steps."""
+    return metric_name.replace("latest_", "").replace("_", " ").title()
+
+
+def goal_donut_data(goals, today=None):
+    """
+    Progress for all of a patient's goals, as one dict per valid goal (in the given
+    order) holding create_goal_donut's arguments plus goal_type and value_display.
+    Runs evaluate_goals once, so the query count does not grow with the goal count.
+    """
+    goals = [goal for goal in goals if goal.metric_name and goal.goal_value is not None]
+    progress = evaluate_goals(goals, today)
+
+    donuts = []
+    for row in progress.itertuples(index=False):
+        #"change" rings show the latest value against the target; the others show the window total/mean
+        value = float(row.last_value if row.behavior == "change" else row.progress_value)
+        percent = float(row.percent)
+        donuts.append({
+            "metric": goal_label(row.metric_name),
+            "value": value,
+            "goal": row.goal_value,
+            "percent": int(percent) if percent.is_integer() else percent,  #Ring label reads "100%", not "100.0%"
+            "behavior": row.behavior,
+            "goal_type": row.goal_type,
+            "value_display": f"{value:.2f} / {row.goal_value:.2f}",
+        })
+    return donuts
@@ -2,28 +2,27 @@
 from datetime import datetime
 from models import db
 from models.patientGoal import PatientGoal
-from models.user import User
+from models.data_version import PatientDataVersion
+from services.identity_service import resolve_patient_id
 
 
 #Goal Service Functions
 
 def get_patient_goals(username):
 
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
         return []
     
-    return PatientGoal.query.filter_by(patient_id=user.patient.patient_id).all()
+    return PatientGoal.query.filter_by(patient_id=patient_id).all()
 
 
 def set_patient_goal(username, metric_name, goal_value, goal_type="daily"):
   
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
         return False
 
-    patient_id = user.patient.patient_id
-
     #Check if a goal already exists for this metric and type
     existing_goal = PatientGoal.query.filter_by(
         patient_id=patient_id,
@@ -45,6 +44,7 @@ def set_patient_goal(username, metric_name, goal_value, goal_type="daily"):
         )
         db.session.add(goal)
 
+    PatientDataVersion.bump(patient_id)
     db.session.commit()
     return True
 
@@ -54,6 +54,7 @@ def delete_patient_goal(goal_id):
     goal = PatientGoal.query.get(goal_id)
     if goal:
         db.session.delete(goal)
+        PatientDataVersion.bump(goal.patient_id)
         db.session.commit()
         return True
 
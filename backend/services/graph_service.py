@@ -0,0 +1,146 @@
+#Imports
+import numpy as np
+import pandas as pd
+from flask import current_app
+from models import db
+from models.health_history import HealthHistory
+from services.identity_service import resolve_patient_id
+
+
+#Graph Series
+#The dashboard graph gets at most ~one point per horizontal pixel of the visible
+#x-range, whatever the history length. Rows are read as two columns straight off the
+#(patient_id, metric_name, recorded_at, value) index and reduced with either:
+# - "lttb":   Largest-Triangle-Three-Buckets (keeps the visual shape of the line)
+# - "minmax": each bucket's minimum and maximum (keeps every spike)
+#On zoom the graph asks again for the new range, so detail grows as the range shrinks.
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+DEFAULT_WIDTH_PX = 800
+RANGE_PADDING = 0.05  #Fraction of the range fetched either side, so short pans still show a line
+
+
+def lttb_indices(x, y, threshold):
+    """Row positions kept by Largest-Triangle-Three-Buckets (first and last always kept)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    #Interior points split into threshold - 2 buckets of near-equal size
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+
+        #Average of the next bucket (the last point for the final bucket)
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        #Point in this bucket forming the largest triangle with the previous kept point and the average
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+
+    return kept
+
+
+def minmax_indices(y, buckets):
+    """Row positions of each bucket's minimum and maximum, plus the first and last rows."""
+    n = len(y)
+    if buckets * 2 >= n or buckets < 1:
+        return np.arange(n)
+
+    bucket_ids = np.minimum((np.arange(n) * buckets) // n, buckets - 1)
+    frame = pd.DataFrame({"bucket": bucket_ids, "value": y})
+    grouped = frame.groupby("bucket")["value"]
+    kept = np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy(), [0, n - 1]])
+    return np.unique(kept)
+
+
+def downsample(df, max_points, method="lttb"):
+    """Reduces a Date/Value frame (sorted by Date) to about max_points rows."""
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Invalid downsample method: {method}. Valid options: {', '.join(DOWNSAMPLE_METHODS)}.")
+    if len(df) <= max_points:
+        return df
+
+    y = df["Value"].to_numpy(dtype=float)
+    if method == "lttb":
+        x = df["Date"].to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+        kept = lttb_indices(x, y, max_points)
+    else:
+        kept = minmax_indices(y, max_points // 2)
+
+    return df.iloc[kept].reset_index(drop=True)
+
+
+def parse_x_range(relayout_data):
+    """
+    Reads the x-range out of a Plotly relayoutData event.
+    Returns (start, end) timestamps, "reset" for autorange (double-click), or None
+    when the event did not change the x-axis (y-only zoom, resize, initial draw).
+    """
+    if not relayout_data:
+        return None
+    if relayout_data.get("xaxis.autorange"):
+        return "reset"
+
+    if "xaxis.range[0]" in relayout_data and "xaxis.range[1]" in relayout_data:
+        bounds = relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    elif isinstance(relayout_data.get("xaxis.range"), list):
+        bounds = relayout_data["xaxis.range"]
+    else:
+        return None
+
+    try:
+        start, end = (pd.Timestamp(bound).to_pydatetime() for bound in bounds)
+    except (TypeError, ValueError):
+        return None
+    return (start, end) if start < end else (end, start)
+
+
+def fetch_graph_series(username, metric_name, x_range=None, width_px=None, method=None):
+    """
+    History for the graph, downsampled to the plot width.
+    x_range = (start, end) limits the rows to the visible window (padded slightly).
+    Returns (DataFrame with Date/Value, {"total_points", "shown_points", "method"}).
+    """
+    empty = pd.DataFrame(columns=["Date", "Value"])
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
+        return empty, {"total_points": 0, "shown_points": 0, "method": None}
+
+    query = (
+        db.session.query(HealthHistory.recorded_at, HealthHistory.value)
+        .filter(
+            HealthHistory.patient_id == patient_id,
+            HealthHistory.metric_name == metric_name,
+            HealthHistory.recorded_at.isnot(None)
+        )
+    )
+    if x_range:
+        start, end = x_range
+        padding = (end - start) * RANGE_PADDING
+        query = query.filter(HealthHistory.recorded_at >= start - padding, HealthHistory.recorded_at <= end + padding)
+
+    rows = query.order_by(HealthHistory.recorded_at.asc()).all()
+    if not rows:
+        return empty, {"total_points": 0, "shown_points": 0, "method": None}
+
+    df = pd.DataFrame(rows, columns=["Date", "Value"])
+    df["Value"] = df["Value"].round(2)
+
+    config = current_app.config
+    method = method or config.get("GRAPH_DOWNSAMPLE_METHOD", "lttb")
+    width_px = int(width_px or DEFAULT_WIDTH_PX)
+    max_points = max(10, int(width_px * config.get("GRAPH_POINTS_PER_PIXEL", 1.0)))
+
+    shown = downsample(df, max_points, method)
+    return shown, {"total_points": len(df), "shown_points": len(shown), "method": method if len(shown) < len(df) else None}
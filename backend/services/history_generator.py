@@ -0,0 +1,299 @@
+#Imports
+import io
+import time
+from datetime import datetime, date
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, update
+from models import db
+from models.patient import Patient
+from models.health_history import HealthHistory
+from models.metric_rollup import MetricDailyRollup
+from models.log_streak import PatientLogStreak
+from services.data_loader import health_metrics_ranges
+from services.period_utils import UK_TZ
+
+
+#Synthetic Health History
+#Builds realistic-looking history with NumPy instead of per-row random calls:
+# - each patient gets a baseline per metric (their latest_* value, else a draw from the range)
+# - "total" metrics (steps, food, water...) vary day to day and are split over a few logs
+# - "reading" metrics (heart rate, blood sugar...) are noisy measurements around the baseline
+# - "drift" metrics (weight, BMI...) follow a slow random walk
+# - log times follow a diurnal profile, and weekends scale activity and intake
+
+#Clinical metrics not covered by health_metrics_ranges
+CLINICAL_RANGES = {
+    "latest_fasting_blood_sugar": (70, 200),
+    "latest_hba1c": (4.5, 10),
+    "latest_bmi": (18, 40),
+    "latest_blood_pressure_systolic": (90, 160),
+    "latest_blood_pressure_diastolic": (60, 100),
+    "latest_cholesterol_total": (150, 300),
+}
+METRIC_RANGES = {**health_metrics_ranges, **CLINICAL_RANGES}
+
+INTEGER_METRICS = {
+    "latest_steps_taken", "latest_active_minutes", "latest_workout_sessions", "latest_heart_rate",
+    "latest_blood_pressure_systolic", "latest_blood_pressure_diastolic",
+}
+
+
+def hour_profile(peaks, base=0.2):
+    """24 hourly weights: a low base rate plus Gaussian bumps at the given (hour, weight) peaks."""
+    hours = np.arange(24)
+    weights = np.full(24, base)
+    for peak, weight in peaks:
+        weights += weight * np.exp(-0.5 * ((hours - peak) / 1.2) ** 2)
+    weights[:6] *= 0.1  #Almost nothing logged overnight
+    return weights / weights.sum()
+
+
+HOUR_PROFILES = {
+    "activity": hour_profile([(8, 1.0), (12.5, 0.6), (18.5, 1.2)]),
+    "meals": hour_profile([(8, 1.0), (13, 1.2), (19, 1.3)]),
+    "morning": hour_profile([(7.5, 2.0)], base=0.05),
+    "waking": hour_profile([(10, 0.5), (15, 0.5), (20, 0.5)], base=0.5),
+}
+
+#metric: (kind, logs per day, hour profile, weekend factor)
+METRIC_PROFILES = {
+    "latest_steps_taken": ("total", 2, "activity", 1.15),
+    "latest_active_minutes": ("total", 2, "activity", 1.2),
+    "latest_calories_burned": ("total", 2, "activity", 1.15),
+    "latest_distance_walked": ("total", 2, "activity", 1.2),
+    "latest_distance_ran": ("total", 1, "activity", 1.3),
+    "latest_workout_sessions": ("total", 1, "activity", 1.1),
+    "latest_calories_consumed": ("total", 3, "meals", 1.1),
+    "latest_protein_intake": ("total", 3, "meals", 1.05),
+    "latest_carbs_intake": ("total", 3, "meals", 1.1),
+    "latest_fats_intake": ("total", 3, "meals", 1.15),
+    "latest_fiber_intake": ("total", 3, "meals", 0.95),
+    "latest_water_intake": ("total", 3, "waking", 0.95),
+    "latest_heart_rate": ("reading", 1, "waking", 1.0),
+    "latest_fasting_blood_sugar": ("reading", 1, "morning", 1.02),
+    "latest_blood_pressure_systolic": ("reading", 1, "morning", 1.0),
+    "latest_blood_pressure_diastolic": ("reading", 1, "morning", 1.0),
+    "latest_weight": ("drift", 1, "morning", 1.0),
+    "latest_bmi": ("drift", 1, "morning", 1.0),
+    "latest_hba1c": ("drift", 1, "morning", 1.0),
+    "latest_cholesterol_total": ("drift", 1, "morning", 1.0),
+    "latest_height": ("drift", 1, "morning", 1.0),
+}
+
+#Day-to-day spread (log-normal sigma for totals, relative sd for readings, daily step for drift)
+METRIC_NOISE = {"total": 0.2, "reading": 0.05, "drift": 0.002}
+
+
+def fetch_baselines(patient_ids, metrics):
+    """Patients' current latest_* values as a (patients x metrics) array (NaN where missing)."""
+    columns = [getattr(Patient, metric) for metric in metrics]
+    rows = {
+        row[0]: row[1:] for row in
+        db.session.query(Patient.patient_id, *columns).filter(Patient.patient_id.in_(patient_ids))
+    }
+    return np.array(
+        [[np.nan if value is None else float(value) for value in rows.get(patient_id, [None] * len(metrics))]
+         for patient_id in patient_ids],
+        dtype=float
+    )
+
+
+def build_history_frame(patient_ids, days, end_date, rng, now=None):
+    """
+    Generates every log for the given patients over `days` UK days ending on end_date.
+    Returns a DataFrame: patient_id, metric_name, value, recorded_at (naive UTC), local_date.
+    """
+    now = now or datetime.utcnow()
+    metrics = list(METRIC_PROFILES)
+    patient_count = len(patient_ids)
+    dates = pd.date_range(end=pd.Timestamp(end_date), periods=days, freq="D")
+    weekend = np.asarray(dates.dayofweek >= 5)
+
+    baselines = fetch_baselines(patient_ids, metrics)
+    frames = []
+
+    for index, metric in enumerate(metrics):
+        kind, logs_per_day, profile, weekend_factor = METRIC_PROFILES[metric]
+        low, high = METRIC_RANGES[metric]
+
+        #Patient baselines (fall back to a draw from the metric's range)
+        baseline = baselines[:, index]
+        missing = np.isnan(baseline)
+        baseline[missing] = rng.uniform(low, high, missing.sum())
+
+        weekly = np.where(weekend, weekend_factor, 1.0)  #(days,)
+        noise = METRIC_NOISE[kind]
+
+        if kind == "total":
+            daily = baseline[:, None] * weekly[None, :] * rng.lognormal(0, noise, (patient_count, days))
+            daily = np.clip(daily, low * 0.3, high * 1.3)
+            shares = rng.gamma(2.0, size=(patient_count, days, logs_per_day))
+            values = daily[:, :, None] * shares / shares.sum(axis=2, keepdims=True)
+        elif kind == "reading":
+            values = baseline[:, None, None] * weekly[None, :, None] * (1 + rng.normal(0, noise, (patient_count, days, logs_per_day)))
+            values = np.clip(values, low * 0.7, high * 1.3)
+        else:
+            #Walk backwards from today's baseline so the latest value matches the profile
+            steps = rng.normal(0, noise, (patient_count, days))
+            steps[:, -1] = 0
+            walk = np.cumsum(steps[:, ::-1], axis=1)[:, ::-1]
+            values = (baseline[:, None] * (1 + walk))[:, :, None]
+            if metric == "latest_height":
+                values = np.repeat(baseline[:, None, None], days, axis=1)
+
+        values = np.round(values) if metric in INTEGER_METRICS else np.round(values, 2)
+
+        #Local log times: hour from the diurnal profile plus a random minute/second
+        hours = rng.choice(24, size=values.shape, p=HOUR_PROFILES[profile])
+        seconds = hours * 3600 + rng.integers(0, 3600, values.shape)
+        local_times = (
+            dates.to_numpy()[None, :, None].astype("datetime64[s]")
+            + seconds.astype("timedelta64[s]")
+        )
+
+        frames.append(pd.DataFrame({
+            "patient_id": np.repeat(np.asarray(patient_ids), days * logs_per_day),
+            "metric_name": metric,
+            "value": values.ravel(),
+            "local_time": local_times.ravel(),
+        }))
+
+    frame = pd.concat(frames, ignore_index=True)
+
+    #UK local -> naive UTC (DST aware); nothing may be logged in the future
+    local_index = pd.DatetimeIndex(frame["local_time"])
+    utc = (
+        local_index.tz_localize(UK_TZ.zone, ambiguous=False, nonexistent="shift_forward")
+        .tz_convert("UTC").tz_localize(None)
+    )
+    frame["recorded_at"] = np.minimum(utc.to_numpy(), np.datetime64(now, "us"))
+    frame["local_date"] = local_index.normalize().date
+    return frame.drop(columns="local_time")
+
+
+#Writers
+
+def sqlite_column_values(series):
+    """Column values in the text formats SQLAlchemy uses on SQLite (DateTime / Date)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return np.char.replace(np.datetime_as_string(series.to_numpy(), unit="us"), "T", " ").tolist()
+    if len(series) and isinstance(series.iloc[0], date):
+        return [value.isoformat() for value in series]
+    return series.tolist()
+
+
+def bulk_insert_frame(table, frame):
+    """
+    Bulk-writes a DataFrame whose columns match the table: COPY on PostgreSQL,
+    raw executemany on SQLite, otherwise SQLAlchemy's executemany.
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    raw = connection.connection.driver_connection
+    columns = list(frame.columns)
+    column_list = ", ".join(columns)
+
+    if dialect == "postgresql" and hasattr(raw.cursor(), "copy_expert"):
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        raw.cursor().copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    elif dialect == "sqlite":
+        placeholders = ", ".join("?" for _ in columns)
+        rows = zip(*(sqlite_column_values(frame[column]) for column in columns))
+        raw.cursor().executemany(f"INSERT INTO {table.name} ({column_list}) VALUES ({placeholders})", rows)
+    else:
+        records = frame.astype(object).to_dict("records")
+        for column in columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[column]):
+                for record, value in zip(records, frame[column].dt.to_pydatetime()):
+                    record[column] = value
+        connection.execute(insert(table), records)
+
+
+def write_history(frame):
+    """Bulk-writes the generated log rows."""
+    bulk_insert_frame(HealthHistory.__table__, frame[["patient_id", "metric_name", "value", "recorded_at"]])
+
+
+def write_rollups(frame):
+    """Day buckets for the generated rows, aggregated with pandas and bulk-inserted."""
+    #Stable sort: same-second entries keep insertion order, matching add_entry()
+    ordered = frame.sort_values("recorded_at", kind="stable")
+    grouped = ordered.groupby(["patient_id", "metric_name", "local_date"], sort=False)
+    buckets = grouped.agg(
+        entry_count=("value", "size"),
+        total_value=("value", "sum"),
+        min_value=("value", "min"),
+        max_value=("value", "max"),
+        first_value=("value", "first"),
+        first_recorded_at=("recorded_at", "first"),
+        last_value=("value", "last"),
+        last_recorded_at=("recorded_at", "last"),
+    ).reset_index()
+
+    bulk_insert_frame(MetricDailyRollup.__table__, buckets)
+
+
+def write_streaks(patient_ids, days, end_date):
+    """Every generated patient logged on each of the `days` days up to end_date."""
+    PatientLogStreak.query.filter(PatientLogStreak.patient_id.in_(patient_ids)).delete(synchronize_session=False)
+    db.session.execute(insert(PatientLogStreak), [
+        {"patient_id": patient_id, "current_streak": days, "longest_streak": days, "last_logged_date": end_date}
+        for patient_id in patient_ids
+    ])
+
+
+def sync_latest_values(frame):
+    """Sets each patient's latest_* fields to their newest generated value."""
+    latest = frame.sort_values("recorded_at", kind="stable").groupby(["patient_id", "metric_name"])["value"].last().unstack()
+    latest = latest.reset_index().astype(object)
+    records = latest.where(latest.notna(), None).to_dict("records")
+    db.session.execute(update(Patient), records)
+
+
+def generate_health_history(patient_ids, days=30, seed=None, chunk_patients=500, end_date=None,
+                            with_rollups=True, with_streaks=True, sync_latest=True):
+    """
+    Writes synthetic history for patients that have none, `chunk_patients` at a time.
+    Also writes their day rollups and streak rows so no rebuild is needed afterwards.
+
+    Returns {"patients", "rows", "seconds", "rows_per_second"}.
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    end_date = end_date or datetime.now(UK_TZ).date()
+    summary = {"patients": 0, "rows": 0}
+
+    for start in range(0, len(patient_ids), chunk_patients):
+        chunk = [int(patient_id) for patient_id in patient_ids[start:start + chunk_patients]]
+        frame = build_history_frame(chunk, days, end_date, rng)
+
+        write_history(frame)
+        if with_rollups:
+            write_rollups(frame)
+        if with_streaks:
+            write_streaks(chunk, days, end_date)
+        if sync_latest:
+            sync_latest_values(frame)
+        db.session.commit()
+
+        summary["patients"] += len(chunk)
+        summary["rows"] += len(frame)
+        elapsed = time.perf_counter() - started
+        print(f"[HISTORY] {summary['patients']}/{len(patient_ids)} patients, {summary['rows']} rows, {elapsed:.1f}s.")
+
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    summary["rows_per_second"] = round(summary["rows"] / summary["seconds"]) if summary["seconds"] else None
+    return summary
+
+
+def patients_without_history(patient_ids=None):
+    """Patient IDs (all, or from patient_ids) with no health history yet."""
+    query = db.session.query(Patient.patient_id).filter(
+        ~db.session.query(HealthHistory.id).filter(HealthHistory.patient_id == Patient.patient_id).exists()
+    )
+    if patient_ids is not None:
+        query = query.filter(Patient.patient_id.in_(patient_ids))
+    return [row.patient_id for row in query.order_by(Patient.patient_id)]
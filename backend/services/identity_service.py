@@ -0,0 +1,157 @@
+#Imports
+import threading
+from collections import OrderedDict, namedtuple
+from flask import current_app, g, has_app_context
+from models import db
+from models.user import User
+from models.patient import Patient
+
+#What a username resolves to. patient is the live row in the current session (or None).
+Identity = namedtuple("Identity", ["user_id", "patient_id", "patient"])
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+#Identity Resolver
+#Two levels:
+# - per request/callback (flask.g): username -> Identity, so repeat lookups cost nothing.
+# - across requests: a bounded LRU of username -> (user_id, patient_id). Only ids are
+#   kept here because ORM rows belong to one session; the patient row is then fetched
+#   by primary key, which the session's identity map serves for the rest of the request.
+
+class IdentityCache:
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.request_hits = 0
+        self.lru_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, username):
+        with self._lock:
+            ids = self._entries.get(username)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self.lru_hits += 1
+            return ids
+
+    def put(self, username, ids, max_size):
+        with self._lock:
+            self._entries[username] = ids
+            self._entries.move_to_end(username)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def record_request_hit(self):
+        with self._lock:
+            self.request_hits += 1
+
+    def discard(self, username):
+        with self._lock:
+            self.invalidations += 1
+            return self._entries.pop(username, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.request_hits + self.lru_hits + self.misses
+            return {
+                "request_hits": self.request_hits,
+                "lru_hits": self.lru_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "hit_rate": round((self.request_hits + self.lru_hits) / lookups, 3) if lookups else None,
+            }
+
+
+identity_cache = IdentityCache()
+
+
+def _request_map():
+    """The identity map for the current request/callback (None outside an app context)."""
+    if not has_app_context():
+        return None
+    if "identity_map" not in g:
+        g.identity_map = {}
+    return g.identity_map
+
+
+def resolve_identity(username):
+    """
+    Resolves a username to Identity(user_id, patient_id, patient), or None if the user
+    does not exist. Replaces User.query.filter_by(username=...).first() + user.patient.
+    """
+    if not username:
+        return None
+
+    request_map = _request_map()
+    if request_map is not None and username in request_map:
+        identity = request_map[username]
+        #The row may have been expunged (e.g. by a batch job) since it was cached
+        if identity.patient is None or identity.patient in db.session:
+            identity_cache.record_request_hit()
+            return identity
+
+    ids = identity_cache.get(username)
+    if ids is None:
+        row = db.session.query(User.id, User.patient_id).filter_by(username=username).first()
+        if row is None:
+            return None
+        ids = (row.id, row.patient_id)
+        identity_cache.put(username, ids, current_app.config.get("IDENTITY_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+
+    user_id, patient_id = ids
+    patient = db.session.get(Patient, patient_id) if patient_id is not None else None
+    identity = Identity(user_id, patient_id, patient)
+
+    if request_map is not None:
+        request_map[username] = identity
+    return identity
+
+
+def resolve_patient(username):
+    """The user's Patient row, or None."""
+    identity = resolve_identity(username)
+    return identity.patient if identity else None
+
+
+def resolve_patient_id(username):
+    """The user's patient_id, or None."""
+    identity = resolve_identity(username)
+    return identity.patient_id if identity else None
+
+
+def invalidate_identity(username):
+    """Drops a username from both cache levels. Call after profile writes."""
+    request_map = _request_map()
+    if request_map is not None:
+        request_map.pop(username, None)
+    identity_cache.discard(username)
+
+
+def identity_cache_stats():
+    """Hit/miss counters and current size of the cross-request cache."""
+    return identity_cache.stats()
+
+
+def render_identity_metrics():
+    """Identity resolver counters in the Prometheus text format (appended to /metrics)."""
+    stats = identity_cache_stats()
+    lines = []
+    metric = "glucotrack_identity_lookups_total"
+    lines += [f"# HELP {metric} Username lookups by where they were served from.", f"# TYPE {metric} counter"]
+    for source, field in (("request", "request_hits"), ("lru", "lru_hits"), ("database", "misses")):
+        lines.append(f'{metric}{{source="{source}"}} {stats[field]}')
+    metric = "glucotrack_identity_cache_invalidations_total"
+    lines += [f"# HELP {metric} Identity cache invalidations.", f"# TYPE {metric} counter", f"{metric} {stats['invalidations']}"]
+    metric = "glucotrack_identity_cache_size"
+    lines += [f"# HELP {metric} Usernames held in the identity cache.", f"# TYPE {metric} gauge", f"{metric} {stats['size']}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,211 @@
+#Imports
+import math
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+from sqlalchemy import func
+from models import db
+from models.health_history import HealthHistory
+from models.metric_rollup import MetricDailyRollup
+from models.data_version import PatientDataVersion
+from models.upsert import insert_missing
+from services.user_service import METRIC_LABELS
+from services.history_generator import bulk_insert_frame
+from services.challenge_service import evaluate_challenges
+from services.challenge_catalog import get_challenge_catalog
+from services.period_utils import UK_TZ
+from services.streak_service import record_log_dates
+
+
+#Bulk Metric Ingestion
+#Device syncs send many (metric, value, timestamp) readings at once. A batch is
+#validated as a whole (one bad reading rejects the batch, so a device can resend it),
+#then written in one transaction:
+# - every log row with one executemany
+# - each touched day rollup once, from the batch's per-day aggregates
+# - the log streak once (rebuilt from the rollup days when the batch is backdated),
+#   the latest_* columns once per metric, one data version bump
+#Challenges for the batch's metrics are re-evaluated once in the same transaction, so a
+#failed evaluation stores nothing and the device can resend; goals are computed on read,
+#so the version bump is what refreshes them.
+
+DEFAULT_MAX_BATCH_SIZE = 1000
+DEFAULT_MAX_FUTURE_SECONDS = 300  #Allowed clock skew for device timestamps
+
+
+class IngestValidationError(ValueError):
+    """Raised when a batch fails validation; errors lists one message per bad reading."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid reading(s)")
+        self.errors = errors
+
+
+def parse_timestamp(raw):
+    """ISO 8601 string -> naive UTC datetime (timestamps without an offset are taken as UTC)."""
+    if not isinstance(raw, str):
+        raise ValueError("timestamp must be an ISO 8601 string")
+    moment = datetime.fromisoformat(raw.strip().replace("Z", "+00:00"))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def validate_readings(readings, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_future_seconds=DEFAULT_MAX_FUTURE_SECONDS, now=None):
+    """
+    Checks a batch of {"metric", "value", "timestamp"} readings.
+    Returns a DataFrame (metric_name, value, recorded_at) or raises IngestValidationError.
+    """
+    if not isinstance(readings, list) or not readings:
+        raise IngestValidationError(["readings must be a non-empty list"])
+    if len(readings) > max_batch_size:
+        raise IngestValidationError([f"batch has {len(readings)} readings; the limit is {max_batch_size}"])
+
+    latest_allowed = (now or datetime.utcnow()) + timedelta(seconds=max_future_seconds)
+    rows, errors = [], []
+
+    for index, reading in enumerate(readings):
+        if not isinstance(reading, dict):
+            errors.append(f"reading {index}: must be an object")
+            continue
+
+        metric = reading.get("metric")
+        if metric not in METRIC_LABELS:
+            errors.append(f"reading {index}: unknown metric {metric!r}")
+            continue
+
+        value = reading.get("value")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+            errors.append(f"reading {index}: value must be a number greater than 0")
+            continue
+
+        try:
+            recorded_at = parse_timestamp(reading.get("timestamp"))
+        except ValueError as e:
+            errors.append(f"reading {index}: invalid timestamp ({e})")
+            continue
+        if recorded_at > latest_allowed:
+            errors.append(f"reading {index}: timestamp is in the future")
+            continue
+
+        rows.append((metric, float(value), recorded_at))
+
+    if errors:
+        raise IngestValidationError(errors)
+
+    frame = pd.DataFrame(rows, columns=["metric_name", "value", "recorded_at"])
+    frame["recorded_at"] = pd.to_datetime(frame["recorded_at"])
+    return frame
+
+
+def fold_rollups(patient_id, frame):
+    """
+    Adds the batch to the patient's day rollups: missing buckets are created in one
+    conflict-tolerant insert, then one read of the touched buckets and one update each.
+    """
+    #Stable sort: same-second readings keep batch order, matching add_entry()
+    ordered = frame.sort_values("recorded_at", kind="stable")
+    groups = ordered.groupby(["metric_name", "local_date"], sort=False).agg(
+        count=("value", "size"),
+        total=("value", "sum"),
+        min_value=("value", "min"),
+        max_value=("value", "max"),
+        first_value=("value", "first"),
+        first_recorded_at=("recorded_at", "first"),
+        last_value=("value", "last"),
+        last_recorded_at=("recorded_at", "last"),
+    )
+
+    R = MetricDailyRollup
+    insert_missing(R, [
+        {"patient_id": patient_id, "metric_name": metric_name, "local_date": local_date, "entry_count": 0, "total_value": 0}
+        for metric_name, local_date in groups.index
+    ], ["patient_id", "metric_name", "local_date"])
+
+    buckets = {
+        (bucket.metric_name, bucket.local_date): bucket
+        for bucket in R.query.filter(
+            R.patient_id == patient_id,
+            R.metric_name.in_(frame["metric_name"].unique().tolist()),
+            R.local_date.in_(frame["local_date"].unique().tolist())
+        )
+    }
+
+    for (metric_name, local_date), group in groups.iterrows():
+        bucket = buckets[(metric_name, local_date)]
+        bucket.add_summary(
+            int(group["count"]), float(group["total"]), float(group["min_value"]), float(group["max_value"]),
+            float(group["first_value"]), group["first_recorded_at"].to_pydatetime(),
+            float(group["last_value"]), group["last_recorded_at"].to_pydatetime()
+        )
+
+    return len(groups)
+
+
+def update_latest_values(patient, frame):
+    """
+    Sets latest_* once per metric to the batch's newest reading, unless the patient
+    already has a newer log for that metric (a late sync of old readings).
+    """
+    newest = frame.sort_values("recorded_at", kind="stable").groupby("metric_name").last()
+
+    stored = dict(
+        db.session.query(HealthHistory.metric_name, func.max(HealthHistory.recorded_at))
+        .filter(HealthHistory.patient_id == patient.patient_id, HealthHistory.metric_name.in_(newest.index.tolist()))
+        .group_by(HealthHistory.metric_name)
+        .all()
+    )
+
+    updated = []
+    for metric_name, row in newest.iterrows():
+        stored_at = stored.get(metric_name)
+        if stored_at is None or row["recorded_at"].to_pydatetime() >= stored_at:
+            setattr(patient, metric_name, float(row["value"]))
+            updated.append(metric_name)
+    return updated
+
+
+def ingest_readings(patient, readings, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_future_seconds=DEFAULT_MAX_FUTURE_SECONDS):
+    """
+    Validates and stores a batch of readings for one patient (see module notes).
+    Returns a summary dict; raises IngestValidationError for a bad batch.
+    """
+    frame = validate_readings(readings, max_batch_size, max_future_seconds)
+    patient_id = patient.patient_id
+
+    frame["local_date"] = frame["recorded_at"].dt.tz_localize("UTC").dt.tz_convert(UK_TZ).dt.date
+    frame["patient_id"] = patient_id
+
+    try:
+        #latest_* is compared against existing logs, so it runs before the batch is inserted
+        latest_updated = update_latest_values(patient, frame)
+
+        bulk_insert_frame(HealthHistory.__table__, frame[["patient_id", "metric_name", "value", "recorded_at"]])
+        buckets = fold_rollups(patient_id, frame)
+
+        record_log_dates(patient_id, frame["local_date"].unique().tolist())
+
+        #One challenge pass for the whole batch, limited to the challenges these metrics feed
+        metrics = sorted(frame["metric_name"].unique().tolist())
+        challenges = get_challenge_catalog().for_metrics(metrics)
+        if challenges:
+            evaluate_challenges([patient_id], challenges, commit=False)
+
+        PatientDataVersion.bump(patient_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    #Imported here because the leaderboard service imports the Patient model
+    from services.leaderboard_service import mark_leaderboard_dirty
+    for metric_name in metrics:
+        mark_leaderboard_dirty(metric_name)
+
+    print(f"[INGEST] Patient {patient_id}: {len(frame)} readings, {len(metrics)} metrics, {buckets} day buckets.")
+
+    return {
+        "accepted": len(frame),
+        "metrics": {metric_name: int(count) for metric_name, count in frame["metric_name"].value_counts().sort_index().items()},
+        "latest_updated": latest_updated,
+        "challenges_refreshed": len(challenges),
+    }
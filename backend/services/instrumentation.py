@@ -0,0 +1,253 @@
+#Imports
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from flask import Response, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+#Request / Callback Instrumentation
+#Every Flask request and every Dash callback runs inside a Measurement. SQLAlchemy
+#event hooks add to the measurements active on the current app context:
+# - before_cursor_execute counts statements (any engine, ORM or Core)
+# - do_orm_execute counts rows returned by session SELECTs (the result is buffered
+#   with freeze(), so streamed/yield_per queries are left alone and not counted)
+#Results are kept as Prometheus histograms and served as text on /metrics.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_bound(bound):
+    return f"{bound:g}" if isinstance(bound, float) else str(bound)
+
+
+class Histogram:
+    """A Prometheus histogram with one series per label combination."""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        #Counts are per bucket here and made cumulative when rendered
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def series(self):
+        with self._lock:
+            return {labels: {"buckets": list(s["buckets"]), "sum": s["sum"], "count": s["count"]}
+                    for labels, s in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series().items()):
+            label_text = ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = f"{label_text}," if label_text else ""
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series["buckets"]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{format_bound(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series['sum']:g}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series['count']}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class HandlerMetrics:
+    """Duration, SQL statements, rows fetched and payload size for one kind of handler."""
+
+    def __init__(self, prefix, kind, label_names):
+        self.label_names = tuple(label_names)
+        self.duration = Histogram(f"{prefix}_duration_seconds", f"Wall time per {kind}.", label_names, DURATION_BUCKETS)
+        self.statements = Histogram(f"{prefix}_sql_statements", f"SQL statements executed per {kind}.", label_names, STATEMENT_BUCKETS)
+        self.rows = Histogram(f"{prefix}_rows_fetched", f"Rows returned by ORM SELECTs per {kind}.", label_names, ROW_BUCKETS)
+        self.payload = Histogram(f"{prefix}_payload_bytes", f"Response payload size per {kind}.", label_names, PAYLOAD_BUCKETS)
+
+    def histograms(self):
+        return (self.duration, self.statements, self.rows, self.payload)
+
+    def record(self, labels, measurement, payload_bytes=None):
+        self.duration.observe(labels, measurement.seconds)
+        self.statements.observe(labels, measurement.statements)
+        self.rows.observe(labels, measurement.rows)
+        if payload_bytes is not None:
+            self.payload.observe(labels, payload_bytes)
+
+
+callback_metrics = HandlerMetrics("glucotrack_dash_callback", "Dash callback", ["callback"])
+route_metrics = HandlerMetrics("glucotrack_http_request", "Flask request", ["endpoint", "method"])
+
+
+def render_metrics():
+    """All histograms in the Prometheus text exposition format."""
+    histograms = callback_metrics.histograms() + route_metrics.histograms()
+    return "\n".join(histogram.render() for histogram in histograms) + "\n"
+
+
+def reset_metrics():
+    for histogram in callback_metrics.histograms() + route_metrics.histograms():
+        histogram.reset()
+
+
+#Measurements
+
+class Measurement:
+    __slots__ = ("started", "seconds", "statements", "rows")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.statements = 0
+        self.rows = 0
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+
+def active_measurements():
+    """Measurements open on the current app context (outer request first)."""
+    if not has_app_context():
+        return ()
+    return g.get("metric_measurements", ())
+
+
+def start_measurement():
+    measurement = Measurement()
+    g.metric_measurements = active_measurements() + (measurement,)
+    return measurement
+
+
+def finish_measurement(measurement):
+    g.metric_measurements = tuple(m for m in active_measurements() if m is not measurement)
+    return measurement.stop()
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    for measurement in active_measurements():
+        measurement.statements += 1
+
+
+def count_rows(orm_execute_state):
+    measurements = active_measurements()
+    if not measurements or not orm_execute_state.is_select:
+        return None
+
+    options = orm_execute_state.execution_options
+    if options.get("yield_per") or options.get("stream_results"):
+        return None
+
+    frozen = orm_execute_state.invoke_statement().freeze()
+    for measurement in measurements:
+        measurement.rows += len(frozen.data)
+    return frozen()
+
+
+def payload_size(result):
+    """Bytes in a callback/route result (Dash callbacks return the serialised JSON)."""
+    if isinstance(result, Response):
+        return result.calculate_content_length()
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    if isinstance(result, bytes):
+        return len(result)
+    return None
+
+
+#Installation
+
+_sql_hooks_installed = False
+
+
+def install_sql_hooks():
+    global _sql_hooks_installed
+    if _sql_hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    event.listen(Session, "do_orm_execute", count_rows)
+    _sql_hooks_installed = True
+
+
+def instrument_callback(name, func):
+    """Wraps a registered Dash callback so each call is measured under `name`."""
+
+    @wraps(func)
+    def instrumented(*args, **kwargs):
+        measurement = start_measurement()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            #PreventUpdate and errors are still timed (no payload)
+            finish_measurement(measurement)
+            callback_metrics.record((name,), measurement, payload_size(result))
+
+    instrumented.instrumented = True
+    return instrumented
+
+
+def instrument_dash_callbacks(dash_app):
+    """Wraps every callback in the Dash callback map. Returns how many were wrapped."""
+    wrapped = 0
+    for spec in dash_app.callback_map.values():
+        func = spec.get("callback")
+        if func is None or getattr(func, "instrumented", False):
+            continue
+        spec["callback"] = instrument_callback(func.__name__, func)
+        wrapped += 1
+    return wrapped
+
+
+def instrument_flask_routes(app):
+    """Measures every Flask request (Dash's own routes included) from before to after request."""
+
+    @app.before_request
+    def start_request_measurement():
+        g.request_measurement = start_measurement()
+
+    @app.after_request
+    def record_request_measurement(response):
+        measurement = g.pop("request_measurement", None)
+        if measurement is not None:
+            finish_measurement(measurement)
+            labels = (request.endpoint or "unmatched", request.method)
+            size = None if response.is_streamed else response.calculate_content_length()
+            route_metrics.record(labels, measurement, size)
+        return response
+
+
+def init_instrumentation(app, dash_app=None):
+    """Installs the SQL hooks and wraps routes and Dash callbacks (unless METRICS_ENABLED is off)."""
+    if not app.config.get("METRICS_ENABLED", True):
+        print("[INFO] Instrumentation disabled.")
+        return
+
+    install_sql_hooks()
+    instrument_flask_routes(app)
+    wrapped = instrument_dash_callbacks(dash_app) if dash_app is not None else 0
+    print(f"[INFO] Instrumentation enabled for Flask routes and {wrapped} Dash callbacks.")
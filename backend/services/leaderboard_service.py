@@ -1,10 +1,16 @@
 #Imports
+import heapq
+import threading
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from flask import current_app
+from sqlalchemy import func, case
 from models import db
 from models.user import User
 from models.patient import Patient
 from models.health_history import HealthHistory
+from models.metric_rollup import MetricDailyRollup
+from services.period_utils import UK_TZ
+from pytz import UTC
 
 
 #Leaderboard Utilities
@@ -67,3 +73,189 @@ def fetch_leaderboard(metric_name, timeframe):
         }
         for i, row in enumerate(results)
     ]
+
+
+#Leaderboard Snapshots
+#The leaderboard page reads precomputed top-N lists instead of querying history for
+#every viewer, and never rebuilds them itself. Writes only mark their metric dirty; a
+#scheduled job checks every LEADERBOARD_MIN_REFRESH_SECONDS and rebuilds in the
+#background when the snapshot is dirty or older than LEADERBOARD_REFRESH_SECONDS.
+#The page shows when the snapshot it is serving was built.
+
+LEADERBOARD_METRICS = (
+    "latest_steps_taken",
+    "latest_workout_sessions",
+    "latest_calories_burned",
+    "latest_distance_walked",
+)
+LEADERBOARD_TIMEFRAMES = ("all_time", "monthly", "weekly", "daily")
+
+#Rolling windows matching get_timeframe_filter (all_time has no window)
+TIMEFRAME_WINDOWS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+    "monthly": timedelta(days=30),
+}
+
+
+def compute_metric_leaderboards(metric_name, size=5, now=None):
+    """
+    Top `size` users for every timeframe of one metric, from two grouped queries:
+    all_time sums the day rollups, and the rolling windows (which do not line up with
+    UK days) sum raw history from the start of the longest window only.
+    Returns {timeframe: rows} in the format of fetch_leaderboard.
+    """
+    now = now or datetime.utcnow()
+    R = MetricDailyRollup
+
+    all_time = (
+        db.session.query(User.username, func.sum(R.total_value).label("score"))
+        .join(R, User.patient_id == R.patient_id)
+        .join(Patient, User.patient_id == Patient.patient_id)
+        .filter(Patient.show_on_leaderboard.is_(True))
+        .filter(R.metric_name == metric_name)
+        .group_by(User.username)
+        .all()
+    )
+
+    columns = []
+    for timeframe, window in TIMEFRAME_WINDOWS.items():
+        in_window = HealthHistory.recorded_at >= now - window
+        columns.append(func.sum(case((in_window, HealthHistory.value))).label(timeframe))
+
+    recent = (
+        db.session.query(User.username, *columns)
+        .join(HealthHistory, User.patient_id == HealthHistory.patient_id)
+        .join(Patient, User.patient_id == Patient.patient_id)
+        .filter(Patient.show_on_leaderboard.is_(True))
+        .filter(HealthHistory.metric_name == metric_name)
+        .filter(HealthHistory.recorded_at >= now - max(TIMEFRAME_WINDOWS.values()))
+        .group_by(User.username)
+        .all()
+    )
+
+    scores = {"all_time": [(row.username, row.score) for row in all_time]}
+    for timeframe in TIMEFRAME_WINDOWS:
+        scores[timeframe] = [(row.username, getattr(row, timeframe)) for row in recent]
+
+    boards = {}
+    for timeframe in LEADERBOARD_TIMEFRAMES:
+        #Users with nothing logged in the window get NULL and are left off, as before
+        scored = [(username, score) for username, score in scores[timeframe] if score is not None]
+        top = heapq.nsmallest(size, scored, key=lambda item: (-item[1], item[0]))
+        boards[timeframe] = [
+            {
+                "rank": format_rank(i),
+                "name": username,
+                "score": round(score or 0, 2),
+                "row_class": get_rank_class(i)
+            }
+            for i, (username, score) in enumerate(top)
+        ]
+    return boards
+
+
+class LeaderboardSnapshot:
+    """In-process store of {(metric, timeframe): rows} with the time it was built."""
+
+    def __init__(self):
+        self.boards = {}
+        self.refreshed_at = None  #Naive UTC time of the last full rebuild
+        self.dirty_metrics = set()
+        self._lock = threading.Lock()
+
+    def age_seconds(self, now=None):
+        if self.refreshed_at is None:
+            return None
+        return ((now or datetime.utcnow()) - self.refreshed_at).total_seconds()
+
+    def refresh(self, size=5):
+        """Rebuilds every (metric, timeframe) board and swaps them in at once."""
+        with self._lock:
+            return self._rebuild(size)
+
+    def refresh_if_needed(self, size, refresh_seconds, min_refresh_seconds):
+        """Rebuilds unless another thread already did while this one waited for the lock."""
+        if not self.needs_refresh(refresh_seconds, min_refresh_seconds):
+            return False
+        with self._lock:
+            if not self.needs_refresh(refresh_seconds, min_refresh_seconds):
+                return False
+            self._rebuild(size)
+            return True
+
+    def _rebuild(self, size):
+        #Writes that land while rebuilding mark the metric dirty again
+        self.dirty_metrics = set()
+        now = datetime.utcnow()
+
+        boards = {}
+        for metric in LEADERBOARD_METRICS:
+            for timeframe, rows in compute_metric_leaderboards(metric, size, now).items():
+                boards[(metric, timeframe)] = rows
+
+        self.boards = boards
+        self.refreshed_at = now
+        print(f"[LEADERBOARD] Snapshot refreshed ({len(boards)} boards).")
+        return boards
+
+    def mark_dirty(self, metric_name):
+        if metric_name in LEADERBOARD_METRICS:
+            self.dirty_metrics.add(metric_name)
+
+    def needs_refresh(self, refresh_seconds, min_refresh_seconds):
+        age = self.age_seconds()
+        if age is None or age >= refresh_seconds:
+            return True
+        return bool(self.dirty_metrics) and age >= min_refresh_seconds
+
+
+leaderboard_snapshot = LeaderboardSnapshot()
+
+
+def refresh_leaderboards():
+    """Rebuilds the snapshot unconditionally."""
+    return leaderboard_snapshot.refresh(current_app.config.get("LEADERBOARD_SIZE", 5))
+
+
+def refresh_leaderboards_if_needed():
+    """Scheduled job entry point: rebuilds only when the snapshot is missing, stale or dirty."""
+    config = current_app.config
+    return leaderboard_snapshot.refresh_if_needed(
+        config.get("LEADERBOARD_SIZE", 5),
+        config.get("LEADERBOARD_REFRESH_SECONDS", 300),
+        config.get("LEADERBOARD_MIN_REFRESH_SECONDS", 15)
+    )
+
+
+def mark_leaderboard_dirty(metric_name):
+    """Call after a write that can change a leaderboard metric."""
+    leaderboard_snapshot.mark_dirty(metric_name)
+
+
+def mark_all_leaderboards_dirty():
+    """Call after a change that affects every board (e.g. a privacy toggle)."""
+    for metric in LEADERBOARD_METRICS:
+        leaderboard_snapshot.mark_dirty(metric)
+
+
+def get_leaderboard(metric_name, timeframe):
+    """Serves one board from the current snapshot (empty until the first build finishes)."""
+    return leaderboard_snapshot.boards.get((metric_name, timeframe), [])
+
+
+def get_leaderboard_refreshed_at():
+    """Naive UTC time of the snapshot being served (None before the first build)."""
+    return leaderboard_snapshot.refreshed_at
+
+
+def describe_leaderboard_age(now=None):
+    """Short label for the page, e.g. "Updated 14:05 (3 min ago)" in UK time."""
+    refreshed_at = get_leaderboard_refreshed_at()
+    if refreshed_at is None:
+        return "Leaderboards are being built. Check back in a moment."
+
+    minutes = int(leaderboard_snapshot.age_seconds(now) // 60)
+    ago = "just now" if minutes < 1 else f"{minutes} min ago"
+    local_time = refreshed_at.replace(tzinfo=UTC).astimezone(UK_TZ)
+    return f"Updated {local_time:%H:%M} ({ago})"
@@ -1,13 +1,11 @@
 #Imports
 from dash import html
-from models.user import User
+from services.identity_service import resolve_patient_id
+from services.streak_service import get_log_streak
 from models.health_history import HealthHistory
 from services.user_service import METRIC_UNITS  #Dictionary mapping metric names to their units
-from pytz import timezone, UTC  #⏰ For timezone conversions
-from datetime import datetime, timedelta
-
-#UK local timezone (handles DST automatically)
-UK_TZ = timezone("Europe/London")
+from services.period_utils import UK_TZ  #UK local timezone (handles DST automatically)
+from pytz import UTC  #⏰ For timezone conversions
 
 
 #Metric History Fetching
@@ -54,111 +52,52 @@ def fetch_metric_history(patient_id, metric_name):
         ]
     ], className="metric-history-container")
 
-from pytz import UTC, timezone
-UK_TZ = timezone("Europe/London")
-
 def get_consecutive_log_streak(username):
-    from datetime import timedelta
-
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    """Days in a row the user has logged, ending today. Reads the patient's streak row."""
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
         return 0
 
-    logs = (
-        HealthHistory.query
-        .filter_by(patient_id=user.patient.patient_id)
-        .with_entities(HealthHistory.recorded_at)
-        .order_by(HealthHistory.recorded_at.desc())
-        .all()
-    )
-
-    if not logs:
-        print(f"[DEBUG] No logs found for {username}")
-        return 0
-
-    #Convert all timestamps to UK local dates
-    log_dates = sorted({
-        log.recorded_at.replace(tzinfo=UTC).astimezone(UK_TZ).date()
-        for log in logs
-    }, reverse=True)
-
-    print(f"[DEBUG] All log dates for {username}: {log_dates}")
-
-    streak = 0
-    today = datetime.now(UK_TZ).date()
-
-    for i, log_date in enumerate(log_dates):
-        expected_date = today - timedelta(days=i)
-        print(f"[DEBUG] Day {i}: log_date = {log_date}, expected = {expected_date}")
-
-        if log_date == expected_date:
-            streak += 1
-        else:
-            break
-
-    print(f"[DEBUG] Final streak for {username}: {streak} days")
-    return streak
+    return get_log_streak(patient_id)["current"]
 
 from services.user_service import METRIC_LABELS, METRIC_UNITS, METRIC_GOAL_BEHAVIOR
+from services.rollup_service import fetch_window_rollups
 
-def fetch_metric_summary(username, period="day"):
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
-        print(f"[DEBUG] User not found: {username}")
-        return {}
+SUMMARY_PERIODS = ("day", "week", "month")
 
-    patient_id = user.patient.patient_id
-    now = datetime.now(UK_TZ)
-
-    #Define start and end of the selected period
-    if period == "day":
-        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-    elif period == "week":
-        start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
-        end = start + timedelta(days=6, hours=23, minutes=59, seconds=59)
-    elif period == "month":
-        start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        next_month = (now.replace(day=28) + timedelta(days=4)).replace(day=1)
-        end = next_month - timedelta(microseconds=1)
-    else:
+def fetch_metric_summary(username, period="day"):
+    """
+    Summarises every metric in METRIC_LABELS over the current UK day, week or month.
+    All metrics come from one read of the day rollups (plus the user lookup).
+    """
+    if period not in SUMMARY_PERIODS:
         print(f"[DEBUG] Invalid period passed: {period}")
         return {}
 
-    start_utc = start.astimezone(UTC)
-    end_utc = end.astimezone(UTC)
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
+        print(f"[DEBUG] User not found: {username}")
+        return {}
 
-    print(f"[DEBUG] Summary range ({period}): {start_utc} → {end_utc}")
+    windows = fetch_window_rollups(patient_id, METRIC_LABELS.keys(), period)
 
     results = {}
 
     for metric, label in METRIC_LABELS.items():
-        logs = (
-            HealthHistory.query
-            .filter_by(patient_id=patient_id, metric_name=metric)
-            .filter(HealthHistory.recorded_at >= start_utc, HealthHistory.recorded_at <= end_utc)
-            .order_by(HealthHistory.recorded_at.asc())
-            .all()
-        )
-
-        print(f"[DEBUG] {metric}: {len(logs)} logs found in range")
-
-        if not logs:
+        window = windows.get(metric)
+        if not window:
             continue
 
         behavior = METRIC_GOAL_BEHAVIOR.get(metric, "latest")
-        values = [log.value for log in logs]
 
         if behavior == "cumulative":
-            summary = round(sum(values), 2)
+            summary = round(window["sum"], 2)
         elif behavior == "average":
-            summary = round(sum(values) / len(values), 2)
+            summary = round(window["average"], 2)
         elif behavior == "change":
-            summary = round(values[-1] - values[0], 2)
+            summary = round(window["last"] - window["first"], 2)
         else:
-            summary = round(values[-1], 2)
-
-        print(f"[DEBUG] → {behavior.title()} {label}: {summary} {METRIC_UNITS.get(metric, '')}")
+            summary = round(window["last"], 2)
 
         results[metric] = {
             "label": label,
@@ -0,0 +1,177 @@
+#Imports
+import threading
+import time
+from flask import current_app, g, has_app_context
+from models import db
+from services.identity_service import resolve_patient
+
+
+#Metric Log Write Path
+#A logged value and everything derived from it (history row, day rollup, streak,
+#latest_* column, data version, challenge progress and completion points) are written
+#in ONE transaction, so a log costs one commit instead of one per challenge plus one
+#for points. Challenge progress is applied by the metric-logged event listener
+#(services/challenge_events.py) as a delta on the affected challenges only.
+#With METRIC_LOG_GROUP_COMMIT on, writers that arrive within a few milliseconds of each
+#other share a transaction: the first becomes the leader, waits the window, stages every
+#queued write and commits once for all of them. Other writers wait for the leader and
+#then carry on. If a shared batch fails, each write is retried on its own so one bad
+#write never fails its neighbours.
+#The queue holds plain values (username, metric_name, value), never callables or ORM
+#rows: the batch runs in an app context of its own (fresh session and flask.g identity
+#map), and every write is resolved inside it, so nothing from another writer's request
+#leaks into the batch or survives a rollback.
+
+DEFAULT_GROUP_WINDOW_MS = 3
+DEFAULT_GROUP_MAX_BATCH = 64
+
+
+def stage_metric_log(username, metric_name, value):
+    """Stages a log and its derived updates in the current session (no commit). Returns the patient_id."""
+    patient = resolve_patient(username)
+    if not patient:
+        raise ValueError(f"No patient record for user {username}.")
+
+    patient.update_health_metric(metric_name, value, commit=False)
+    return patient.patient_id
+
+
+class PendingWrite:
+    """One writer's log in the group-commit queue (plain values only, see module notes)."""
+
+    def __init__(self, username, metric_name, value):
+        assert isinstance(username, str) and isinstance(metric_name, str), "queue plain values only"
+        assert isinstance(value, (int, float)), "queue plain values only"
+        self.username = username
+        self.metric_name = metric_name
+        self.value = value
+        self.result = None
+        self.error = None
+        self.finished = False
+        self.lead = False
+        self.wake = threading.Event()
+
+
+class GroupCommitter:
+    """
+    Coalesces concurrent writes into shared transactions (see module notes).
+    No background thread: a waiting writer is promoted to leader for each batch.
+    """
+
+    def __init__(self, window_seconds, max_batch):
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = []
+        self._leader_active = False
+        self.stats = {"batches": 0, "writes": 0, "retried_batches": 0}
+
+    def submit(self, username, metric_name, value):
+        """Stages the log in a shared transaction and returns its patient_id (raises its error)."""
+        item = PendingWrite(username, metric_name, value)
+        with self._lock:
+            self._pending.append(item)
+            if not self._leader_active:
+                self._leader_active = True
+                item.lead = True
+
+        while not item.finished:
+            if item.lead:
+                item.lead = False
+                self._lead_batch()
+            else:
+                item.wake.wait()
+                item.wake.clear()
+
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _lead_batch(self):
+        #Let concurrent writers join before taking the batch
+        time.sleep(self.window_seconds)
+        with self._lock:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:len(batch)]
+
+        try:
+            #Own app context: a session and flask.g separate from the leader's request
+            with current_app._get_current_object().app_context():
+                self._run_batch(batch)
+        finally:
+            for item in batch:
+                item.finished = True
+                item.wake.set()
+
+            #Hand leadership to the oldest waiting writer, or stand down
+            with self._lock:
+                if self._pending:
+                    self._pending[0].lead = True
+                    self._pending[0].wake.set()
+                else:
+                    self._leader_active = False
+
+    def _run_batch(self, batch):
+        try:
+            for item in batch:
+                item.result = stage_metric_log(item.username, item.metric_name, item.value)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self.stats["retried_batches"] += 1
+            for item in batch:
+                #Re-resolve everything after the rollback
+                g.pop("identity_map", None)
+                try:
+                    item.result = stage_metric_log(item.username, item.metric_name, item.value)
+                    item.error = None
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    item.error = e
+
+        self.stats["batches"] += 1
+        self.stats["writes"] += len(batch)
+
+
+_committer = None
+_committer_lock = threading.Lock()
+
+
+def get_group_committer():
+    """The process-wide group committer (built on first use), or None when group commit is off."""
+    global _committer
+    if not has_app_context() or not current_app.config.get("METRIC_LOG_GROUP_COMMIT", False):
+        return None
+    if _committer is None:
+        with _committer_lock:
+            if _committer is None:
+                _committer = GroupCommitter(
+                    current_app.config.get("METRIC_LOG_GROUP_WINDOW_MS", DEFAULT_GROUP_WINDOW_MS) / 1000,
+                    current_app.config.get("METRIC_LOG_GROUP_MAX_BATCH", DEFAULT_GROUP_MAX_BATCH)
+                )
+    return _committer
+
+
+def log_metric_value(username, metric_name, value):
+    """
+    Logs one value for a user with all derived updates in a single transaction.
+    Returns True; raises ValueError for an unknown user (nothing is written).
+    """
+    committer = get_group_committer()
+
+    if committer:
+        committer.submit(username, metric_name, value)
+    else:
+        try:
+            stage_metric_log(username, metric_name, value)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    #Imported here because the leaderboard service imports the Patient model
+    from services.leaderboard_service import mark_leaderboard_dirty
+    mark_leaderboard_dirty(metric_name)
+
+    return True
@@ -1,8 +1,10 @@
 #Imports 
 import os
 from dotenv import load_dotenv
-from flask_mail import Mail, Message
+from flask_mail import Mail
 from twilio.rest import Client
+from models import db
+from models.notification_outbox import NotificationOutbox
 
 #Environment Setup 
 load_dotenv()
@@ -28,76 +30,89 @@ def init_mail(app):
     mail.init_app(app)
     mail.debug = 0
 
-#Email Notifications 
+#Outbox
+#Messages are queued here and delivered in batches by services/outbox_service.py,
+#so request handlers and scheduler loops never wait on SMTP or Twilio.
 
-def send_username_email(email, username):
+def queue_notification(channel, recipient, body, subject=None, commit=True):
+    """
+    Adds a message to the outbox. Pass commit=False to queue many messages
+    and commit them together.
+    """
     try:
-        msg = Message(
-            subject="🎉 Welcome to GlucoTrack!",
-            recipients=[email],
-            body=(
-                f"Hi {username},\n\n"
-                f"Thank you for registering with GlucoTrack!\n\n"
-                f"Your username is: {username}\n\n"
-                f"Take charge of your health today.\n\n"
-                f"Best,\nThe GlucoTrack Team"
-            )
-        )
-        mail.send(msg)
-        print(f"[EMAIL SENT] to {email}")
+        db.session.add(NotificationOutbox(channel=channel, recipient=recipient, subject=subject, body=body))
+        if commit:
+            db.session.commit()
+        return True
     except Exception as e:
-        print(f"[EMAIL ERROR] {e}")
+        db.session.rollback()
+        print(f"[OUTBOX ERROR] {e}")
+        return False
 
-def send_inactive_user_email(email, username, days_inactive):
-    try:
-        msg = Message(
-            subject="👋 We Miss You at GlucoTrack!",
-            recipients=[email],
-            body=(
-                f"Hi {username},\n\n"
-                f"We haven't seen you in {days_inactive} days. Come back and log your progress!\n\n"
-                f"Stay consistent for your health goals.\n\n"
-                f"- GlucoTrack Team"
-            )
-        )
-        mail.send(msg)
-        print(f"[REMINDER EMAIL SENT] to {email}")
-    except Exception as e:
-        print(f"[REMINDER EMAIL ERROR] {e}")
+def queue_email(email, subject, body, commit=True):
+    return queue_notification("email", email, body, subject=subject, commit=commit)
 
-def send_goal_nudge_email(email, username, metric, progress):
-    try:
-        msg = Message(
-            subject="🌟 Almost There!",
-            recipients=[email],
-            body=(
-                f"Hey {username},\n\n"
-                f"You're {progress}% of the way to your {metric} goal.\n\n"
-                f"Don't stop now — you're so close!\n\n"
-                f"You've got this,\nThe GlucoTrack Team"
-            )
-        )
-        mail.send(msg)
-        print(f"[GOAL NUDGE EMAIL SENT] to {email}")
-    except Exception as e:
-        print(f"[GOAL EMAIL ERROR] {e}")
+def queue_sms(phone, body, commit=True):
+    return queue_notification("sms", phone, body, commit=commit)
 
-def send_challenge_reminder_email(email, username, challenge_name, progress):
-    try:
-        msg = Message(
-            subject="⏳ Challenge Ending Soon!",
-            recipients=[email],
-            body=(
-                f"Hi {username},\n\n"
-                f"Your challenge \"{challenge_name}\" is ending soon and you're at {progress}% progress.\n\n"
-                f"You can still complete it — give it one last push!\n\n"
-                f"- GlucoTrack Team"
-            )
-        )
-        mail.send(msg)
-        print(f"[CHALLENGE EMAIL SENT] to {email}")
-    except Exception as e:
-        print(f"[CHALLENGE EMAIL ERROR] {e}")
+#Email Notifications 
+
+def send_username_email(email, username, commit=True):
+    if queue_email(
+        email,
+        "🎉 Welcome to GlucoTrack!",
+        (
+            f"Hi {username},\n\n"
+            f"Thank you for registering with GlucoTrack!\n\n"
+            f"Your username is: {username}\n\n"
+            f"Take charge of your health today.\n\n"
+            f"Best,\nThe GlucoTrack Team"
+        ),
+        commit=commit
+    ):
+        print(f"[EMAIL QUEUED] to {email}")
+
+def send_inactive_user_email(email, username, days_inactive, commit=True):
+    if queue_email(
+        email,
+        "👋 We Miss You at GlucoTrack!",
+        (
+            f"Hi {username},\n\n"
+            f"We haven't seen you in {days_inactive} days. Come back and log your progress!\n\n"
+            f"Stay consistent for your health goals.\n\n"
+            f"- GlucoTrack Team"
+        ),
+        commit=commit
+    ):
+        print(f"[REMINDER EMAIL QUEUED] to {email}")
+
+def send_goal_nudge_email(email, username, metric, progress, commit=True):
+    if queue_email(
+        email,
+        "🌟 Almost There!",
+        (
+            f"Hey {username},\n\n"
+            f"You're {progress}% of the way to your {metric} goal.\n\n"
+            f"Don't stop now — you're so close!\n\n"
+            f"You've got this,\nThe GlucoTrack Team"
+        ),
+        commit=commit
+    ):
+        print(f"[GOAL NUDGE EMAIL QUEUED] to {email}")
+
+def send_challenge_reminder_email(email, username, challenge_name, progress, commit=True):
+    if queue_email(
+        email,
+        "⏳ Challenge Ending Soon!",
+        (
+            f"Hi {username},\n\n"
+            f"Your challenge \"{challenge_name}\" is ending soon and you're at {progress}% progress.\n\n"
+            f"You can still complete it — give it one last push!\n\n"
+            f"- GlucoTrack Team"
+        ),
+        commit=commit
+    ):
+        print(f"[CHALLENGE EMAIL QUEUED] to {email}")
 
 
 
@@ -110,35 +125,14 @@ twilio_client = Client(
 )
 twilio_number = os.getenv("TWILIO_PHONE_NUMBER")
 
-def send_username_sms(phone, username):
-    try:
-        message = twilio_client.messages.create(
-            body=f"👋 Welcome to GlucoTrack! Your username is: {username}",
-            from_=twilio_number,
-            to=phone
-        )
-        print(f"[SMS SENT] SID: {message.sid}")
-    except Exception as e:
-        print(f"[SMS ERROR] {e}")
+def send_username_sms(phone, username, commit=True):
+    if queue_sms(phone, f"👋 Welcome to GlucoTrack! Your username is: {username}", commit=commit):
+        print(f"[SMS QUEUED] to {phone}")
 
-def send_goal_nudge_sms(phone, metric, progress):
-    try:
-        message = twilio_client.messages.create(
-            body=f"🔥 You're {progress}% toward your {metric} goal. Keep going!",
-            from_=twilio_number,
-            to=phone
-        )
-        print(f"[GOAL SMS SENT] SID: {message.sid}")
-    except Exception as e:
-        print(f"[GOAL SMS ERROR] {e}")
+def send_goal_nudge_sms(phone, metric, progress, commit=True):
+    if queue_sms(phone, f"🔥 You're {progress}% toward your {metric} goal. Keep going!", commit=commit):
+        print(f"[GOAL SMS QUEUED] to {phone}")
 
-def send_challenge_reminder_sms(phone, challenge_name, progress):
-    try:
-        message = twilio_client.messages.create(
-            body=f"⏳ Your challenge \"{challenge_name}\" is almost over! You're at {progress}%. Push to finish strong!",
-            from_=twilio_number,
-            to=phone
-        )
-        print(f"[CHALLENGE SMS SENT] SID: {message.sid}")
-    except Exception as e:
-        print(f"[CHALLENGE SMS ERROR] {e}")
+def send_challenge_reminder_sms(phone, challenge_name, progress, commit=True):
+    if queue_sms(phone, f"⏳ Your challenge \"{challenge_name}\" is almost over! You're at {progress}%. Push to finish strong!", commit=commit):
+        print(f"[CHALLENGE SMS QUEUED] to {phone}")
@@ -0,0 +1,272 @@
+#Imports
+import queue
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message
+from models import db
+from models.notification_outbox import NotificationOutbox
+from services import notifications
+
+
+#Transports
+#Each transport takes a list of outbox items (plain dicts, safe to hand to a thread)
+#and returns {item_id: (error or None, sent_at)}. report(item_id, error, sent_at), if
+#given, is called as soon as each send returns so the worker can record it straight away.
+
+def no_report(item_id, error, sent_at):
+    pass
+
+class SmtpEmailTransport:
+    """Sends a batch of emails over one Flask-Mail SMTP connection."""
+
+    def __init__(self, app):
+        self.app = app
+        self.connections_opened = 0
+
+    def send_batch(self, items, report=no_report):
+        results = {}
+
+        def done(item_id, error, sent_at):
+            results[item_id] = (error, sent_at)
+            report(item_id, error, sent_at)
+
+        with self.app.app_context():
+            try:
+                with notifications.mail.connect() as connection:
+                    self.connections_opened += 1
+                    for item in items:
+                        try:
+                            connection.send(Message(subject=item["subject"], recipients=[item["recipient"]], body=item["body"]))
+                            done(item["id"], None, datetime.utcnow())
+                        except Exception as e:
+                            done(item["id"], str(e), None)
+            except Exception as e:
+                #Connection failed to open (or to close): anything not yet sent is retried
+                for item in items:
+                    if item["id"] not in results:
+                        done(item["id"], f"SMTP connection error: {e}", None)
+        return results
+
+
+class TwilioSmsTransport:
+    """Sends a batch of SMS through a Twilio client (the real one unless a stand-in is given)."""
+
+    def __init__(self, client=None, from_number=None):
+        self.client = client or notifications.twilio_client
+        self.from_number = from_number or notifications.twilio_number
+
+    def send_batch(self, items, report=no_report):
+        results = {}
+        for item in items:
+            try:
+                self.client.messages.create(body=item["body"], from_=self.from_number, to=item["recipient"])
+                results[item["id"]] = (None, datetime.utcnow())
+            except Exception as e:
+                results[item["id"]] = (str(e), None)
+            report(item["id"], *results[item["id"]])
+        return results
+
+
+#Delivery Worker
+#Delivery is at-least-once. A claimed batch is leased to one run (claimed_by/claimed_at);
+#each message's outcome is committed as soon as its send returns and the lease is renewed
+#while the batch is still sending, so an expired lease means the run died. A crash between
+#a send and its commit still puts that message back in the queue, and it is sent again.
+
+def split_evenly(items, parts):
+    """Splits items into at most `parts` contiguous slices of similar size."""
+    if not items:
+        return []
+    parts = max(1, min(parts, len(items)))
+    size, extra = divmod(len(items), parts)
+    slices, start = [], 0
+    for index in range(parts):
+        end = start + size + (1 if index < extra else 0)
+        slices.append(items[start:end])
+        start = end
+    return slices
+
+
+def claim_due_messages(batch_size):
+    """
+    Leases the next batch of due messages to this run and returns (claim token, items as
+    plain dicts). The claim is one conditional UPDATE (status still "pending"), so a
+    message picked by two workers at once is only ever leased to one of them.
+    """
+    now = datetime.utcnow()
+    candidates = [
+        row.id for row in
+        db.session.query(NotificationOutbox.id)
+        .filter(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= now)
+        .order_by(NotificationOutbox.id.asc())
+        .limit(batch_size)
+    ]
+    if not candidates:
+        return None, []
+
+    token = uuid.uuid4().hex
+    claimed = (
+        NotificationOutbox.query
+        .filter(NotificationOutbox.id.in_(candidates), NotificationOutbox.status == "pending")
+        .update({"status": "sending", "claimed_at": now, "claimed_by": token}, synchronize_session=False)
+    )
+    db.session.commit()
+
+    if claimed < len(candidates):
+        print(f"[OUTBOX] {len(candidates) - claimed} of {len(candidates)} messages were claimed by another worker.")
+    if not claimed:
+        return token, []
+
+    rows = (
+        NotificationOutbox.query
+        .filter_by(claimed_by=token, status="sending")
+        .order_by(NotificationOutbox.id.asc())
+        .all()
+    )
+    return token, [
+        {"id": row.id, "channel": row.channel, "recipient": row.recipient, "subject": row.subject, "body": row.body}
+        for row in rows
+    ]
+
+
+def renew_lease(token):
+    """Moves the lease of this run's unfinished messages forward."""
+    NotificationOutbox.query.filter_by(claimed_by=token, status="sending").update(
+        {"claimed_at": datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+
+
+def record_outcomes(token, outcomes, summary, latencies, max_attempts, retry_base_seconds):
+    """
+    Writes send outcomes ({item_id: (error, sent_at)}) in one transaction. Rows whose
+    lease expired and were claimed again by another run are left to it.
+    """
+    rows = NotificationOutbox.query.filter(
+        NotificationOutbox.id.in_(list(outcomes)),
+        NotificationOutbox.claimed_by == token,
+        NotificationOutbox.status == "sending"
+    ).all()
+    for row in rows:
+        error, sent_at = outcomes[row.id]
+        row.attempts += 1
+        row.claimed_at = None
+        row.claimed_by = None
+
+        if error is None:
+            row.status = "sent"
+            row.sent_at = sent_at
+            row.last_error = None
+            row.latency_ms = round((sent_at - row.created_at).total_seconds() * 1000, 1)
+            latencies.append(row.latency_ms)
+            summary["sent"] += 1
+        elif row.attempts >= max_attempts:
+            row.status = "failed"
+            row.last_error = error
+            summary["failed"] += 1
+            print(f"[OUTBOX ERROR] {row.channel} to {row.recipient} failed after {row.attempts} attempts: {error}")
+        else:
+            row.status = "pending"
+            row.last_error = error
+            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_base_seconds * 2 ** (row.attempts - 1))
+            summary["retrying"] += 1
+
+    db.session.commit()
+
+
+def deliver_outbox(batch_size=100, max_workers=4, max_attempts=5, retry_base_seconds=60, lease_seconds=600,
+                   email_transport=None, sms_transport=None):
+    """
+    Delivers one batch of due outbox messages (at-least-once, see above).
+
+    Emails are split across the worker threads and each slice shares a single SMTP
+    connection; SMS slices go through the same bounded pool. Failures are retried
+    with exponential backoff (retry_base_seconds * 2^(attempt-1)) until max_attempts,
+    then marked failed. Delivery latency (queued -> sent) is stored per message.
+
+    Returns a summary dict for the batch.
+    """
+    started = time.monotonic()
+    email_transport = email_transport or SmtpEmailTransport(current_app._get_current_object())
+    sms_transport = sms_transport or TwilioSmsTransport()
+
+    token, items = claim_due_messages(batch_size)
+    summary = {"claimed": len(items), "sent": 0, "retrying": 0, "failed": 0, "mean_latency_ms": None, "max_latency_ms": None}
+    if not items:
+        summary["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        return summary
+
+    emails = [item for item in items if item["channel"] == "email"]
+    texts = [item for item in items if item["channel"] == "sms"]
+
+    #The threads only report outcomes; this thread owns the session and records them
+    reported = queue.Queue()
+
+    def report(item_id, error, sent_at):
+        reported.put((item_id, (error, sent_at)))
+
+    recorded, latencies = set(), []
+    renew_every = lease_seconds / 3
+    renewed_at = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(email_transport.send_batch, chunk, report) for chunk in split_evenly(emails, max_workers)]
+        futures += [pool.submit(sms_transport.send_batch, chunk, report) for chunk in split_evenly(texts, max_workers)]
+
+        while True:
+            sending = not all(future.done() for future in futures)
+            outcomes = {}
+            try:
+                item_id, outcome = reported.get(timeout=0.5 if sending else 0)
+                outcomes[item_id] = outcome
+                while True:
+                    item_id, outcome = reported.get_nowait()
+                    outcomes[item_id] = outcome
+            except queue.Empty:
+                pass
+
+            if outcomes:
+                record_outcomes(token, outcomes, summary, latencies, max_attempts, retry_base_seconds)
+                recorded.update(outcomes)
+            if sending and time.monotonic() - renewed_at >= renew_every:
+                renew_lease(token)
+                renewed_at = time.monotonic()
+            if not sending and not outcomes:
+                break
+
+    for future in futures:
+        if future.exception() is not None:
+            print(f"[OUTBOX ERROR] Transport batch raised: {future.exception()}")
+
+    unreported = {item["id"]: ("No result from transport", None) for item in items if item["id"] not in recorded}
+    if unreported:
+        record_outcomes(token, unreported, summary, latencies, max_attempts, retry_base_seconds)
+
+    if latencies:
+        summary["mean_latency_ms"] = round(sum(latencies) / len(latencies), 1)
+        summary["max_latency_ms"] = max(latencies)
+    summary["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def release_stuck_messages(lease_seconds=600):
+    """
+    Puts "sending" messages whose lease has expired (their run crashed) back in the
+    queue. A live run renews its lease, so messages it is still delivering are left alone.
+    """
+    expired_before = datetime.utcnow() - timedelta(seconds=lease_seconds)
+    count = (
+        NotificationOutbox.query
+        .filter(
+            NotificationOutbox.status == "sending",
+            db.or_(NotificationOutbox.claimed_at.is_(None), NotificationOutbox.claimed_at < expired_before)
+        )
+        .update({"status": "pending", "claimed_at": None, "claimed_by": None}, synchronize_session=False)
+    )
+    db.session.commit()
+    if count:
+        print(f"[OUTBOX] Requeued {count} messages with an expired lease.")
+    return count
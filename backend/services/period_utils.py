@@ -0,0 +1,72 @@
+#Imports
+from datetime import datetime, date, time, timedelta
+from pytz import timezone, UTC
+
+UK_TZ = timezone("Europe/London")  #Local timezone for calendar windows (handles DST)
+
+#Callers use both the challenge/goal names and the metric-grid names
+PERIOD_ALIASES = {
+    "daily": "daily",
+    "day": "daily",
+    "weekly": "weekly",
+    "week": "weekly",
+    "monthly": "monthly",
+    "month": "monthly",
+}
+
+
+def normalise_period(period):
+    """Maps 'day'/'week'/'month' onto 'daily'/'weekly'/'monthly'."""
+    if period not in PERIOD_ALIASES:
+        raise ValueError(f"Invalid period: {period}. Valid options: 'daily', 'weekly', 'monthly'.")
+    return PERIOD_ALIASES[period]
+
+
+def get_period_dates(period, today=None):
+    """
+    Returns (start_date, end_date) UK calendar dates for the current period.
+    end_date is exclusive, so a window never spans more than 31 days.
+    """
+    period = normalise_period(period)
+    today = today or datetime.now(UK_TZ).date()
+
+    if period == "daily":
+        start = today
+        end = today + timedelta(days=1)
+    elif period == "weekly":
+        start = today - timedelta(days=today.weekday())
+        end = start + timedelta(days=7)
+    else:
+        start = today.replace(day=1)
+        end = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    return start, end
+
+
+def local_midnight(day):
+    """UK midnight at the start of a calendar date, as an aware datetime."""
+    return UK_TZ.localize(datetime.combine(day, time.min))
+
+
+def get_period_bounds(period, today=None):
+    """Returns the current period as aware UK datetimes [start, end)."""
+    start, end = get_period_dates(period, today)
+    return local_midnight(start), local_midnight(end)
+
+
+def get_period_bounds_utc(period, today=None):
+    """Returns the current period as naive UTC datetimes [start, end) to match DB timestamps."""
+    start, end = get_period_bounds(period, today)
+    return to_naive_utc(start), to_naive_utc(end)
+
+
+def to_naive_utc(moment):
+    """Converts an aware datetime to the naive UTC form stored in the database."""
+    return moment.astimezone(UTC).replace(tzinfo=None)
+
+
+def to_local_date(recorded_at):
+    """UK calendar date for a naive UTC timestamp from the database."""
+    if isinstance(recorded_at, date) and not isinstance(recorded_at, datetime):
+        return recorded_at
+    return recorded_at.replace(tzinfo=UTC).astimezone(UK_TZ).date()
@@ -0,0 +1,177 @@
+#Imports
+import threading
+from collections import defaultdict
+from functools import wraps
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+#Query Budgets
+#A QueryBudget counts the SQL statements run on the current thread inside a block
+#(or decorated function) and checks them against a declared limit. It also flags
+#likely N+1 patterns: the same statement text executed more than max_repeats times
+#with different parameters (one query per row instead of one query for all rows).
+#
+#What happens on a violation depends on QUERY_BUDGET_MODE:
+# - "raise": QueryBudgetExceeded (used by tools.check_query_budgets and in development)
+# - "warn":  a [QUERY BUDGET] line is printed
+# - "off":   nothing is counted
+
+DEFAULT_MAX_REPEATS = 3
+MODES = ("off", "warn", "raise")
+
+#name -> (max_statements, max_repeats) for every budget declared with the decorator
+DECLARED_BUDGETS = {}
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, report):
+        self.report = report
+        super().__init__(format_report(report))
+
+
+_active = threading.local()
+_listener_installed = False
+_install_lock = threading.Lock()
+
+
+def _active_budgets():
+    if not hasattr(_active, "budgets"):
+        _active.budgets = []
+    return _active.budgets
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for budget in _active_budgets():
+        budget.record(statement, parameters)
+
+
+def _install_listener():
+    global _listener_installed
+    with _install_lock:
+        if not _listener_installed:
+            event.listen(Engine, "before_cursor_execute", _record_statement)
+            _listener_installed = True
+
+
+def _freeze(parameters):
+    """Hashable form of the bound parameters (only used to tell repeats apart)."""
+    try:
+        return repr(parameters)
+    except Exception:
+        return id(parameters)
+
+
+def resolve_mode(mode=None):
+    if mode is None:
+        mode = current_app.config.get("QUERY_BUDGET_MODE", "warn") if has_app_context() else "warn"
+    if mode not in MODES:
+        raise ValueError(f"Invalid query budget mode: {mode}. Valid options: {', '.join(MODES)}.")
+    return mode
+
+
+class QueryBudget:
+    """
+    Context manager / decorator enforcing a statement budget.
+
+        with QueryBudget(5, name="leaderboard"):
+            ...
+
+        @query_budget(12)
+        def load_challenges(username_data): ...
+    """
+
+    def __init__(self, max_statements=None, name=None, max_repeats=DEFAULT_MAX_REPEATS, mode=None):
+        self.max_statements = max_statements
+        self.name = name
+        self.max_repeats = max_repeats
+        self.mode = mode
+        self.statements = 0
+        self._groups = defaultdict(set)
+        self._counts = defaultdict(int)
+
+    def record(self, statement, parameters):
+        self.statements += 1
+        self._counts[statement] += 1
+        self._groups[statement].add(_freeze(parameters))
+
+    def repeated_statements(self):
+        """Statements run more than max_repeats times with differing parameters."""
+        if self.max_repeats is None:
+            return []
+        return sorted(
+            (
+                {"statement": statement, "count": count, "distinct_parameters": len(self._groups[statement])}
+                for statement, count in self._counts.items()
+                if count > self.max_repeats and len(self._groups[statement]) > 1
+            ),
+            key=lambda item: item["count"],
+            reverse=True,
+        )
+
+    def report(self):
+        repeated = self.repeated_statements()
+        over_budget = self.max_statements is not None and self.statements > self.max_statements
+        return {
+            "name": self.name or "block",
+            "statements": self.statements,
+            "max_statements": self.max_statements,
+            "over_budget": over_budget,
+            "repeated": repeated,
+            "ok": not over_budget and not repeated,
+        }
+
+    def __enter__(self):
+        self.active_mode = resolve_mode(self.mode)
+        if self.active_mode != "off":
+            _install_listener()
+            _active_budgets().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.active_mode == "off":
+            return False
+        _active_budgets().remove(self)
+
+        #Never mask the block's own exception (includes Dash's PreventUpdate)
+        if exc_type is not None:
+            return False
+
+        report = self.report()
+        if not report["ok"]:
+            if self.active_mode == "raise":
+                raise QueryBudgetExceeded(report)
+            print(f"[QUERY BUDGET] {format_report(report)}")
+        return False
+
+    def __call__(self, func):
+        settings = (self.max_statements, self.max_repeats, self.mode)
+        name = self.name or func.__name__
+        DECLARED_BUDGETS[name] = (self.max_statements, self.max_repeats)
+
+        @wraps(func)
+        def budgeted(*args, **kwargs):
+            max_statements, max_repeats, mode = settings
+            with QueryBudget(max_statements, name=name, max_repeats=max_repeats, mode=mode):
+                return func(*args, **kwargs)
+
+        budgeted.query_budget = name
+        return budgeted
+
+
+def query_budget(max_statements=None, name=None, max_repeats=DEFAULT_MAX_REPEATS, mode=None):
+    """Decorator form of QueryBudget."""
+    return QueryBudget(max_statements, name=name, max_repeats=max_repeats, mode=mode)
+
+
+def format_report(report):
+    parts = [f"{report['name']}: {report['statements']} statements"]
+    if report["max_statements"] is not None:
+        parts[0] += f" (budget {report['max_statements']})"
+    for item in report["repeated"]:
+        statement = " ".join(item["statement"].split())
+        if len(statement) > 120:
+            statement = statement[:117] + "..."
+        parts.append(f"possible N+1: {item['count']}x ({item['distinct_parameters']} parameter sets) {statement}")
+    return "; ".join(parts)
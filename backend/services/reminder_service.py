@@ -0,0 +1,221 @@
+#Imports
+import time
+from sqlalchemy import or_
+from models import db
+from models.user import User
+from models.patient import Patient
+from models.patientGoal import PatientGoal
+from services.challenge_service import compute_challenge_progress
+from services.challenge_catalog import get_challenge_catalog
+from services.goal_utils import evaluate_goals, goal_label
+from services.notifications import (
+    send_challenge_reminder_email,
+    send_challenge_reminder_sms,
+    send_goal_nudge_email,
+    send_goal_nudge_sms
+)
+
+#Progress band that triggers a "nearly there" challenge reminder
+REMINDER_MIN_PERCENT = 75
+REMINDER_MAX_PERCENT = 100
+
+#Progress band that triggers a goal nudge
+NUDGE_MIN_PERCENT = 80
+NUDGE_MAX_PERCENT = 100
+
+
+#Cohort Paging
+
+def fetch_contactable_patients(after_patient_id, limit):
+    """
+    Next page of patients who can receive a reminder, ordered by patient_id.
+    Keyset paging keeps every page an index seek however far the sweep has got.
+    """
+    return (
+        db.session.query(
+            Patient.patient_id,
+            Patient.email,
+            Patient.phone_number,
+            Patient.email_alerts,
+            Patient.sms_alerts,
+            User.username
+        )
+        .join(User, User.patient_id == Patient.patient_id)
+        .filter(Patient.patient_id > after_patient_id)
+        .filter(or_(Patient.email.isnot(None), Patient.phone_number.isnot(None)))
+        .filter(or_(Patient.email_alerts.is_(True), Patient.sms_alerts.is_(True)))
+        .order_by(Patient.patient_id.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def challenge_reminder_percent(progress, goal):
+    """Rounded completion percentage, or None when outside the reminder band."""
+    percent = round((progress / goal) * 100) if goal > 0 else 0
+    if REMINDER_MIN_PERCENT <= percent < REMINDER_MAX_PERCENT:
+        return percent
+    return None
+
+
+#Challenge Reminder Sweep
+
+def sweep_challenge_reminders(chunk_size=500, time_budget_seconds=1800, start_after=0):
+    """
+    Set-based challenge reminder job.
+
+    Walks contactable patients in chunks; each chunk is scored for every challenge
+    with one grouped rollup aggregate, then reminders go out for challenges in the
+    75-99% band. Stops early when the time budget runs out.
+
+    Returns a summary dict. "resume_after" is the last patient_id handled when the
+    budget ran out (pass it back as start_after next run), or None when finished.
+    """
+    started = time.monotonic()
+    deadline = started + time_budget_seconds
+
+    challenges = get_challenge_catalog().challenges
+    summary = {"patients": 0, "chunks": 0, "emails": 0, "sms": 0, "resume_after": None}
+
+    if not challenges:
+        print("[SWEEP] No challenges defined. Nothing to check.")
+        return summary
+
+    last_patient_id = start_after
+
+    while True:
+        if time.monotonic() >= deadline:
+            summary["resume_after"] = last_patient_id
+            print(f"[SWEEP] Time budget of {time_budget_seconds}s reached after patient {last_patient_id}. Stopping early.")
+            break
+
+        patients = fetch_contactable_patients(last_patient_id, chunk_size)
+        if not patients:
+            break
+
+        progress = compute_challenge_progress(challenges, [p.patient_id for p in patients])
+
+        for patient in patients:
+            patient_progress = progress.get(patient.patient_id, {})
+
+            for challenge in challenges:
+                percent = challenge_reminder_percent(patient_progress.get(challenge.id, 0), challenge.goal)
+                if percent is None:
+                    continue
+
+                if patient.email_alerts and patient.email:
+                    send_challenge_reminder_email(patient.email, patient.username, challenge.name, percent, commit=False)
+                    summary["emails"] += 1
+                if patient.sms_alerts and patient.phone_number:
+                    send_challenge_reminder_sms(patient.phone_number, challenge.name, percent, commit=False)
+                    summary["sms"] += 1
+
+        last_patient_id = patients[-1].patient_id
+        summary["patients"] += len(patients)
+        summary["chunks"] += 1
+
+        #Queue the chunk's reminders in one commit, then release its rows
+        db.session.commit()
+        db.session.expunge_all()
+
+        elapsed = time.monotonic() - started
+        print(
+            f"[SWEEP] Chunk {summary['chunks']}: {summary['patients']} patients checked, "
+            f"{summary['emails']} emails, {summary['sms']} SMS, {elapsed:.1f}s elapsed."
+        )
+
+        if len(patients) < chunk_size:
+            break
+
+    summary["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    return summary
+
+
+#Goal Nudge Sweep
+
+def fetch_contactable_goals(after_goal_id, limit):
+    """
+    Next page of goals whose owner can receive a nudge, ordered by goal id,
+    with the contact details needed to send it.
+    """
+    return (
+        db.session.query(
+            PatientGoal.id,
+            PatientGoal.patient_id,
+            PatientGoal.metric_name,
+            PatientGoal.goal_type,
+            PatientGoal.goal_value,
+            Patient.email,
+            Patient.phone_number,
+            Patient.email_alerts,
+            Patient.sms_alerts,
+            User.username
+        )
+        .join(Patient, Patient.patient_id == PatientGoal.patient_id)
+        .join(User, User.patient_id == Patient.patient_id)
+        .filter(PatientGoal.id > after_goal_id)
+        .filter(or_(Patient.email.isnot(None), Patient.phone_number.isnot(None)))
+        .filter(or_(Patient.email_alerts.is_(True), Patient.sms_alerts.is_(True)))
+        .order_by(PatientGoal.id.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def sweep_goal_nudges(chunk_size=500, time_budget_seconds=1800, start_after=0):
+    """
+    Set-based goal proximity job.
+
+    Walks the goals patients have actually set, in chunks. Each chunk is scored by
+    evaluate_goals (one rollup aggregate per goal window), then a nudge goes out for
+    every goal in the 80-99% band. Cost follows the number of goals, not users x metrics.
+
+    Returns a summary dict shaped like sweep_challenge_reminders.
+    """
+    started = time.monotonic()
+    deadline = started + time_budget_seconds
+    summary = {"goals": 0, "chunks": 0, "emails": 0, "sms": 0, "resume_after": None}
+
+    last_goal_id = start_after
+
+    while True:
+        if time.monotonic() >= deadline:
+            summary["resume_after"] = last_goal_id
+            print(f"[NUDGE] Time budget of {time_budget_seconds}s reached after goal {last_goal_id}. Stopping early.")
+            break
+
+        goals = fetch_contactable_goals(last_goal_id, chunk_size)
+        if not goals:
+            break
+
+        contacts = {goal.id: goal for goal in goals}
+        progress = evaluate_goals(goals)
+        nearly_done = progress[(progress["percent"] >= NUDGE_MIN_PERCENT) & (progress["percent"] < NUDGE_MAX_PERCENT)]
+
+        for goal_id, percent in zip(nearly_done["goal_id"], nearly_done["percent"]):
+            goal = contacts[goal_id]
+            label = goal_label(goal.metric_name)
+
+            if goal.email_alerts and goal.email:
+                send_goal_nudge_email(goal.email, goal.username, label, int(percent), commit=False)
+                summary["emails"] += 1
+            if goal.sms_alerts and goal.phone_number:
+                send_goal_nudge_sms(goal.phone_number, label, int(percent), commit=False)
+                summary["sms"] += 1
+
+        db.session.commit()
+        last_goal_id = goals[-1].id
+        summary["goals"] += len(goals)
+        summary["chunks"] += 1
+
+        elapsed = time.monotonic() - started
+        print(
+            f"[NUDGE] Chunk {summary['chunks']}: {summary['goals']} goals checked, "
+            f"{summary['emails']} emails, {summary['sms']} SMS, {elapsed:.1f}s elapsed."
+        )
+
+        if len(goals) < chunk_size:
+            break
+
+    summary["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    return summary
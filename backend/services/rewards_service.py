@@ -1,19 +1,20 @@
 #Imports 
 from datetime import datetime
 from models import db
-from models.user import User
+from services.identity_service import resolve_patient_id
 from models.patientReward import PatientReward
+from models.data_version import PatientDataVersion
 
 
 #Reward Service Functions 
 
 def get_claimed_rewards(username):
 
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
         return {}
 
-    rewards = PatientReward.query.filter_by(patient_id=user.patient.patient_id).all()
+    rewards = PatientReward.query.filter_by(patient_id=patient_id).all()
     
     #Return reward IDs as strings for consistency with frontend matching
     return {str(r.reward_id): r.claimed_at for r in rewards}
@@ -23,12 +24,10 @@ def mark_reward_claimed(username, reward_id, reward_name):
 
     reward_id = str(reward_id)  #Normalize to string for consistency
 
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient_id = resolve_patient_id(username)
+    if not patient_id:
         return False
 
-    patient_id = user.patient.patient_id
-
     #Check if already claimed
     existing = PatientReward.query.filter_by(
         patient_id=patient_id,
@@ -46,6 +45,7 @@ def mark_reward_claimed(username, reward_id, reward_name):
         claimed_at=datetime.utcnow()
     )
     db.session.add(reward)
+    PatientDataVersion.bump(patient_id)
     db.session.commit()
 
     return True
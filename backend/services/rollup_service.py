@@ -0,0 +1,247 @@
+#Imports
+from sqlalchemy import func, case, and_
+from models import db
+from models.health_history import HealthHistory
+from models.metric_rollup import MetricDailyRollup
+from services.period_utils import get_period_dates, to_local_date
+
+
+#Rollup Reads
+
+#Plain column rows are much cheaper to load than ORM objects for window reads
+BUCKET_COLUMNS = (
+    MetricDailyRollup.metric_name,
+    MetricDailyRollup.local_date,
+    MetricDailyRollup.entry_count,
+    MetricDailyRollup.total_value,
+    MetricDailyRollup.min_value,
+    MetricDailyRollup.max_value,
+    MetricDailyRollup.first_value,
+    MetricDailyRollup.last_value,
+)
+
+def combine_buckets(buckets):
+    """
+    Folds ordered day buckets into one window aggregate.
+    Returns None when the window has no entries.
+    """
+    buckets = [b for b in buckets if b.entry_count]
+    if not buckets:
+        return None
+
+    count = sum(b.entry_count for b in buckets)
+    total = sum(b.total_value for b in buckets)
+
+    return {
+        "count": count,
+        "sum": total,
+        "average": total / count,
+        "min": min(b.min_value for b in buckets),
+        "max": max(b.max_value for b in buckets),
+        "first": buckets[0].first_value,
+        "last": buckets[-1].last_value,
+    }
+
+
+def fetch_window_buckets(patient_id, metric_name, start_date, end_date):
+    """Day buckets for one metric in [start_date, end_date), oldest first."""
+    return (
+        MetricDailyRollup.query
+        .with_entities(*BUCKET_COLUMNS)
+        .filter(
+            MetricDailyRollup.patient_id == patient_id,
+            MetricDailyRollup.metric_name == metric_name,
+            MetricDailyRollup.local_date >= start_date,
+            MetricDailyRollup.local_date < end_date
+        )
+        .order_by(MetricDailyRollup.local_date.asc())
+        .all()
+    )
+
+
+def fetch_window_rollups(patient_id, metric_names, period="daily", today=None):
+    """
+    Window aggregates for several metrics of one patient in a single query.
+    Returns {metric_name: aggregate}; metrics without entries are left out.
+    """
+    start_date, end_date = get_period_dates(period, today)
+
+    buckets = (
+        MetricDailyRollup.query
+        .with_entities(*BUCKET_COLUMNS)
+        .filter(
+            MetricDailyRollup.patient_id == patient_id,
+            MetricDailyRollup.metric_name.in_(list(metric_names)),
+            MetricDailyRollup.local_date >= start_date,
+            MetricDailyRollup.local_date < end_date
+        )
+        .order_by(MetricDailyRollup.local_date.asc())
+        .all()
+    )
+
+    by_metric = {}
+    for bucket in buckets:
+        by_metric.setdefault(bucket.metric_name, []).append(bucket)
+
+    results = {}
+    for metric_name, metric_buckets in by_metric.items():
+        window = combine_buckets(metric_buckets)
+        if window:
+            results[metric_name] = window
+
+    return results
+
+
+def fetch_window_rollup(patient_id, metric_name, period="daily", today=None):
+    """
+    Aggregate (count, sum, average, min, max, first, last) of a metric over the
+    current UK day, week or month, built from at most 31 day buckets.
+    """
+    start_date, end_date = get_period_dates(period, today)
+    return combine_buckets(fetch_window_buckets(patient_id, metric_name, start_date, end_date))
+
+
+def fetch_window_first_value(patient_id, metric_name, start_date, end_date):
+    """First value logged in [start_date, end_date): one index seek to the earliest bucket."""
+    return (
+        db.session.query(MetricDailyRollup.first_value)
+        .filter(
+            MetricDailyRollup.patient_id == patient_id,
+            MetricDailyRollup.metric_name == metric_name,
+            MetricDailyRollup.local_date >= start_date,
+            MetricDailyRollup.local_date < end_date,
+            MetricDailyRollup.entry_count > 0
+        )
+        .order_by(MetricDailyRollup.local_date.asc())
+        .limit(1)
+        .scalar()
+    )
+
+
+#Cohort Window Reads
+
+def fetch_cohort_window_sums(metric_names, windows, patient_ids=None):
+    """
+    Sums each metric over several date windows in one grouped query.
+    windows: {label: (start_date, end_date)} with exclusive end dates.
+    Returns {(patient_id, metric_name): {label: sum}}.
+    """
+    if not metric_names or not windows:
+        return {}
+
+    R = MetricDailyRollup
+    sum_columns = [
+        func.sum(case((and_(R.local_date >= start, R.local_date < end), R.total_value), else_=0)).label(label)
+        for label, (start, end) in windows.items()
+    ]
+
+    query = (
+        db.session.query(R.patient_id, R.metric_name, *sum_columns)
+        .filter(
+            R.metric_name.in_(list(metric_names)),
+            R.local_date >= min(start for start, _ in windows.values()),
+            R.local_date < max(end for _, end in windows.values())
+        )
+    )
+    if patient_ids is not None:
+        query = query.filter(R.patient_id.in_(list(patient_ids)))
+
+    rows = query.group_by(R.patient_id, R.metric_name).all()
+
+    return {
+        (row.patient_id, row.metric_name): {label: row._mapping[label] or 0 for label in windows}
+        for row in rows
+    }
+
+
+def fetch_cohort_window_changes(metric_names, windows, patient_ids=None):
+    """
+    First and last value of each metric over several date windows.
+    Reads the (at most 31 per window) buckets of the given metrics only.
+    Returns {(patient_id, metric_name): {label: (first, last)}}.
+    """
+    if not metric_names or not windows:
+        return {}
+
+    R = MetricDailyRollup
+    query = (
+        db.session.query(R.patient_id, R.metric_name, R.local_date, R.first_value, R.last_value)
+        .filter(
+            R.metric_name.in_(list(metric_names)),
+            R.entry_count > 0,
+            R.local_date >= min(start for start, _ in windows.values()),
+            R.local_date < max(end for _, end in windows.values())
+        )
+    )
+    if patient_ids is not None:
+        query = query.filter(R.patient_id.in_(list(patient_ids)))
+
+    results = {}
+    for row in query.order_by(R.local_date.asc()):
+        per_window = results.setdefault((row.patient_id, row.metric_name), {})
+        for label, (start, end) in windows.items():
+            if start <= row.local_date < end:
+                first, _ = per_window.get(label, (row.first_value, None))
+                per_window[label] = (first, row.last_value)
+
+    return results
+
+
+#Rollup Maintenance
+
+def rebuild_rollups(patient_id=None):
+    """
+    Rebuilds day buckets from raw health history, for one patient or everyone.
+    Used after bulk seeding and as the backfill for existing databases.
+    """
+    delete_query = MetricDailyRollup.query
+    history_query = HealthHistory.query.filter(HealthHistory.recorded_at.isnot(None))
+
+    if patient_id is not None:
+        delete_query = delete_query.filter_by(patient_id=patient_id)
+        history_query = history_query.filter_by(patient_id=patient_id)
+
+    delete_query.delete(synchronize_session=False)
+
+    rows = (
+        history_query
+        .with_entities(
+            HealthHistory.patient_id,
+            HealthHistory.metric_name,
+            HealthHistory.value,
+            HealthHistory.recorded_at
+        )
+        .yield_per(5000)
+    )
+
+    #add_entry() keeps first/last by timestamp, so rows can arrive in any order
+    buckets = {}
+    for row in rows:
+        key = (row.patient_id, row.metric_name, to_local_date(row.recorded_at))
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = MetricDailyRollup(
+                patient_id=row.patient_id,
+                metric_name=row.metric_name,
+                local_date=key[2],
+                entry_count=0,
+                total_value=0
+            )
+            buckets[key] = bucket
+        bucket.add_entry(row.value, row.recorded_at)
+
+    db.session.add_all(buckets.values())
+    db.session.commit()
+
+    print(f"[INFO] Rebuilt {len(buckets)} metric rollup buckets.")
+    return len(buckets)
+
+
+def ensure_rollups_backfilled():
+    """Backfills the rollup table once for databases created before it existed."""
+    has_history = db.session.query(HealthHistory.id).first() is not None
+    has_rollups = db.session.query(MetricDailyRollup.id).first() is not None
+
+    if has_history and not has_rollups:
+        print("[INFO] Metric rollups are empty. Backfilling from health history...")
+        rebuild_rollups()
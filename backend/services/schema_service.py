@@ -0,0 +1,51 @@
+#Imports
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+from models import db
+
+
+#Startup Schema Upgrades
+#initialise_app() builds the schema with db.create_all(), which creates missing tables
+#but never alters a table that already exists, and the shipped database is not stamped
+#for Alembic. Columns added to existing tables by later migrations are listed here and
+#added at startup when absent, with the same definition as the model (type, server
+#default, nullability). The migrations skip columns that are already present, so
+#`flask db upgrade` still works on a database the app has upgraded.
+
+#(table, column, migration that adds it)
+ADDED_COLUMNS = [
+    ("patient_challenge", "period_start", "e7a3c9d1f482"),
+    ("challenges", "metric_name", "f1c4b7e2a9d3"),
+    ("challenges", "aggregation", "f1c4b7e2a9d3"),
+    ("notification_outbox", "claimed_at", "b1d7f3a5c802"),
+    ("notification_outbox", "claimed_by", "b1d7f3a5c802"),
+]
+
+
+def missing_columns(engine):
+    """(table, column) pairs from ADDED_COLUMNS that the database does not have yet."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table_name, column_name, _ in ADDED_COLUMNS:
+        if table_name not in existing_tables:
+            continue  #create_all() builds it with every column
+        if column_name not in {column["name"] for column in inspector.get_columns(table_name)}:
+            missing.append((table_name, column_name))
+    return missing
+
+
+def ensure_schema_upgraded():
+    """Adds any missing ADDED_COLUMNS. Run after db.create_all(). Returns the columns added."""
+    missing = missing_columns(db.engine)
+    if not missing:
+        return []
+
+    with db.engine.begin() as conn:
+        for table_name, column_name in missing:
+            column = db.metadata.tables[table_name].c[column_name]
+            definition = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {definition}"))
+            print(f"[SCHEMA] Added column {table_name}.{column_name}.")
+
+    return missing
@@ -0,0 +1,99 @@
+#Imports
+from datetime import datetime
+from models import db
+from models.health_history import HealthHistory
+from models.log_streak import PatientLogStreak
+from models.metric_rollup import MetricDailyRollup
+from services.period_utils import UK_TZ, to_local_date
+
+
+def get_log_streak(patient_id, today=None):
+    """
+    Returns {"current", "longest", "last_logged_date"} for a patient from their
+    streak row. "current" is 0 unless they have logged today (UK time).
+    """
+    today = today or datetime.now(UK_TZ).date()
+    streak = db.session.get(PatientLogStreak, patient_id)
+    if not streak:
+        return {"current": 0, "longest": 0, "last_logged_date": None}
+
+    return {
+        "current": streak.streak_on(today),
+        "longest": streak.longest_streak,
+        "last_logged_date": streak.last_logged_date,
+    }
+
+
+def rebuild_log_streaks(patient_id=None):
+    """
+    Rebuilds streak rows from raw health history, for one patient or everyone.
+    Used after bulk seeding and as the backfill for existing databases.
+    """
+    delete_query = PatientLogStreak.query
+    history_query = HealthHistory.query.filter(HealthHistory.recorded_at.isnot(None))
+
+    if patient_id is not None:
+        delete_query = delete_query.filter_by(patient_id=patient_id)
+        history_query = history_query.filter_by(patient_id=patient_id)
+
+    delete_query.delete(synchronize_session=False)
+
+    rows = (
+        history_query
+        .with_entities(HealthHistory.patient_id, HealthHistory.recorded_at)
+        .order_by(HealthHistory.patient_id.asc(), HealthHistory.recorded_at.asc())
+        .yield_per(5000)
+    )
+
+    #Rows arrive oldest first per patient, so each one just advances the streak
+    streaks = {}
+    for row in rows:
+        streak = streaks.get(row.patient_id)
+        if streak is None:
+            streak = PatientLogStreak(patient_id=row.patient_id, current_streak=0, longest_streak=0)
+            streaks[row.patient_id] = streak
+        streak.add_log_date(to_local_date(row.recorded_at))
+
+    db.session.add_all(streaks.values())
+    db.session.commit()
+
+    print(f"[INFO] Rebuilt log streaks for {len(streaks)} patients.")
+    return len(streaks)
+
+
+def record_log_dates(patient_id, local_dates):
+    """
+    Folds a batch of log days into the patient's streak (does not commit).
+    add_log_date only moves a streak forward, so a batch with a day before the last
+    logged one (a late device sync) rebuilds the streak from the patient's rollup days,
+    which must already include the batch.
+    """
+    local_dates = sorted(set(local_dates))
+    streak = db.session.get(PatientLogStreak, patient_id)
+
+    if streak is None or streak.last_logged_date is None or local_dates[0] >= streak.last_logged_date:
+        for local_date in local_dates:
+            PatientLogStreak.record(patient_id, local_date)
+        return streak
+
+    logged_days = (
+        db.session.query(MetricDailyRollup.local_date)
+        .filter(MetricDailyRollup.patient_id == patient_id)
+        .distinct()
+        .order_by(MetricDailyRollup.local_date.asc())
+    )
+
+    streak.current_streak, streak.longest_streak, streak.last_logged_date = 0, 0, None
+    for (local_date,) in logged_days:
+        streak.add_log_date(local_date)
+    return streak
+
+
+def ensure_log_streaks_backfilled():
+    """Backfills the streak table once for databases created before it existed."""
+    has_history = db.session.query(HealthHistory.id).first() is not None
+    has_streaks = db.session.query(PatientLogStreak.patient_id).first() is not None
+
+    if has_history and not has_streaks:
+        print("[INFO] Log streaks are empty. Backfilling from health history...")
+        rebuild_log_streaks()
@@ -1,9 +1,10 @@
 from datetime import datetime
 import pandas as pd
 from models import db
-from models.user import User
-from models.patient import Patient
 from models.health_history import HealthHistory
+from models.data_version import PatientDataVersion
+from services.identity_service import resolve_patient, invalidate_identity
+from services.leaderboard_service import mark_all_leaderboards_dirty
 
 #Centralised Metric Dictionary
 METRIC_LABELS = {
@@ -158,12 +159,10 @@ WATER_QUALITY_MAP = {0: "Good", 1: "Poor"}
 
 #Fetch User Data
 def fetch_user_data(username):
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient = resolve_patient(username)
+    if not patient:
         return {}
 
-    patient = user.patient
-
     #Start with basic user info
     user_data = {
         "first_name": patient.first_name,
@@ -212,12 +211,10 @@ def fetch_user_data(username):
 #Fetch Health History
 def fetch_health_history(username, metric_name):
     """Fetch historical health data for a specific metric."""
-    user = User.query.filter_by(username=username).first()
-    
-    if not user or not user.patient:
+    patient = resolve_patient(username)
+    if not patient:
         return pd.DataFrame()
 
-    patient = user.patient
     patient_id = patient.patient_id
 
     #Fetch only explicitly logged history
@@ -252,12 +249,7 @@ def fetch_health_history(username, metric_name):
 def fetch_user_points(username):
     """Fetch the user's total reward points."""
     try:
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            print(f"[ERROR] User {username} not found.")
-            return 0
-
-        patient = Patient.query.filter_by(patient_id=user.patient_id).first()
+        patient = resolve_patient(username)
         if not patient:
             print(f"[ERROR] No patient record found for {username}.")
             return 0
@@ -270,23 +262,24 @@ def fetch_user_points(username):
         return 0
     
 def update_user_points(username, new_points):
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient = resolve_patient(username)
+    if not patient:
         print(f"[ERROR] No patient found for user: {username}")
         return False
 
-    user.patient.reward_points = new_points
+    patient.reward_points = new_points
+    PatientDataVersion.bump(patient.patient_id)
     db.session.commit()
     print(f"[UPDATE] {username}'s points set to {new_points}.")
     return True
 
 def fetch_recent_activity(username, limit=3):
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient = resolve_patient(username)
+    if not patient:
         return []
 
     entries = (HealthHistory.query
-        .filter_by(patient_id=user.patient.patient_id)
+        .filter_by(patient_id=patient.patient_id)
         .order_by(HealthHistory.recorded_at.desc())
         .limit(limit)
         .all()
@@ -298,12 +291,10 @@ def fetch_recent_activity(username, limit=3):
     ]
     
 def update_user_data(username, updated_data):
-    user = User.query.filter_by(username=username).first()
-    if not user or not user.patient:
+    patient = resolve_patient(username)
+    if not patient:
         return False
 
-    patient = user.patient
-
     try:
         if "first_name" in updated_data:
             patient.first_name = updated_data["first_name"]
@@ -326,9 +317,14 @@ def update_user_data(username, updated_data):
         if "data_export_consent" in updated_data:
             patient.data_export_consent = updated_data["data_export_consent"]
 
+        PatientDataVersion.bump(patient.patient_id)
         db.session.commit()
+        invalidate_identity(username)
+        if "show_on_leaderboard" in updated_data:
+            mark_all_leaderboards_dirty()
         return True
     except Exception as e:
         db.session.rollback()
+        invalidate_identity(username)
         print(f"Error updating user data: {e}")
         return False
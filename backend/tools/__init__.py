@@ -0,0 +1,38 @@
+#Imports
+from contextlib import contextmanager
+from flask import Flask
+from sqlalchemy import event
+from config import Config
+from services.engine_config import init_database
+
+
+def create_tool_app(database_uri=None, overrides=None):
+    """
+    Builds a bare Flask app bound to the database for command-line tools.
+    Skips the scheduler, mail and Dash set-up done in app.py.
+    overrides are applied to the config before the engine is created.
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if database_uri:
+        app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    if overrides:
+        app.config.update(overrides)
+
+    init_database(app)
+    return app
+
+
+@contextmanager
+def capture_statements(engine):
+    """Collects (statement, parameters) for every query run inside the block."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,178 @@
+"""
+Benchmarks mixed dashboard reads and metric writes against SQLite under contention.
+
+Copies the database once per engine profile, then runs reader and writer worker
+processes against the copy for a fixed time:
+  - readers: metric summary grid, recent-log list and graph series for random users
+  - writers: Patient.update_health_metric (one committed log each) for random users
+Profiles:
+  - default: SQLite defaults (rollback journal, synchronous=FULL)
+  - tuned:   the Config pragmas from services/engine_config.py (WAL, synchronous=NORMAL, ...)
+Reports operations per second, p50/p95 latency and "database is locked" errors.
+The source database is never modified.
+
+Usage (from backend/):
+    python -m tools.bench_db_concurrency --database sqlite:///path.db [--readers 4] [--writers 2]
+        [--seconds 10] [--profiles default,tuned] [--output results.json]
+"""
+#Imports
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+PROFILES = {
+    "default": {"SQLITE_TUNING": False},
+    "tuned": {"SQLITE_TUNING": True},
+}
+WRITE_METRICS = ["latest_steps_taken", "latest_water_intake", "latest_calories_burned", "latest_weight"]
+READ_METRICS = ["latest_steps_taken", "latest_fasting_blood_sugar", "latest_weight"]
+
+
+def prepare_copy(source_path, target_dir, profile):
+    """Copies the database for one profile; the default profile is put back on a rollback journal."""
+    target = os.path.join(target_dir, f"{profile}.db")
+    with sqlite3.connect(source_path) as source, sqlite3.connect(target) as copy:
+        source.backup(copy)
+    if profile == "default":
+        conn = sqlite3.connect(target)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+    return target
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+
+
+def run_worker(role, database_path, overrides, usernames, seconds, seed, results):
+    """Worker process: repeats its operation until the deadline and reports latencies."""
+    from tools import create_tool_app
+    from models import db
+    from services.identity_service import resolve_patient
+    from services.log_data_service import fetch_metric_history, fetch_metric_summary
+    from services.graph_service import fetch_graph_series
+
+    app = create_tool_app(f"sqlite:///{database_path}", {**overrides, "CALLBACK_CACHE_BACKEND": "off", "QUERY_BUDGET_MODE": "off"})
+    rng = random.Random(seed)
+    latencies, locked, errors = [], 0, 0
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        username = rng.choice(usernames)
+        started = time.perf_counter()
+        with app.app_context():
+            try:
+                if role == "writer":
+                    patient = resolve_patient(username)
+                    patient.update_health_metric(rng.choice(WRITE_METRICS), round(rng.uniform(1, 500), 2))
+                else:
+                    fetch_metric_summary(username, rng.choice(["day", "week", "month"]))
+                    fetch_metric_history(resolve_patient(username).patient_id, rng.choice(READ_METRICS))
+                    fetch_graph_series(username, rng.choice(READ_METRICS))
+                latencies.append(time.perf_counter() - started)
+            except OperationalError as e:
+                db.session.rollback()
+                if "locked" in str(e):
+                    locked += 1
+                else:
+                    errors += 1
+
+    results.put({"role": role, "latencies": latencies, "locked": locked, "errors": errors})
+
+
+def run_profile(profile, database_path, usernames, readers, writers, seconds):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=run_worker, args=(role, database_path, PROFILES[profile], usernames, seconds, index, results))
+        for index, role in enumerate(["reader"] * readers + ["writer"] * writers)
+    ]
+    for worker in workers:
+        worker.start()
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    summary = {"profile": profile}
+    for role in ("reader", "writer"):
+        role_reports = [report for report in reports if report["role"] == role]
+        latencies = [value for report in role_reports for value in report["latencies"]]
+        summary[role] = {
+            "ops": len(latencies),
+            "ops_per_second": round(len(latencies) / seconds, 1),
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+            "locked": sum(report["locked"] for report in role_reports),
+            "errors": sum(report["errors"] for report in role_reports),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark mixed reads and writes per SQLite engine profile.")
+    parser.add_argument("--database", required=True, help="SQLite URI of a database with users and history (copied, not modified).")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profiles", default="default,tuned", help="Comma-separated profiles to run.")
+    parser.add_argument("--output", help="Write the results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    url = make_url(args.database)
+    if url.get_backend_name() != "sqlite" or not url.database:
+        print("[ERROR] The concurrency benchmark needs a SQLite file database.")
+        return 2
+
+    profiles = [profile.strip() for profile in args.profiles.split(",") if profile.strip()]
+    unknown = [profile for profile in profiles if profile not in PROFILES]
+    if unknown:
+        print(f"[ERROR] Unknown profile(s): {', '.join(unknown)}. Valid options: {', '.join(PROFILES)}.")
+        return 2
+
+    with sqlite3.connect(url.database) as conn:
+        usernames = [row[0] for row in conn.execute(
+            "SELECT username FROM users WHERE patient_id IN (SELECT DISTINCT patient_id FROM health_history) LIMIT 500"
+        )]
+    if not usernames:
+        print("[ERROR] No users with health history in the database.")
+        return 2
+
+    print(f"[BENCH] {args.readers} readers + {args.writers} writers, {args.seconds:g}s per profile, {len(usernames)} users")
+    print(f"{'profile':<10}{'role':<8}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'locked':>8}{'errors':>8}")
+
+    scratch = tempfile.mkdtemp(prefix="glucotrack-concurrency-")
+    summaries = []
+    try:
+        for profile in profiles:
+            database_path = prepare_copy(url.database, scratch, profile)
+            summary = run_profile(profile, database_path, usernames, args.readers, args.writers, args.seconds)
+            summaries.append(summary)
+            for role in ("reader", "writer"):
+                stats = summary[role]
+                print(f"{profile:<10}{role:<8}{stats['ops_per_second']:>9}{str(stats['p50_ms']):>10}{str(stats['p95_ms']):>10}{stats['locked']:>8}{stats['errors']:>8}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"readers": args.readers, "writers": args.writers, "seconds": args.seconds, "profiles": summaries}, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmarks fetch_metric_summary against the per-metric query loop it replaced.
+
+Counts SQL statements and wall time per call for each dashboard period and
+checks both versions return the same summary.
+
+Usage (from backend/):
+    python -m tools.bench_metric_summary [--database sqlite:///path.db] [--username eva6000] [--repeat 20]
+"""
+#Imports
+import argparse
+import sys
+import time
+
+from models import db
+from models.user import User
+from models.health_history import HealthHistory
+from services.log_data_service import fetch_metric_summary, SUMMARY_PERIODS
+from services.period_utils import get_period_bounds_utc
+from services.user_service import METRIC_LABELS, METRIC_UNITS, METRIC_GOAL_BEHAVIOR
+from tools import capture_statements, create_tool_app
+
+
+def legacy_fetch_metric_summary(username, period="day"):
+    """The previous implementation: one HealthHistory query per metric."""
+    user = User.query.filter_by(username=username).first()
+    if not user or not user.patient:
+        return {}
+
+    patient_id = user.patient.patient_id
+    start_utc, end_utc = get_period_bounds_utc(period)
+
+    results = {}
+    for metric, label in METRIC_LABELS.items():
+        logs = (
+            HealthHistory.query
+            .filter_by(patient_id=patient_id, metric_name=metric)
+            .filter(HealthHistory.recorded_at >= start_utc, HealthHistory.recorded_at < end_utc)
+            .order_by(HealthHistory.recorded_at.asc())
+            .all()
+        )
+        if not logs:
+            continue
+
+        behavior = METRIC_GOAL_BEHAVIOR.get(metric, "latest")
+        values = [log.value for log in logs]
+
+        if behavior == "cumulative":
+            summary = round(sum(values), 2)
+        elif behavior == "average":
+            summary = round(sum(values) / len(values), 2)
+        elif behavior == "change":
+            summary = round(values[-1] - values[0], 2)
+        else:
+            summary = round(values[-1], 2)
+
+        results[metric] = {"label": label, "value": summary, "unit": METRIC_UNITS.get(metric, "")}
+
+    return results
+
+
+def measure(func, username, period, repeat):
+    """Returns (statements per call, mean milliseconds per call, last result)."""
+    with capture_statements(db.engine) as statements:
+        result = func(username, period)
+    statement_count = len(statements)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        db.session.expire_all()
+        func(username, period)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    return statement_count, elapsed_ms, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare query count and latency of the metric summary.")
+    parser.add_argument("--database", help="SQLAlchemy URI to benchmark (defaults to Config).")
+    parser.add_argument("--username", help="User to summarise (defaults to the first user).")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per period.")
+    args = parser.parse_args(argv)
+
+    app = create_tool_app(args.database)
+    with app.app_context():
+        user = User.query.filter_by(username=args.username).first() if args.username else User.query.first()
+        if not user:
+            print("[ERROR] No user available to benchmark.")
+            return 2
+
+        print(f"[BENCH] fetch_metric_summary for {user.username} ({args.repeat} calls per row)")
+        print(f"{'period':<8}{'version':<10}{'queries':>9}{'ms/call':>10}")
+
+        mismatches = 0
+        for period in SUMMARY_PERIODS:
+            legacy_queries, legacy_ms, legacy_result = measure(legacy_fetch_metric_summary, user.username, period, args.repeat)
+            queries, ms, result = measure(fetch_metric_summary, user.username, period, args.repeat)
+
+            print(f"{period:<8}{'legacy':<10}{legacy_queries:>9}{legacy_ms:>10.2f}")
+            print(f"{period:<8}{'rollup':<10}{queries:>9}{ms:>10.2f}")
+
+            if result != legacy_result:
+                mismatches += 1
+                print(f"[WARNING] {period} summaries differ between versions.")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
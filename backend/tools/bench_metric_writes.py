@@ -0,0 +1,140 @@
+"""
+Benchmarks metric logging under contention.
+
+Runs writer threads in one process (as the threaded Flask/Dash server does) that
+log values for random users until the time is up, once per write path, each on
+its own copy of the database:
+  - legacy: update_health_metric commit, then update_challenge_progress per
+    matching challenge (a commit each, plus one for points)
+  - single: log_metric_value, one transaction per log
+  - group:  log_metric_value with METRIC_LOG_GROUP_COMMIT (shared transactions)
+Reports logs per second, p50/p95 latency and failed writes.
+
+Usage (from backend/):
+    python -m tools.bench_metric_writes --database sqlite:///path.db [--threads 8] [--seconds 10]
+        [--modes legacy,single,group] [--synchronous FULL]
+"""
+#Imports
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+
+from models import db
+from models.challenge import Challenge
+from services.identity_service import resolve_patient
+from services.challenge_service import update_challenge_progress
+from services import metric_log_service
+from tools import create_tool_app
+
+MODES = ("legacy", "single", "group")
+WRITE_METRICS = ["latest_steps_taken", "latest_water_intake", "latest_calories_burned", "latest_weight", "latest_fiber_intake"]
+
+
+def legacy_log(username, metric_name, value):
+    """The log-data callback's previous sequence."""
+    patient = resolve_patient(username)
+    patient.update_health_metric(metric_name, value)
+    for challenge in Challenge.query.all():
+        if challenge.metric_name == metric_name:
+            update_challenge_progress(username, challenge.id, None, suppress_completion_logs=True)
+
+
+def run_mode(mode, database_path, usernames, threads, seconds, synchronous):
+    overrides = {
+        "CALLBACK_CACHE_BACKEND": "off",
+        "QUERY_BUDGET_MODE": "off",
+        "SQLITE_SYNCHRONOUS": synchronous,
+        "METRIC_LOG_GROUP_COMMIT": mode == "group",
+    }
+    app = create_tool_app(f"sqlite:///{database_path}", overrides)
+    metric_log_service._committer = None  #Rebuilt from this app's config
+    write = legacy_log if mode == "legacy" else metric_log_service.log_metric_value
+
+    latencies, failures = [], []
+    deadline = time.monotonic() + seconds
+
+    def writer(seed):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            with app.app_context():
+                try:
+                    write(rng.choice(usernames), rng.choice(WRITE_METRICS), round(rng.uniform(1, 50), 2))
+                    latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    db.session.rollback()
+                    failures.append(str(e))
+
+    workers = [threading.Thread(target=writer, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    ordered = sorted(latencies)
+    pick = lambda fraction: round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1) if ordered else None
+    committer = metric_log_service._committer
+    return {
+        "mode": mode,
+        "logs": len(latencies),
+        "logs_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "failures": len(failures),
+        "batches": committer.stats["batches"] if committer else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark metric log write paths under contention.")
+    parser.add_argument("--database", required=True, help="SQLite URI of a database with users and challenges (copied, not modified).")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--synchronous", default="NORMAL", help="SQLITE_SYNCHRONOUS for the run (FULL shows the fsync cost).")
+    args = parser.parse_args(argv)
+
+    url = make_url(args.database)
+    if url.get_backend_name() != "sqlite" or not url.database:
+        print("[ERROR] The write benchmark needs a SQLite file database.")
+        return 2
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    if any(mode not in MODES for mode in modes):
+        print(f"[ERROR] Valid modes: {', '.join(MODES)}.")
+        return 2
+
+    with sqlite3.connect(url.database) as conn:
+        usernames = [row[0] for row in conn.execute("SELECT username FROM users WHERE patient_id IS NOT NULL LIMIT 500")]
+    if not usernames:
+        print("[ERROR] No patient users in the database.")
+        return 2
+
+    print(f"[BENCH] {args.threads} writer threads, {args.seconds:g}s per mode, synchronous={args.synchronous}, {len(usernames)} users")
+    print(f"{'mode':<8}{'logs/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'failed':>8}{'batches':>9}")
+
+    scratch = tempfile.mkdtemp(prefix="glucotrack-writes-")
+    try:
+        for mode in modes:
+            database_path = os.path.join(scratch, f"{mode}.db")
+            with sqlite3.connect(url.database) as source, sqlite3.connect(database_path) as copy:
+                source.backup(copy)
+            result = run_mode(mode, database_path, usernames, args.threads, args.seconds, args.synchronous)
+            print(f"{mode:<8}{result['logs_per_second']:>9}{str(result['p50_ms']):>9}{str(result['p95_ms']):>9}"
+                  f"{result['failures']:>8}{str(result['batches'] or '-'):>9}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Benchmarks notification delivery offline.
+
+Queues a burst of emails and SMS in a scratch SQLite outbox, then delivers them
+through the local SMTP stand-in and the fake Twilio client, comparing the old
+one-connection-per-message sequential sends with the batched outbox worker.
+
+Usage (from backend/):
+    python -m tools.bench_notifications [--emails 500] [--sms 200] [--workers 4] [--batch-size 100]
+        [--smtp-delay 0.002] [--sms-latency 0.05] [--sms-failure-rate 0.05]
+"""
+#Imports
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from flask_mail import Message
+from models import db
+from models.notification_outbox import NotificationOutbox
+from services import notifications
+from services.outbox_service import deliver_outbox, SmtpEmailTransport, TwilioSmsTransport
+from tools import create_tool_app
+from tools.notification_standins import LocalSMTPServer, FakeTwilioClient
+
+
+def configure_mail(app, port):
+    """Points Flask-Mail at the local stand-in."""
+    app.config.update(
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=port,
+        MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False,
+        MAIL_USERNAME=None,
+        MAIL_PASSWORD=None,
+        MAIL_DEFAULT_SENDER="bench@glucotrack.local",
+        MAIL_DEBUG=False,
+    )
+    notifications.mail.init_app(app)
+
+
+def queue_burst(email_count, sms_count):
+    for index in range(email_count):
+        notifications.queue_email(f"patient{index}@example.com", "Benchmark", f"Message {index}", commit=False)
+    for index in range(sms_count):
+        notifications.queue_sms(f"+4470000{index:05d}", f"Message {index}", commit=False)
+    db.session.commit()
+
+
+def run_legacy(email_count, sms_count, twilio_client):
+    """Previous behaviour: mail.send per message (new connection each) and sequential SMS."""
+    started = time.perf_counter()
+    for index in range(email_count):
+        notifications.mail.send(Message(subject="Benchmark", recipients=[f"patient{index}@example.com"], body=f"Message {index}"))
+    for index in range(sms_count):
+        try:
+            twilio_client.messages.create(body=f"Message {index}", from_="+440000000000", to=f"+4470000{index:05d}")
+        except RuntimeError:
+            pass
+    return time.perf_counter() - started
+
+
+def run_outbox(app, args, twilio_client):
+    """Drains the outbox with the worker; failed sends retry immediately (no backoff wait)."""
+    email_transport = SmtpEmailTransport(app)
+    sms_transport = TwilioSmsTransport(client=twilio_client, from_number="+440000000000")
+
+    started = time.perf_counter()
+    batches = 0
+    while NotificationOutbox.query.filter_by(status="pending").count():
+        deliver_outbox(
+            batch_size=args.batch_size,
+            max_workers=args.workers,
+            max_attempts=args.max_attempts,
+            retry_base_seconds=0,
+            email_transport=email_transport,
+            sms_transport=sms_transport
+        )
+        batches += 1
+    return time.perf_counter() - started, batches, email_transport.connections_opened
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark notification delivery against offline stand-ins.")
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--sms", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--smtp-delay", type=float, default=0.002, help="Seconds the SMTP stand-in spends per message.")
+    parser.add_argument("--sms-latency", type=float, default=0.05, help="Seconds the fake Twilio API takes per message.")
+    parser.add_argument("--sms-failure-rate", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+
+    try:
+        app = create_tool_app(f"sqlite:///{path}")
+        with app.app_context(), LocalSMTPServer(message_delay=args.smtp_delay) as smtp:
+            configure_mail(app, smtp.port)
+            db.create_all()
+            total = args.emails + args.sms
+
+            legacy_client = FakeTwilioClient(args.sms_latency, args.sms_failure_rate)
+            legacy_seconds = run_legacy(args.emails, args.sms, legacy_client)
+            legacy_connections = smtp.connections
+
+            queue_burst(args.emails, args.sms)
+            outbox_client = FakeTwilioClient(args.sms_latency, args.sms_failure_rate)
+            outbox_seconds, batches, outbox_connections = run_outbox(app, args, outbox_client)
+
+            sent = NotificationOutbox.query.filter_by(status="sent").all()
+            failed = NotificationOutbox.query.filter_by(status="failed").count()
+            latencies = sorted(row.latency_ms for row in sent)
+            retried = sum(1 for row in sent if row.attempts > 1)
+
+            print(f"[BENCH] {args.emails} emails + {args.sms} SMS, {args.workers} workers, batch size {args.batch_size}")
+            print(f"{'mode':<10}{'seconds':>10}{'msgs/s':>10}{'SMTP conns':>12}")
+            print(f"{'legacy':<10}{legacy_seconds:>10.2f}{total / legacy_seconds:>10.1f}{legacy_connections:>12}")
+            print(f"{'outbox':<10}{outbox_seconds:>10.2f}{total / outbox_seconds:>10.1f}{outbox_connections:>12}")
+            print(f"[BENCH] Outbox: {len(sent)} sent in {batches} batches, {retried} after retry, {failed} failed.")
+            if latencies:
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                print(f"[BENCH] Delivery latency: median {latencies[len(latencies) // 2]:.1f}ms, p95 {p95:.1f}ms.")
+    finally:
+        os.remove(path)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
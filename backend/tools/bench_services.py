@@ -0,0 +1,284 @@
+"""
+Service-level benchmarks over synthetic datasets of increasing size.
+
+For each dataset size (health_history rows) a scratch SQLite database is built
+once with the bulk patient loader and the history generator, then cached in
+--data-dir. Each service call runs in its own app context, like a request:
+  - cold: engine disposed and identity cache cleared first (new connection, empty caches)
+  - warm: repeated calls on a pooled connection with caches populated
+Per call the harness records wall time, SQL statement count and peak Python memory
+(tracemalloc, measured on a separate call so it does not skew timings).
+
+Results are written as JSON. Pass --baseline with an earlier results file to flag
+regressions: fastest warm time or peak memory up by more than --threshold (and more than
+--min-ms for time), or more SQL statements. The exit code is 1 when any regress.
+
+Usage (from backend/):
+    python -m tools.bench_services [--sizes 10000,100000,1000000] [--repeat 30]
+        [--output bench_services.json] [--baseline previous.json] [--threshold 0.3]
+        [--data-dir /tmp/glucotrack-bench] [--seed 42] [--rebuild]
+"""
+#Imports
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from models import db
+from models.patient import Patient
+from models.user import User
+from services.data_loader import read_patient_csv, bulk_load_patients
+from services.history_generator import METRIC_PROFILES, generate_health_history
+from services.identity_service import identity_cache
+from services.user_service import fetch_health_history
+from services.log_data_service import fetch_metric_summary, get_consecutive_log_streak
+from services.goal_utils import calculate_goal_progress
+from services.challenge_service import get_cumulative_metric
+from services.leaderboard_service import fetch_leaderboard
+from tools import capture_statements, create_tool_app
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "diabetes_data.csv")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "glucotrack-bench")
+DEFAULT_SIZES = "10000,100000,1000000"
+DEFAULT_DAYS = 30
+
+#Generated log rows per patient per day
+ROWS_PER_PATIENT_DAY = sum(profile[1] for profile in METRIC_PROFILES.values())
+
+
+def build_benchmarks(username, patient_id):
+    """(name, call) pairs for the service functions under test."""
+    return [
+        ("fetch_health_history", lambda: fetch_health_history(username, "latest_steps_taken")),
+        ("fetch_metric_summary", lambda: fetch_metric_summary(username, "week")),
+        ("calculate_goal_progress", lambda: calculate_goal_progress(username, "latest_steps_taken", "weekly", 70000)),
+        ("get_cumulative_metric", lambda: get_cumulative_metric(patient_id, "latest_steps_taken", "monthly")),
+        ("fetch_leaderboard", lambda: fetch_leaderboard("latest_steps_taken", "monthly")),
+        ("get_consecutive_log_streak", lambda: get_consecutive_log_streak(username)),
+    ]
+
+
+#Datasets
+
+def dataset_path(data_dir, size, seed):
+    #History ends "today", so datasets are rebuilt once per day
+    return os.path.join(data_dir, f"history_{size}_seed{seed}_{datetime.now().strftime('%Y%m%d')}.db")
+
+
+def plan_dataset(size, available_patients, days=DEFAULT_DAYS):
+    """Patients and days needed for roughly `size` history rows (more days once the CSV runs out)."""
+    patients = min(available_patients, max(1, math.ceil(size / (ROWS_PER_PATIENT_DAY * days))))
+    days = max(days, math.ceil(size / (ROWS_PER_PATIENT_DAY * patients)))
+    return patients, days
+
+
+def build_dataset(path, size, seed, csv_path=DEFAULT_CSV):
+    """Creates a SQLite database with about `size` rows of history. Returns its description."""
+    if os.path.exists(path):
+        os.remove(path)
+
+    csv = read_patient_csv(csv_path, diabetic_only=False)
+    patients, days = plan_dataset(size, len(csv))
+
+    app = create_tool_app(f"sqlite:///{path}")
+    with app.app_context():
+        db.create_all()
+        bulk_load_patients(csv.head(patients), seed=seed)
+        patient_ids = [row.patient_id for row in db.session.query(Patient.patient_id).order_by(Patient.patient_id)]
+        summary = generate_health_history(patient_ids, days=days, seed=seed)
+        db.session.remove()
+
+    return {"rows": summary["rows"], "patients": patients, "days": days, "build_seconds": summary["seconds"]}
+
+
+def describe_dataset(path):
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM health_history").fetchone()[0]
+        patients = conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+    return {"rows": rows, "patients": patients}
+
+
+#Measurement
+
+def reset_caches(cold):
+    """Cold calls start from a fresh connection pool and empty identity cache."""
+    if cold:
+        db.engine.dispose()
+        identity_cache.clear()
+
+
+def timed_call(app, call, cold=False):
+    """Runs one call in its own app context. Returns (milliseconds, statements, result)."""
+    with app.app_context():
+        reset_caches(cold)
+        with capture_statements(db.engine) as statements:
+            started = time.perf_counter()
+            result = call()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+    return elapsed_ms, len(statements), result
+
+
+def traced_peak_kib(app, call):
+    """Peak Python memory of one warm call, in KiB."""
+    with app.app_context():
+        tracemalloc.start()
+        try:
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def result_size(result):
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def benchmark_dataset(path, repeat):
+    """Times every benchmark against one dataset. Returns {name: measurements}."""
+    app = create_tool_app(f"sqlite:///{path}")
+    with app.app_context():
+        user = User.query.join(Patient, User.patient_id == Patient.patient_id).order_by(User.id).first()
+        username, patient_id = user.username, user.patient_id
+
+    results = {}
+    for name, call in build_benchmarks(username, patient_id):
+        cold_ms, cold_statements, result = timed_call(app, call, cold=True)
+
+        warm = [timed_call(app, call) for _ in range(repeat)]
+        warm_ms = [elapsed for elapsed, _, _ in warm]
+
+        results[name] = {
+            "cold_ms": round(cold_ms, 3),
+            "warm_min_ms": round(min(warm_ms), 3),
+            "warm_ms": round(percentile(warm_ms, 0.5), 3),
+            "warm_p95_ms": round(percentile(warm_ms, 0.95), 3),
+            "statements_cold": cold_statements,
+            "statements": warm[-1][1],
+            "peak_kib": traced_peak_kib(app, call),
+            "result_size": result_size(result),
+        }
+
+    with app.app_context():
+        db.engine.dispose()
+    return results
+
+
+#Comparison
+
+def compare_results(current, baseline, threshold, min_ms):
+    """Returns a list of regression messages (empty when nothing regressed)."""
+    regressions = []
+    for size, functions in current["results"].items():
+        for name, measured in functions.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if not previous:
+                continue
+
+            label = f"{name} @ {size} rows"
+            #The fastest warm call is the least noisy estimate of the cost
+            key = "warm_min_ms" if "warm_min_ms" in previous else "warm_ms"
+            if (measured[key] > previous[key] * (1 + threshold)
+                    and measured[key] - previous[key] > min_ms):
+                regressions.append(f"{label}: warm {previous[key]:.2f}ms -> {measured[key]:.2f}ms")
+            if measured["statements"] > previous["statements"]:
+                regressions.append(f"{label}: statements {previous['statements']} -> {measured['statements']}")
+            if measured["peak_kib"] > previous["peak_kib"] * (1 + threshold):
+                regressions.append(f"{label}: peak memory {previous['peak_kib']}KiB -> {measured['peak_kib']}KiB")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(size, dataset, functions):
+    print(f"[BENCH] {size} target rows: {dataset['rows']} rows, {dataset['patients']} patients")
+    print(f"{'function':<28}{'cold ms':>10}{'warm ms':>10}{'p95 ms':>10}{'queries':>9}{'peak KiB':>10}")
+    for name, m in functions.items():
+        print(f"{name:<28}{m['cold_ms']:>10.2f}{m['warm_ms']:>10.2f}{m['warm_p95_ms']:>10.2f}"
+              f"{m['statements']:>9}{m['peak_kib']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark service functions over synthetic datasets.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated health_history row counts.")
+    parser.add_argument("--repeat", type=int, default=30, help="Warm calls per function.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the generated datasets.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Where generated databases are cached.")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate datasets even if cached.")
+    parser.add_argument("--output", default="bench_services.json", help="JSON results file to write.")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Allowed relative slowdown (0.3 = 30%%).")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this (ms).")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "datasets": {},
+        "results": {},
+    }
+
+    for size in sizes:
+        path = dataset_path(args.data_dir, size, args.seed)
+        if args.rebuild or not os.path.exists(path):
+            print(f"[BENCH] Building dataset with ~{size} rows at {path}...")
+            build_dataset(path, size, args.seed)
+
+        dataset = describe_dataset(path)
+        functions = benchmark_dataset(path, args.repeat)
+        report["datasets"][str(size)] = dataset
+        report["results"][str(size)] = functions
+        print_table(size, dataset, functions)
+
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"[BENCH] Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare_results(report, baseline, args.threshold, args.min_ms)
+        for message in regressions:
+            print(f"[REGRESSION] {message}")
+        if regressions:
+            return 1
+        print(f"[BENCH] No regressions against {args.baseline} (revision {baseline['meta'].get('revision')}).")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Bulk-imports a patient CSV export (e.g. the full diabetes_data.csv) into the database.
+
+Patients are upserted by PatientID in chunks; new patients also get a user account
+(username = first 3 letters of the surname + PatientID, password DefaultPassword123).
+Rollups and streaks are not touched: no health history is written.
+
+Usage (from backend/):
+    python -m tools.bulk_load_patients [--csv data/diabetes_data.csv] [--database sqlite:///path.db]
+        [--chunk-size 1000] [--limit N] [--all-diagnoses] [--seed 42]
+"""
+#Imports
+import argparse
+import os
+import sys
+
+from models import db
+from services.data_loader import read_patient_csv, bulk_load_patients
+from tools import create_tool_app
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "diabetes_data.csv")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upsert patients and users from a CSV export.")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Patient CSV to import.")
+    parser.add_argument("--database", help="SQLAlchemy URI to load into (defaults to Config).")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per bulk insert/commit.")
+    parser.add_argument("--limit", type=int, help="Only import the first N rows.")
+    parser.add_argument("--all-diagnoses", action="store_true", help="Also import non-diabetic patients.")
+    parser.add_argument("--seed", type=int, help="Seed for the synthetic profile fields.")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.csv):
+        print(f"[ERROR] CSV file not found at {args.csv}.")
+        return 2
+
+    df = read_patient_csv(args.csv, diabetic_only=not args.all_diagnoses)
+    if args.limit:
+        df = df.head(args.limit)
+
+    app = create_tool_app(args.database)
+    with app.app_context():
+        db.create_all()
+        bulk_load_patients(df, chunk_size=args.chunk_size, seed=args.seed)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Checks the query budgets declared on Dash callbacks.
+
+Registers the dashboard callbacks on a tool app, finds every callback decorated
+with @query_budget and calls it with representative arguments for one user,
+with QUERY_BUDGET_MODE=raise. Each call runs in a fresh app context with the
+identity cache cleared, so budgets hold for a cold request. Prints statements
+per call and any N+1 suspects; exits non-zero if a budget is exceeded.
+
+Usage (from backend/):
+    python -m tools.check_query_budgets [--database sqlite:///path.db] [--username eva6000]
+"""
+#Imports
+import argparse
+import sys
+
+from controllers.dashboard import create_dashboard
+from models.user import User
+from services.identity_service import identity_cache
+from services.query_budget import QueryBudget, QueryBudgetExceeded, DECLARED_BUDGETS, format_report
+from tools import create_tool_app
+
+
+def build_call_args(username):
+    """Representative argument tuples per budgeted callback."""
+    user_data = {"username": username}
+    return {
+        "load_challenges": [(user_data,)],
+        "render_tab": [(tab, user_data) for tab in ("overview", "edit", "privacy")],
+        "update_metric_grid": [(period, user_data, "all") for period in ("day", "week", "month")],
+    }
+
+
+def find_budgeted_callbacks(dash_app):
+    """name -> the budgeted function under Dash's callback wrapper."""
+    budgeted = {}
+    for spec in dash_app.callback_map.values():
+        func = getattr(spec.get("callback"), "__wrapped__", None)
+        name = getattr(func, "query_budget", None)
+        if name:
+            budgeted[name] = func
+    return budgeted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run budgeted Dash callbacks and enforce their query budgets.")
+    parser.add_argument("--database", help="SQLAlchemy URI to check against (defaults to Config).")
+    parser.add_argument("--username", help="User to run the callbacks for (defaults to the first user).")
+    args = parser.parse_args(argv)
+
+    app = create_tool_app(args.database)
+    app.config["QUERY_BUDGET_MODE"] = "raise"
+    app.config["CALLBACK_CACHE_BACKEND"] = "off"  #Budgets apply to the uncached work
+    dash_app = create_dashboard(app)
+
+    with app.app_context():
+        user = User.query.filter_by(username=args.username).first() if args.username else User.query.first()
+        if not user:
+            print("[ERROR] No user available to check.")
+            return 2
+        username = user.username
+
+    callbacks = find_budgeted_callbacks(dash_app)
+    call_args = build_call_args(username)
+    failures = 0
+
+    print(f"[BUDGET] Budgeted callbacks for {username}")
+    print(f"{'callback':<24}{'args':<12}{'queries':>9}{'budget':>8}  result")
+    for name, func in sorted(callbacks.items()):
+        max_statements, _ = DECLARED_BUDGETS[name]
+        for arguments in call_args.get(name, []):
+            label = str(arguments[0])[:10] if not isinstance(arguments[0], dict) else "-"
+            identity_cache.clear()
+
+            with app.app_context():
+                #Outer budget only measures; the callback's own budget enforces
+                with QueryBudget(name=name, max_repeats=None, mode="warn") as measured:
+                    try:
+                        func(*arguments)
+                        result = "ok"
+                    except QueryBudgetExceeded as e:
+                        failures += 1
+                        result = f"FAILED - {format_report(e.report)}"
+
+            print(f"{name:<24}{label:<12}{measured.statements:>9}{max_statements if max_statements is not None else '-':>8}  {result}")
+
+        if name not in call_args:
+            print(f"[WARNING] No sample arguments for budgeted callback {name}; not checked.")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
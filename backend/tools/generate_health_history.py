@@ -0,0 +1,49 @@
+"""
+Generates synthetic health history in bulk for patients that have none yet.
+
+Values come from NumPy (per-patient baselines, diurnal log times, weekend effects)
+and are written with executemany (COPY on PostgreSQL) together with their day
+rollups and streak rows, so no rebuild is needed afterwards. Load patients first
+with tools.bulk_load_patients; the full CSV over ~150 days is about 10M rows.
+
+Usage (from backend/):
+    python -m tools.generate_health_history [--database sqlite:///path.db] [--days 30]
+        [--limit N] [--chunk-patients 500] [--seed 42]
+"""
+#Imports
+import argparse
+import sys
+
+from models import db
+from services.history_generator import generate_health_history, patients_without_history
+from tools import create_tool_app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-generate synthetic health history.")
+    parser.add_argument("--database", help="SQLAlchemy URI to write to (defaults to Config).")
+    parser.add_argument("--days", type=int, default=30, help="Days of history per patient, ending today.")
+    parser.add_argument("--limit", type=int, help="Only generate for the first N patients without history.")
+    parser.add_argument("--chunk-patients", type=int, default=500, help="Patients per generated frame/commit.")
+    parser.add_argument("--seed", type=int, help="Seed for the random generator.")
+    args = parser.parse_args(argv)
+
+    app = create_tool_app(args.database)
+    with app.app_context():
+        db.create_all()
+        patient_ids = patients_without_history()
+        if args.limit:
+            patient_ids = patient_ids[:args.limit]
+        if not patient_ids:
+            print("[INFO] Every patient already has health history.")
+            return 0
+
+        summary = generate_health_history(patient_ids, days=args.days, seed=args.seed, chunk_patients=args.chunk_patients)
+        print(f"[INFO] {summary['rows']} rows for {summary['patients']} patients in {summary['seconds']}s "
+              f"({summary['rows_per_second']} rows/s).")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Offline stand-ins for the notification providers.
+
+LocalSMTPServer is a minimal threaded SMTP sink that Flask-Mail can talk to on
+localhost; it counts connections and messages and can add per-message latency.
+FakeTwilioClient mimics twilio_client.messages.create with configurable latency
+and failure rate, so TwilioSmsTransport can be exercised without the network.
+"""
+#Imports
+import itertools
+import random
+import socketserver
+import threading
+import time
+
+
+#Local SMTP Stand-in
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.record_connection()
+        self.reply("220 localhost GlucoTrack SMTP stand-in")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                if server.message_delay:
+                    time.sleep(server.message_delay)
+                server.record_message()
+                self.reply("250 OK: queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Threaded SMTP sink on 127.0.0.1. Use as a context manager; port 0 picks a free port.
+    message_delay (seconds) simulates a slow provider.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, message_delay=0.0):
+        super().__init__(("127.0.0.1", port), SMTPSinkHandler)
+        self.message_delay = message_delay
+        self.connections = 0
+        self.messages = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def record_message(self):
+        with self._lock:
+            self.messages += 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.shutdown()
+        self.server_close()
+
+
+#Fake Twilio Transport
+
+class FakeTwilioMessage:
+    def __init__(self, sid):
+        self.sid = sid
+
+
+class FakeTwilioMessages:
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, body, from_, to):
+        client = self.client
+        if client.latency:
+            time.sleep(client.latency)
+        with client.lock:
+            fail = client.rng.random() < client.failure_rate
+            if fail:
+                client.failures += 1
+            else:
+                client.sent.append((to, body))
+        if fail:
+            raise RuntimeError("Fake Twilio: simulated provider error")
+        return FakeTwilioMessage(f"SMfake{next(client.sids):08d}")
+
+
+class FakeTwilioClient:
+    """Drop-in for twilio.rest.Client as used by TwilioSmsTransport."""
+
+    def __init__(self, latency=0.05, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sids = itertools.count(1)
+        self.sent = []
+        self.failures = 0
+        self.messages = FakeTwilioMessages(self)
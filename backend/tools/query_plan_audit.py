@@ -0,0 +1,142 @@
+"""
+EXPLAIN QUERY PLAN audit for the health_history hot paths.
+
+Runs the real service functions for one user, captures every statement they
+send to the database and asks SQLite how it plans each one. Any plan that
+scans health_history (instead of searching one of its indexes) is reported and
+the script exits non-zero. The database must already carry the indexes
+(run `flask db upgrade` or start the app once).
+
+Usage (from backend/):
+    python -m tools.query_plan_audit [--database sqlite:///path.db] [--username eva6000]
+"""
+#Imports
+import argparse
+import sys
+
+from models import db
+from models.user import User
+from services.user_service import fetch_health_history
+from services.log_data_service import fetch_metric_history, fetch_metric_summary
+from services.challenge_service import get_cumulative_metric
+from services.leaderboard_service import fetch_leaderboard, compute_metric_leaderboards
+from tools import capture_statements, create_tool_app
+
+AUDITED_TABLE = "health_history"
+
+#Metrics covering every aggregation path (sum, first/last, average)
+AUDITED_METRICS = ["latest_steps_taken", "latest_weight", "latest_heart_rate"]
+AUDITED_PERIODS = ["daily", "weekly", "monthly"]
+AUDITED_SUMMARY_PERIODS = ["day", "week", "month"]
+
+
+def explain_query_plan(engine, statement, parameters):
+    """Returns the detail column of SQLite's EXPLAIN QUERY PLAN for a statement."""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def find_table_scans(plan, table=AUDITED_TABLE):
+    """
+    Returns plan lines that walk the whole table or a whole index.
+    'SEARCH <table> USING INDEX' is fine, 'SCAN <table> ...' is not, and neither
+    is an AUTOMATIC index (SQLite builds it by scanning the table on every run).
+    """
+    return [
+        line for line in plan
+        if line.startswith(f"SCAN {table}")
+        or (line.startswith(f"SEARCH {table}") and "AUTOMATIC" in line)
+    ]
+
+
+def build_audit_calls(user):
+    """Pairs a readable label with each service call to audit."""
+    patient_id = user.patient.patient_id
+    calls = []
+
+    for metric in AUDITED_METRICS:
+        calls.append((f"fetch_health_history({metric})", lambda m=metric: fetch_health_history(user.username, m)))
+        calls.append((f"fetch_metric_history({metric})", lambda m=metric: fetch_metric_history(patient_id, m)))
+        for period in AUDITED_PERIODS:
+            calls.append((
+                f"get_cumulative_metric({metric}, {period})",
+                lambda m=metric, p=period: get_cumulative_metric(patient_id, m, p)
+            ))
+
+    for period in AUDITED_SUMMARY_PERIODS:
+        calls.append((f"fetch_metric_summary({period})", lambda p=period: fetch_metric_summary(user.username, p)))
+
+    for timeframe in AUDITED_PERIODS:
+        calls.append((
+            f"fetch_leaderboard(latest_steps_taken, {timeframe})",
+            lambda t=timeframe: fetch_leaderboard("latest_steps_taken", t)
+        ))
+    calls.append((
+        "compute_metric_leaderboards(latest_steps_taken)",
+        lambda: compute_metric_leaderboards("latest_steps_taken")
+    ))
+
+    return calls
+
+
+def run_audit(username=None):
+    """
+    Audits every health_history query issued by the hot-path services.
+    Returns a list of violations: {"call", "statement", "plan"}.
+    """
+    user = User.query.filter_by(username=username).first() if username else User.query.first()
+    if not user or not user.patient:
+        raise ValueError(f"No patient user available to audit (username={username}).")
+
+    engine = db.engine
+    violations = []
+    audited = 0
+
+    for label, call in build_audit_calls(user):
+        with capture_statements(engine) as statements:
+            call()
+
+        for statement, parameters in statements:
+            if AUDITED_TABLE not in statement or not statement.lstrip().upper().startswith("SELECT"):
+                continue
+
+            audited += 1
+            plan = explain_query_plan(engine, statement, parameters)
+            if find_table_scans(plan):
+                violations.append({"call": label, "statement": statement, "plan": plan})
+
+    print(f"[AUDIT] Checked {audited} {AUDITED_TABLE} queries for {user.username}.")
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if any health_history hot-path query scans the table.")
+    parser.add_argument("--database", help="SQLAlchemy URI to audit (defaults to Config).")
+    parser.add_argument("--username", help="User to run the services as (defaults to the first user).")
+    args = parser.parse_args(argv)
+
+    app = create_tool_app(args.database)
+    with app.app_context():
+        try:
+            violations = run_audit(args.username)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            return 2
+
+    for violation in violations:
+        print(f"\n[SCAN] {violation['call']}")
+        print(f"  SQL:  {' '.join(violation['statement'].split())}")
+        for line in violation["plan"]:
+            print(f"  PLAN: {line}")
+
+    if violations:
+        print(f"\n[FAIL] {len(violations)} queries fall back to a scan of {AUDITED_TABLE}.")
+        return 1
+
+    print(f"[PASS] Every audited query searches an index on {AUDITED_TABLE}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
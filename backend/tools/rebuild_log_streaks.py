@@ -0,0 +1,31 @@
+"""
+Rebuilds the per-patient log streak rows from raw health history.
+
+Usage (from backend/):
+    python -m tools.rebuild_log_streaks [--database sqlite:///path.db] [--patient-id 6000]
+"""
+#Imports
+import argparse
+import sys
+
+from models import db
+from services.streak_service import rebuild_log_streaks
+from tools import create_tool_app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild patient_log_streaks from health_history.")
+    parser.add_argument("--database", help="SQLAlchemy URI to rebuild (defaults to Config).")
+    parser.add_argument("--patient-id", type=int, help="Only rebuild this patient's streak.")
+    args = parser.parse_args(argv)
+
+    app = create_tool_app(args.database)
+    with app.app_context():
+        db.create_all()
+        rebuild_log_streaks(args.patient_id)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())